@@ -56,7 +56,8 @@ def authenticate_user(db: Session, username: str, password: str):
     return user
 
 # 获取当前用户（需要验证）
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+# 使用同步函数, FastAPI会在线程池中执行数据库查询, 不阻塞事件循环
+def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -80,7 +81,7 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
     return user
 
 # 获取当前用户（可选验证）
-async def get_current_user_optional(token: Optional[str] = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+def get_current_user_optional(token: Optional[str] = Depends(oauth2_scheme), db: Session = Depends(get_db)):
     if not token:
         return None
     try:
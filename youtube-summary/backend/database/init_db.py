@@ -57,6 +57,9 @@ def create_tables(cursor):
         view_count BIGINT,
         like_count BIGINT,
         thumbnail_url TEXT,
+        description TEXT,
+        chapters TEXT,
+        metadata_updated_at TIMESTAMP,
         created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
     )
     ''')
@@ -72,11 +75,78 @@ def create_tables(cursor):
         is_favorite BOOLEAN NOT NULL DEFAULT FALSE,
         summary_type VARCHAR(50) NOT NULL DEFAULT 'short',
         language VARCHAR(10) NOT NULL DEFAULT 'en',
+        model VARCHAR(100),
         created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
         UNIQUE(video_id, user_id)
     )
     ''')
     
+    # Shared (cross-user) summary cache table
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS shared_summaries (
+        id SERIAL PRIMARY KEY,
+        youtube_id VARCHAR(20) NOT NULL,
+        summary_type VARCHAR(50) NOT NULL,
+        language VARCHAR(10) NOT NULL,
+        model VARCHAR(100) NOT NULL,
+        prompt_version VARCHAR(20) NOT NULL,
+        summary_text TEXT NOT NULL,
+        transcript_text TEXT,
+        payload TEXT NOT NULL,
+        hit_count INTEGER NOT NULL DEFAULT 0,
+        created_at TIMESTAMP NOT NULL,
+        last_accessed_at TIMESTAMP NOT NULL,
+        CONSTRAINT uq_shared_summary_key UNIQUE (youtube_id, summary_type, language, model, prompt_version)
+    )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS ix_shared_summaries_youtube_id ON shared_summaries (youtube_id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS ix_shared_summaries_last_accessed_at ON shared_summaries (last_accessed_at)')
+    
+    # Per-user summaries reference the shared cached result
+    cursor.execute('''
+    ALTER TABLE summaries
+    ADD COLUMN IF NOT EXISTS shared_summary_id INTEGER REFERENCES shared_summaries(id) ON DELETE SET NULL
+    ''')
+    
+    # Async summary jobs table
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS summary_jobs (
+        id VARCHAR(36) PRIMARY KEY,
+        user_id INTEGER REFERENCES users(id) ON DELETE CASCADE,
+        video_id VARCHAR(20) NOT NULL,
+        summary_type VARCHAR(50) NOT NULL DEFAULT 'short',
+        language VARCHAR(10) NOT NULL DEFAULT 'en',
+        status VARCHAR(20) NOT NULL DEFAULT 'queued',
+        stage VARCHAR(50),
+        result TEXT,
+        error TEXT,
+        attempts INTEGER NOT NULL DEFAULT 0,
+        created_at TIMESTAMP NOT NULL,
+        updated_at TIMESTAMP NOT NULL,
+        started_at TIMESTAMP,
+        finished_at TIMESTAMP
+    )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS ix_summary_jobs_status ON summary_jobs (status)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS ix_summary_jobs_created_at ON summary_jobs (created_at)')
+    
+    # Persistent parsed-transcript store
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS transcripts (
+        id SERIAL PRIMARY KEY,
+        video_id VARCHAR(20) NOT NULL,
+        language VARCHAR(20) NOT NULL,
+        source VARCHAR(50) NOT NULL,
+        entry_count INTEGER NOT NULL,
+        data BYTEA NOT NULL,
+        created_at TIMESTAMP NOT NULL,
+        expires_at TIMESTAMP NOT NULL,
+        CONSTRAINT uq_transcript_track UNIQUE (video_id, language)
+    )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS ix_transcripts_video_id ON transcripts (video_id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS ix_transcripts_expires_at ON transcripts (expires_at)')
+    
     # Tags table
     cursor.execute('''
     CREATE TABLE IF NOT EXISTS tags (
@@ -214,8 +284,11 @@ def main():
             print("Resetting database...")
             cursor.execute('''
             DROP TABLE IF EXISTS video_tags CASCADE;
+            DROP TABLE IF EXISTS summary_jobs CASCADE;
+            DROP TABLE IF EXISTS transcripts CASCADE;
             DROP TABLE IF EXISTS tags CASCADE;
             DROP TABLE IF EXISTS summaries CASCADE;
+            DROP TABLE IF EXISTS shared_summaries CASCADE;
             DROP TABLE IF EXISTS videos CASCADE;
             DROP TABLE IF EXISTS users CASCADE;
             ''')
@@ -0,0 +1,28 @@
+from sqlalchemy import inspect, text
+
+def add_missing_columns(engine, metadata):
+    """
+    Add columns that exist in the models but not yet in the database
+
+    Base.metadata.create_all only creates missing tables, so new (nullable)
+    columns on existing tables have to be added here. Only simple
+    ALTER TABLE ... ADD COLUMN statements are issued; nothing is dropped or changed.
+
+    Args:
+        engine: SQLAlchemy engine
+        metadata: MetaData holding the model tables
+    """
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+
+    with engine.begin() as conn:
+        for table in metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            existing_columns = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing_columns:
+                    continue
+                column_type = column.type.compile(dialect=engine.dialect)
+                print(f"[INFO] Adding column {table.name}.{column.name} ({column_type})")
+                conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'))
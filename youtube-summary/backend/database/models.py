@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Text, LargeBinary, UniqueConstraint
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from database.db import Base
@@ -30,6 +30,11 @@ class Video(Base):
     view_count = Column(Integer, nullable=True)
     like_count = Column(Integer, nullable=True)
     thumbnail_url = Column(String, nullable=True)
+    description = Column(Text, nullable=True)
+    # 章节列表的JSON ([{"start_time", "title"}, ...])
+    chapters = Column(Text, nullable=True)
+    # 元数据最后一次从YouTube获取的时间 (为空表示只有基本信息)
+    metadata_updated_at = Column(DateTime, nullable=True)
     created_at = Column(DateTime, default=func.now())
     
     # 一对多关系定义
@@ -49,11 +54,54 @@ class Summary(Base):
     is_favorite = Column(Boolean, default=False, nullable=False)
     summary_type = Column(String, default="short", nullable=False)
     language = Column(String, default="en", nullable=False)
+    # 生成该摘要的模型 (模型路由的结果)
+    model = Column(String, nullable=True)
+    # 引用跨用户共享的摘要缓存结果
+    shared_summary_id = Column(Integer, ForeignKey("shared_summaries.id", ondelete="SET NULL"), nullable=True)
     created_at = Column(DateTime, default=func.now())
     
     # 多对一关系定义
     user = relationship("User", back_populates="summaries")
     video = relationship("Video", back_populates="summaries")
+    shared_summary = relationship("SharedSummary")
+
+class SharedSummary(Base):
+    """跨用户共享的摘要缓存表, 按 (视频, 摘要类型, 语言, 模型, 提示词版本) 唯一"""
+    __tablename__ = "shared_summaries"
+    __table_args__ = (
+        UniqueConstraint("youtube_id", "summary_type", "language", "model", "prompt_version", name="uq_shared_summary_key"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    youtube_id = Column(String, index=True, nullable=False)
+    summary_type = Column(String, nullable=False)
+    language = Column(String, nullable=False)
+    model = Column(String, nullable=False)
+    prompt_version = Column(String, nullable=False)
+    summary_text = Column(Text, nullable=False)
+    transcript_text = Column(Text, nullable=True)
+    # 响应所需的其余数据 (标题、描述、章节、字幕等) 的JSON
+    payload = Column(Text, nullable=False)
+    hit_count = Column(Integer, default=0, nullable=False)
+    created_at = Column(DateTime, nullable=False)
+    last_accessed_at = Column(DateTime, nullable=False, index=True)
+
+class StoredTranscript(Base):
+    """解析后的字幕持久化存储, 按 (视频, 字幕语言) 唯一, 内容为zlib压缩的JSON"""
+    __tablename__ = "transcripts"
+    __table_args__ = (
+        UniqueConstraint("video_id", "language", name="uq_transcript_track"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    video_id = Column(String, index=True, nullable=False)
+    language = Column(String, nullable=False)
+    # 获取字幕的提供方 (youtube_transcript_api / yt-dlp)
+    source = Column(String, nullable=False)
+    entry_count = Column(Integer, nullable=False)
+    data = Column(LargeBinary, nullable=False)
+    created_at = Column(DateTime, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
 
 class Tag(Base):
     """标签表"""
@@ -71,4 +119,25 @@ class VideoTag(Base):
     __tablename__ = "video_tags"
     
     video_id = Column(Integer, ForeignKey("videos.id"), primary_key=True)
-    tag_id = Column(Integer, ForeignKey("tags.id"), primary_key=True) 
\ No newline at end of file
+    tag_id = Column(Integer, ForeignKey("tags.id"), primary_key=True) 
+
+class SummaryJob(Base):
+    """异步摘要任务队列表"""
+    __tablename__ = "summary_jobs"
+    
+    id = Column(String(36), primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=True, index=True)
+    video_id = Column(String, nullable=False)
+    summary_type = Column(String, default="short", nullable=False)
+    language = Column(String, default="en", nullable=False)
+    # queued / running / succeeded / failed
+    status = Column(String, default="queued", nullable=False, index=True)
+    stage = Column(String, nullable=True)
+    # 成功时的响应JSON / 失败时的错误信息
+    result = Column(Text, nullable=True)
+    error = Column(Text, nullable=True)
+    attempts = Column(Integer, default=0, nullable=False)
+    created_at = Column(DateTime, nullable=False, index=True)
+    updated_at = Column(DateTime, nullable=False)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
@@ -0,0 +1,46 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Optional, Dict, Any
+from pydantic import BaseModel
+from datetime import datetime
+
+from database.models import User
+from auth.routes import get_current_user_optional
+from utils.async_utils import run_blocking
+from utils.job_queue import get_job
+
+# Pydantic模型
+class JobStatusResponse(BaseModel):
+    job_id: str
+    video_id: str
+    summary_type: str
+    language: str
+    status: str
+    stage: Optional[str] = None
+    attempts: int
+    error: Optional[str] = None
+    # 任务成功后的摘要结果 (与 /api/summarize 的响应相同)
+    result: Optional[Dict[str, Any]] = None
+    created_at: datetime
+    updated_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+# 创建路由器
+router = APIRouter(tags=["jobs"])
+
+# 查询异步摘要任务状态
+@router.get("/{job_id}", response_model=JobStatusResponse)
+async def get_job_status(
+    job_id: str,
+    current_user: Optional[User] = Depends(get_current_user_optional)
+):
+    job = await run_blocking(get_job, job_id)
+    
+    # 任务不存在, 或者属于其他用户
+    if not job or (job["user_id"] is not None and (not current_user or current_user.id != job["user_id"])):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found"
+        )
+    
+    return job
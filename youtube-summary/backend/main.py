@@ -1,32 +1,54 @@
 import sys
 import os
-import re
-import subprocess
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, AsyncIterator, Tuple
+from functools import lru_cache
 import json
 import traceback
+import asyncio
+import time
 
 # Ensure the module path is set correctly
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from fastapi import FastAPI, Depends, HTTPException, Query, status, Form, Request
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
+from fastapi.responses import StreamingResponse, JSONResponse
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 import openai
-from openai import OpenAI
 from dotenv import load_dotenv
 from youtube_transcript_api import YouTubeTranscriptApi
 from youtube_transcript_api.formatters import TextFormatter
 
 # Update import paths
-from database.db import get_db, Base, engine
+from database.db import get_db, Base, engine, SessionLocal
+from database.migrate import add_missing_columns
 from database.models import User, Video, Summary, Tag, VideoTag
 from auth.routes import router as auth_router, get_current_user, get_current_user_optional
 from auth.auth_utils import get_password_hash
-from utils.youtube_utils import extract_video_id, get_video_metadata, get_transcript, create_enhanced_text
+from utils.youtube_utils import extract_video_id, get_transcript, create_enhanced_text, cache_index, transcript_executor, no_transcript_cache, NoTranscriptError
+from utils.async_utils import run_blocking, gather_limited, shutdown_blocking_executor
+from utils.transcript import Transcript, transcript_entries
+from utils.transcript_chunks import split_transcript_windows
+from utils.summary_input import SummaryInput, format_timestamp
+from prompts import get_summary_template, render_window_prompt, SUMMARY_END_MARKER
+from utils.token_budget import estimate_tokens, plan_summary_budget, summary_output_tokens
+from utils.llm_client import init_llm_client, get_llm_client, close_llm_client
+from utils.llm_metrics import llm_usage
+from utils.metadata_cache import load_video_metadata
+from utils.summary_cache import make_cache_key, peek_cached_summary, get_cached_summary, store_summary
+from utils.singleflight import SingleFlight
+from utils.job_queue import JobWorkerPool, PermanentJobError, create_job
+from utils.cache_janitor import CacheJanitor
+from utils.provider_health import provider_health
+from utils.rate_limiter import llm_rate_limiter, request_deadline
+from utils.model_router import (
+    route_models, call_with_fallback, model_health, ROUTING_VERSION, MODEL_FIRST_TOKEN_TIMEOUT_SECONDS,
+    attempt_timeout, record_model_speed
+)
 
 from summary_routes import router as summary_router
+from job_routes import router as job_router
 
 # Load environment variables
 load_dotenv()
@@ -38,8 +60,9 @@ app = FastAPI(title="YouTube Summary API", version="0.2.0")
 # Register authentication routes - add prefix to match frontend requests
 app.include_router(auth_router, prefix="/auth")
 
-# Create database tables
+# Create database tables, then add any new columns to existing tables
 Base.metadata.create_all(bind=engine)
+add_missing_columns(engine, Base.metadata)
 
 # Load environment variables
 load_dotenv()
@@ -49,7 +72,25 @@ openai_api_key = os.getenv("OPENROUTER_API_KEY")
 if not openai_api_key:
     print("Warning: OPENROUTER_API_KEY not found in environment variables")
 
+# Bump whenever the prompts change, so shared cached summaries are regenerated
+PROMPT_VERSION = "7"
+SUMMARY_FAILED_MESSAGE = "Summary generation failed. Please try again later."
+
+class SummaryGenerationError(Exception):
+    """The LLM calls failed to produce a summary (upstream failure, worth retrying later)."""
+
 app.include_router(summary_router, prefix="/api/summaries")
+app.include_router(job_router, prefix="/api/jobs")
+
+# Timeouts (seconds) for the concurrent transcript / metadata fetch stage
+TRANSCRIPT_FETCH_TIMEOUT = float(os.getenv("TRANSCRIPT_FETCH_TIMEOUT", "120"))
+METADATA_FETCH_TIMEOUT = float(os.getenv("METADATA_FETCH_TIMEOUT", "60"))
+
+# Chunked (map-reduce) summarization of long transcripts: when the token budget
+# planner (utils/token_budget.py) picks "chunked", the transcript windows are
+# summarized in parallel (at most SUMMARY_MAP_CONCURRENCY calls at a time)
+# and the partial notes are merged by the regular summary prompt
+SUMMARY_MAP_CONCURRENCY = int(os.getenv("SUMMARY_MAP_CONCURRENCY", "4"))
 
 # Define request and response models
 class VideoRequest(BaseModel):
@@ -74,244 +115,386 @@ class SummaryResponse(BaseModel):
     transcript: List[TranscriptEntry]
     chapters: List[Chapter]
 
-# Function to extract video ID from URL
-def extract_video_id(url: str) -> str:
+async def run_with_timeout(func, arg, timeout: float, label: str):
     """
-    Extract the video ID from a YouTube URL
+    Run a blocking fetch function in the blocking I/O pool with its own timeout
+    
+    Args:
+        func: Blocking function to call
+        arg: Single argument passed to func
+        timeout: Timeout in seconds
+        label: Human readable name used in error messages
+        
+    Returns:
+        Whatever func returns
+        
+    Raises:
+        Exception: If the call times out or func raises
     """
-    regex = r'(?:youtube\.com\/(?:[^\/\n\s]+\/\S+\/|(?:v|e(?:mbed)?)\/|\S*?[?&]v=)|youtu\.be\/)([a-zA-Z0-9_-]{11})'
-    match = re.search(regex, url)
-    if match:
-        return match.group(1)
-    return url  # If no match, assume the url is already a video ID
-
-# Function to get video metadata using yt-dlp
-def get_video_metadata(video_url: str) -> Dict[str, Any]:
+    start_time = time.time()
+    try:
+        result = await asyncio.wait_for(run_blocking(func, arg), timeout=timeout)
+    except asyncio.TimeoutError:
+        raise Exception(f"Timed out fetching {label} after {timeout:.0f} seconds")
+    print(f"[DEBUG] Fetched {label} in {time.time() - start_time:.2f} seconds")
+    return result
+
+async def fetch_transcript_and_metadata(video_id: str):
     """
-    Fetches metadata for a YouTube video using yt-dlp
+    Fetch the transcript and the video metadata concurrently
+    
+    Both fetches run in parallel, each with its own timeout. As soon as one
+    of them fails the other one is cancelled and the error is raised.
     
     Args:
-        video_url: YouTube URL or video ID
+        video_id: YouTube video ID
         
     Returns:
-        Dictionary containing title, description, and chapters
+        Tuple of (transcript, metadata)
         
     Raises:
-        Exception: If metadata retrieval fails
+        Exception: If either fetch fails or times out
     """
+    transcript_task = asyncio.create_task(
+        run_with_timeout(get_transcript, video_id, TRANSCRIPT_FETCH_TIMEOUT, "transcript")
+    )
+    metadata_task = asyncio.create_task(
+        run_with_timeout(load_video_metadata, video_id, METADATA_FETCH_TIMEOUT, "video metadata")
+    )
+    tasks = {transcript_task, metadata_task}
+    
     try:
-        # Ensure we have a full URL
-        if not video_url.startswith(('http://', 'https://')):
-            video_url = f"https://www.youtube.com/watch?v={video_url}"
-            
-        # Run yt-dlp to extract metadata
-        cmd = [
-            'yt-dlp',
-            '--skip-download',
-            '--print', 'webpage_url',
-            '--write-info-json',
-            '--no-warnings',
-            '--quiet',
-            video_url
-        ]
-        
-        # Execute the command
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        
-        # Get the video ID to find the info file
-        video_id = extract_video_id(video_url)
-        info_filename = f"{video_id}.info.json"
-        
-        # Read the info file
-        if os.path.exists(info_filename):
-            with open(info_filename, 'r') as f:
-                info = json.load(f)
-                
-            # Clean up the file
-            os.remove(info_filename)
-            
-            # Extract relevant information
-            title = info.get('title', 'Untitled Video')
-            description = info.get('description', '')
-            
-            # Extract chapters
-            chapters = []
-            if 'chapters' in info and info['chapters']:
-                for chapter in info['chapters']:
-                    chapters.append({
-                        'start_time': chapter.get('start_time', 0),
-                        'title': chapter.get('title', 'Unnamed Chapter')
-                    })
-            
-            return {
-                'title': title,
-                'description': description,
-                'chapters': chapters
-            }
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+        # Fail fast: surface the first error and stop waiting for the other fetch
+        for task in done:
+            if task.exception() is not None:
+                raise task.exception()
+        return transcript_task.result(), metadata_task.result()
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+
+def save_summary_for_user(user_id: int, result: Dict[str, Any], summary_type: str, language: str):
+    """
+    Save (or update) a user's summary in the database
+    
+    Runs synchronously with its own session, so callers on the event loop
+    must offload it with run_blocking.
+    
+    Args:
+        user_id: ID of the user the summary belongs to
+        result: Summary result (see build_summary_result)
+        summary_type: Summary type ("short" or "detailed")
+        language: Summary language code
+    """
+    video_id = result["video_id"]
+    video_duration = result.get("video_duration")
+    db = SessionLocal()
+    try:
+        # Find or create video record
+        video_db = db.query(Video).filter(Video.youtube_id == video_id).first()
+        
+        if not video_db:
+            # Create new video record
+            video_db = Video(
+                youtube_id=video_id,
+                title=result["title"],
+                channel=result.get("channel", ""),
+                duration=int(video_duration) if video_duration is not None else None,
+                thumbnail_url=result.get("thumbnail_url", "")
+            )
+            db.add(video_db)
+            db.commit()
+            db.refresh(video_db)
+        
+        # Check if summary already exists for this user and video
+        existing_summary = db.query(Summary).filter(
+            Summary.user_id == user_id,
+            Summary.video_id == video_db.id
+        ).first()
+        
+        # Update existing or create new record
+        if existing_summary:
+            existing_summary.summary_text = result["summary"]
+            existing_summary.transcript_text = result["enhanced_text"]
+            existing_summary.summary_type = summary_type
+            existing_summary.language = language
+            existing_summary.model = result.get("model")
+            existing_summary.shared_summary_id = result.get("shared_summary_id")
+            db.commit()
+            print(f"[DEBUG] Summary updated for user {user_id}")
         else:
-            # Try alternative approach if info file wasn't created
-            cmd = [
-                'yt-dlp',
-                '--skip-download',
-                '--dump-json',
-                video_url
-            ]
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            
-            if result.returncode == 0:
-                info = json.loads(result.stdout)
-                
-                # Extract relevant information
-                title = info.get('title', 'Untitled Video')
-                description = info.get('description', '')
-                
-                # Extract chapters
-                chapters = []
-                if 'chapters' in info and info['chapters']:
-                    for chapter in info['chapters']:
-                        chapters.append({
-                            'start_time': chapter.get('start_time', 0),
-                            'title': chapter.get('title', 'Unnamed Chapter')
-                        })
-                
-                return {
-                    'title': title,
-                    'description': description,
-                    'chapters': chapters
-                }
-            else:
-                raise Exception(f"Failed to extract metadata: {result.stderr}")
-    except Exception as e:
-        raise Exception(f"Error retrieving video metadata: {str(e)}")
+            # Create new summary
+            db_summary = Summary(
+                user_id=user_id,
+                video_id=video_db.id,
+                summary_text=result["summary"],
+                transcript_text=result["enhanced_text"],
+                summary_type=summary_type,
+                language=language,
+                model=result.get("model"),
+                shared_summary_id=result.get("shared_summary_id")
+            )
+            db.add(db_summary)
+            db.commit()
+            print(f"[DEBUG] Summary saved to database for user {user_id}")
+    finally:
+        db.close()
+
+def no_transcript_error(reason: Optional[str] = None) -> HTTPException:
+    """The 400 response for videos without a usable transcript."""
+    detail = {
+        "error": "No transcript available", 
+        "message": "This video does not have available subtitles/captions. Please try a video with subtitles enabled."
+    }
+    if reason:
+        detail["reason"] = reason
+    return HTTPException(status_code=400, detail=detail)
+
+# Format explanation added to the prompt
+TRANSCRIPT_FORMAT_NOTE = "\nNOTE: The transcript contains timestamp markers in the format [MM:SS] indicating the start time of each segment in the video."
+# Format explanation used instead when long transcripts were condensed into partial notes first
+PARTIAL_NOTES_FORMAT_NOTE = "\nNOTE: The input is not the raw transcript. It consists of detailed notes written for consecutive parts of the video, in chronological order. The [MM:SS] markers in the notes are timestamps taken from the transcript; use them for your sections."
+
+async def prepare_summary_input(video_id: str):
+    """
+    Fetch everything the summary step needs for a video
+    
+    Args:
+        video_id: YouTube video ID
+        
+    Returns:
+        SummaryInput with the transcript, metadata and everything derived
+        from them (merged segments, enhanced text, duration, reference points)
+        
+    Raises:
+        HTTPException: If the video has no usable transcript
+        Exception: If fetching the transcript or metadata fails
+    """
+    # Videos recently found to have no transcript fail before any network call
+    reason = no_transcript_cache.get(video_id)
+    if reason is not None:
+        print(f"[CACHE] {video_id} is known to have no transcript")
+        raise no_transcript_error(reason)
+    
+    # Get transcript (with fallback, yt-dlp included) and metadata in parallel
+    try:
+        transcript, metadata = await fetch_transcript_and_metadata(video_id)
+    except NoTranscriptError as e:
+        raise no_transcript_error(str(e))
+    
+    # Check if transcript is empty
+    if not transcript or len(transcript) == 0:
+        raise no_transcript_error()
+    
+    # Merge the 2-5 second caption cues into sentence-level segments, create
+    # enhanced text with one timestamp marker per segment and derive the
+    # duration, reference points and token estimate the prompt needs. That is
+    # a pass over every cue (~0.5s for a 36k-cue transcript), so off the event loop.
+    summary_input = await run_blocking(SummaryInput, video_id, transcript, metadata)
+    
+    # Check if enhanced text is empty (additional safety check)
+    if not summary_input.enhanced_text.strip():
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "error": "Empty transcript content", 
+                "message": "The transcript content is empty or could not be processed."
+            }
+        )
+    
+    print(f"[DEBUG] Merged {len(transcript)} cues into {len(summary_input.segments)} segments, enhanced text length: {len(summary_input.enhanced_text)} characters")
+    return summary_input
+
+def make_summary_result(summary_input: SummaryInput, summary: str, model: Optional[str] = None) -> Dict[str, Any]:
+    """Collect everything the endpoints, the shared cache and the database need about one summary."""
+    metadata = summary_input.metadata
+    return {
+        "video_id": summary_input.video_id,
+        "title": metadata["title"],
+        "description": metadata["description"],
+        "summary": summary,
+        "transcript": summary_input.transcript,
+        "chapters": metadata["chapters"],
+        "channel": metadata.get("channel", ""),
+        "thumbnail_url": metadata.get("thumbnail_url", ""),
+        "video_duration": summary_input.duration,
+        "enhanced_text": summary_input.enhanced_text,
+        "model": model
+    }
+
+def summary_cache_key(video_id: str, summary_type: str, language: str):
+    """Shared cache key for a summary of this video with the current model routing table and prompts."""
+    return make_cache_key(video_id, summary_type, language, ROUTING_VERSION, PROMPT_VERSION)
+
+async def lookup_cached_summary(video_id: str, summary_type: str, language: str) -> Optional[Dict[str, Any]]:
+    """Check the shared summary cache (in-process first, then the database)."""
+    cache_key = summary_cache_key(video_id, summary_type, language)
+    result = peek_cached_summary(cache_key)
+    if result is None:
+        try:
+            result = await run_blocking(get_cached_summary, cache_key)
+        except Exception as cache_err:
+            print(f"[DEBUG] Shared summary cache lookup failed: {str(cache_err)}")
+            return None
+    if result is not None:
+        print(f"[DEBUG] Shared summary cache hit for {video_id} ({summary_type}, {language})")
+    return result
+
+async def cache_summary_result(result: Dict[str, Any], summary_type: str, language: str):
+    """Store a generated summary in the shared cache."""
+    cache_key = summary_cache_key(result["video_id"], summary_type, language)
+    try:
+        result["shared_summary_id"] = await run_blocking(store_summary, cache_key, result)
+    except Exception as cache_err:
+        print(f"[DEBUG] Error storing summary in shared cache: {str(cache_err)}")
+
+async def build_summary_result(video_id: str, summary_type: str, language: str, on_stage=None) -> Dict[str, Any]:
+    """
+    Run the full pipeline for a video: transcript and metadata, then the summary
+    
+    The result is stored in the shared cross-user summary cache.
+    
+    Args:
+        video_id: YouTube video ID
+        summary_type: Summary type ("short" or "detailed")
+        language: Summary language code
+        on_stage: Optional coroutine function called with the name of each stage
+        
+    Returns:
+        Summary result dictionary (see make_summary_result)
+    """
+    if on_stage:
+        await on_stage("fetching_transcript")
+    summary_input = await prepare_summary_input(video_id)
+    
+    # Generate summary with the enhanced text
+    if on_stage:
+        await on_stage("generating_summary")
+    call_info = {}
+    summary = await generate_summary(summary_input, summary_type, language, call_info)
+    
+    result = make_summary_result(summary_input, summary, call_info.get("model"))
+    await cache_summary_result(result, summary_type, language)
+    return result
+
+# Concurrent requests for the same (video_id, summary_type, language) share one pipeline run
+summary_flights = SingleFlight()
+
+def summary_flight_key(video_id: str, summary_type: str, language: str):
+    """Single-flight key: the VideoRequest inputs after extract_video_id normalization."""
+    return (video_id, summary_type, language)
+
+def summary_response(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Pick the SummaryResponse fields out of a summary result."""
+    return {
+        "video_id": result["video_id"],
+        "title": result["title"],
+        "description": result["description"],
+        "summary": result["summary"],
+        # Dict form only here, at the API boundary
+        "transcript": transcript_entries(result["transcript"]),
+        "chapters": result["chapters"]
+    }
+
+async def run_summary_job(job: Dict[str, Any], set_stage) -> Dict[str, Any]:
+    """
+    Job handler for async mode: transcript -> metadata -> LLM -> DB
+    
+    Args:
+        job: Job dictionary from the queue
+        set_stage: Coroutine function recording the current stage
+        
+    Returns:
+        The SummaryResponse fields, stored as the job result
+        
+    Raises:
+        PermanentJobError: If the video cannot be summarized at all
+        Exception: For failures worth retrying (e.g. SummaryGenerationError)
+    """
+    video_id, summary_type, language = job["video_id"], job["summary_type"], job["language"]
+    
+    result = await lookup_cached_summary(video_id, summary_type, language)
+    if result is None:
+        try:
+            result = await summary_flights.do(
+                summary_flight_key(video_id, summary_type, language),
+                build_summary_result, video_id, summary_type, language, set_stage
+            )
+        except HTTPException as e:
+            raise PermanentJobError(json.dumps(e.detail, ensure_ascii=False) if isinstance(e.detail, dict) else str(e.detail))
+    
+    if job["user_id"]:
+        await set_stage("saving")
+        await run_blocking(save_summary_for_user, job["user_id"], result, summary_type, language)
+    
+    return summary_response(result)
+
+# Bounded worker pool for async mode jobs (started with the app)
+job_workers = JobWorkerPool(run_summary_job)
+
+# Keeps transcripts_cache/ within its size budget off the request path
+cache_janitor = CacheJanitor(cache_index)
 
 # Route for video summarization
 @app.post("/api/summarize", response_model=SummaryResponse)
 async def summarize_video(
     request: VideoRequest, 
-    current_user: Optional[User] = Depends(get_current_user_optional),
-    db: Session = Depends(get_db)
+    mode: str = Query("sync", description="'sync' waits for the summary, 'async' returns a job id to poll at /api/jobs/{id}"),
+    current_user: Optional[User] = Depends(get_current_user_optional)
 ):
     try:
         # Extract video ID if a full URL was provided
         video_id = extract_video_id(request.video_id)
         
-        # Get transcript using fallback (yt-dlp included)
-        transcript = get_transcript(video_id)
-        
-        # Check if transcript is empty
-        if not transcript or len(transcript) == 0:
-            raise HTTPException(
-                status_code=400,
-                detail={
-                    "error": "No transcript available", 
-                    "message": "This video does not have available subtitles/captions. Please try a video with subtitles enabled."
-                }
+        # Async mode: enqueue a job and return immediately
+        if mode == "async":
+            job = await run_blocking(
+                create_job,
+                current_user.id if current_user else None,
+                video_id,
+                request.summary_type,
+                request.language
             )
-        
-        # Get video metadata
-        metadata = get_video_metadata(video_id)
-        
-        # Create enhanced text with timestamps for each entry
-        enhanced_text = ""
-        
-        # Convert each transcript entry to a format with timestamp markers
-        for entry in transcript:
-            # Format time as MM:SS
-            minutes = int(entry['start'] // 60)
-            seconds = int(entry['start'] % 60)
-            time_marker = f"[{minutes}:{seconds:02d}] "
-            
-            # Add text with timestamp marker
-            enhanced_text += time_marker + entry.get('text', '') + " "
-        
-        # Add video end timestamp
-        if transcript and len(transcript) > 0:
-            last_entry = transcript[-1]
-            video_duration = last_entry['start'] + last_entry['duration']
-            minutes = int(video_duration // 60)
-            seconds = int(video_duration % 60)
-            enhanced_text += f"[{minutes}:{seconds:02d}] End of video."
-        
-        # Check if enhanced text is empty (additional safety check)
-        if not enhanced_text.strip():
-            raise HTTPException(
-                status_code=400,
-                detail={
-                    "error": "Empty transcript content", 
-                    "message": "The transcript content is empty or could not be processed."
+            job_workers.notify()
+            return JSONResponse(
+                status_code=status.HTTP_202_ACCEPTED,
+                content={
+                    "job_id": job["job_id"],
+                    "status": job["status"],
+                    "status_url": f"/api/jobs/{job['job_id']}"
                 }
             )
         
-        print(f"[DEBUG] Enhanced text length: {len(enhanced_text)} characters")
-            
-        # Add format explanation to the prompt
-        format_note = "\nNOTE: The transcript contains timestamp markers in the format [MM:SS] indicating the start time of each segment in the video."
-            
-        # Generate summary with the enhanced text
-        summary = generate_summary(enhanced_text, request.summary_type, metadata, request.language, format_note)
+        # Shared cross-user cache: repeat requests skip the transcript fetch and the LLM call
+        result = await lookup_cached_summary(video_id, request.summary_type, request.language)
+        if result is None:
+            # Concurrent duplicates await the same transcript fetch and LLM call
+            result = await summary_flights.do(
+                summary_flight_key(video_id, request.summary_type, request.language),
+                build_summary_result, video_id, request.summary_type, request.language
+            )
         
-        # If user is logged in, save summary to database
+        # If user is logged in, save summary to database (off the event loop)
         if current_user:
             try:
-                # Find or create video record
-                video_db = db.query(Video).filter(Video.youtube_id == video_id).first()
-                
-                if not video_db:
-                    # Create new video record
-                    video_db = Video(
-                        youtube_id=video_id,
-                        title=metadata["title"],
-                        channel=metadata.get("channel", ""),
-                        duration=int(video_duration) if 'video_duration' in locals() else None,
-                        thumbnail_url=metadata.get("thumbnail_url", "")
-                    )
-                    db.add(video_db)
-                    db.commit()
-                    db.refresh(video_db)
-                
-                # Check if summary already exists for this user and video
-                existing_summary = db.query(Summary).filter(
-                    Summary.user_id == current_user.id,
-                    Summary.video_id == video_db.id
-                ).first()
-                
-                # Update existing or create new record
-                if existing_summary:
-                    existing_summary.summary_text = summary
-                    existing_summary.transcript_text = enhanced_text
-                    existing_summary.summary_type = request.summary_type
-                    existing_summary.language = request.language
-                    db.commit()
-                    print(f"[DEBUG] Summary updated for user {current_user.username}")
-                else:
-                    # Create new summary
-                    db_summary = Summary(
-                        user_id=current_user.id,
-                        video_id=video_db.id,
-                        summary_text=summary,
-                        transcript_text=enhanced_text,
-                        summary_type=request.summary_type,
-                        language=request.language
-                    )
-                    db.add(db_summary)
-                    db.commit()
-                    print(f"[DEBUG] Summary saved to database for user {current_user.username}")
+                await run_blocking(save_summary_for_user, current_user.id, result, request.summary_type, request.language)
             except Exception as db_err:
                 print(f"[DEBUG] Error saving summary to database: {str(db_err)}")
                 # Continue even if database save fails
         
         # Return response
-        return {
-            "video_id": video_id,
-            "title": metadata["title"],
-            "description": metadata["description"],
-            "summary": summary,
-            "transcript": transcript,
-            "chapters": metadata["chapters"]
-        }
+        return summary_response(result)
     except HTTPException:
         # Re-raise HTTP exceptions as-is
         raise
+    except SummaryGenerationError:
+        # Upstream failures are reported, never returned or saved as a summary
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail={"error": "Summary generation failed", "message": SUMMARY_FAILED_MESSAGE}
+        )
     except Exception as e:
         error_message = str(e)
         print(f"Error in summarize_video: {error_message}")
@@ -321,450 +504,478 @@ async def summarize_video(
             detail={"error": error_message, "message": "Failed to process video"}
         )
 
-# Function to generate summary using OpenRouter API with Claude 3.7 Sonnet
-def generate_summary(text: str, summary_type: str, metadata: Optional[Dict[str, Any]] = None, language: str = "en", format_note: str = "") -> str:
-    # Define enhanced prompts that include video metadata
-    if metadata:
-        title = metadata.get("title", "")
-        description = metadata.get("description", "")
-        chapters = metadata.get("chapters", [])
-        
-        # Calculate approximate video duration from transcript
-        # The transcript contains entries with start time and duration
-        transcript_duration = 0
+def format_sse(event: str, data: Dict[str, Any]) -> str:
+    """Format one server-sent event with a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+# Route for streaming video summarization (server-sent events)
+@app.post("/api/summarize/stream")
+async def summarize_video_stream(
+    request: VideoRequest,
+    current_user: Optional[User] = Depends(get_current_user_optional)
+):
+    """
+    Same pipeline as /api/summarize, but the summary is streamed as it is generated
+    
+    Events:
+        status: sent immediately, before any network work starts
+        metadata: video title, description, chapters and transcript
+        token: a piece of summary text ({"text": ...})
+        done: the summary is complete (and saved for logged in users)
+        error: processing failed ({"error": ..., "message": ...})
+    """
+    video_id = extract_video_id(request.video_id)
+    user_id = current_user.id if current_user else None
+    
+    async def event_stream():
+        # Send the first byte right away so the client is not left waiting on the fetch stage
+        yield format_sse("status", {"stage": "fetching_transcript", "video_id": video_id})
+        
+        # Shared summary cache hit: send the whole summary at once
+        flight_key = summary_flight_key(video_id, request.summary_type, request.language)
+        result = await lookup_cached_summary(video_id, request.summary_type, request.language)
+        
+        streamed = False
+        if result is None:
+            flight = summary_flights.get_inflight(flight_key)
+            events = None
+            if flight is None:
+                # Lead the flight: the generation runs as its own task, so this client going
+                # away only ends this response, not the requests waiting on the same summary
+                events = asyncio.Queue()
+                flight = summary_flights.start(flight_key, generate_streamed_summary, events)
+            try:
+                if events is not None:
+                    while True:
+                        event = await events.get()
+                        if event is None:
+                            break
+                        yield event
+                # Joiners wait for the other request's result
+                result = await asyncio.shield(flight)
+            except HTTPException as e:
+                yield format_sse("error", e.detail if isinstance(e.detail, dict) else {"error": str(e.detail)})
+                return
+            except SummaryGenerationError as e:
+                yield format_sse("error", {"error": str(e), "message": SUMMARY_FAILED_MESSAGE})
+                return
+            except Exception as e:
+                yield format_sse("error", {"error": str(e), "message": "Failed to process video"})
+                return
+            streamed = events is not None
+        
+        if not streamed:
+            response = summary_response(result)
+            summary = response.pop("summary")
+            yield format_sse("metadata", response)
+            yield format_sse("token", {"text": summary})
+        
+        # If user is logged in, save the final text the same way /api/summarize does
+        if user_id:
+            try:
+                await run_blocking(save_summary_for_user, user_id, result, request.summary_type, request.language)
+            except Exception as db_err:
+                print(f"[DEBUG] Error saving summary to database: {str(db_err)}")
+        
+        yield format_sse("done", {"video_id": video_id} if streamed else {"video_id": video_id, "cached": True})
+    
+    async def generate_streamed_summary(events: asyncio.Queue) -> Dict[str, Any]:
+        """Run the pipeline for the leading request, putting metadata and token events on events."""
         try:
-            # Assuming 'text' is the full transcript joined together, but we need to extract timing information
-            # from the original transcript which should be available in transcript_entries
-            transcript_entries = []
-            if not isinstance(text, str):
-                # If text is the raw transcript list
-                transcript_entries = text
-            else:
-                # Try to parse from the JSON string if it's embedded
-                import re
-                import json
-                transcript_match = re.search(r'\[.*\]', text)
-                if transcript_match:
-                    try:
-                        transcript_entries = json.loads(transcript_match.group(0))
-                    except:
-                        pass
-                
-            if transcript_entries:
-                last_entry = transcript_entries[-1]
-                if isinstance(last_entry, dict) and 'start' in last_entry and 'duration' in last_entry:
-                    transcript_duration = last_entry['start'] + last_entry['duration']
-        except:
-            # Fallback to a reasonable default if we can't determine
-            transcript_duration = 3600  # 1 hour default
-            
-        # Format chapters for the prompt if available
-        chapters_text = ""
-        if chapters:
-            chapters_text = "Video chapters:\n"
-            for chapter in chapters:
-                time_formatted = f"{int(chapter['start_time'] // 60)}:{int(chapter['start_time'] % 60):02d}"
-                chapters_text += f"- {time_formatted}: {chapter['title']}\n"
+            try:
+                summary_input = await prepare_summary_input(video_id)
+            except HTTPException:
+                raise
+            except Exception as e:
+                print(f"Error in summarize_video_stream: {str(e)}")
+                raise
             
-            chapters_text += f"\nNOTE: The video duration is approximately {int(transcript_duration // 60)}:{int(transcript_duration % 60):02d}."
-        else:
-            # If there are no chapters, still inform about the video duration
-            chapters_text = f"NOTE: The video duration is approximately {int(transcript_duration // 60)}:{int(transcript_duration % 60):02d}."
-        
-        # Language instructions
-        language_instructions = ""
-        if language != "en":
-            language_map = {
-                "zh": "Chinese (中文)",
-                "es": "Spanish (Español)",
-                "fr": "French (Français)",
-                "de": "German (Deutsch)",
-                "ja": "Japanese (日本語)",
-                "ko": "Korean (한국어)",
-            }
-            target_language = language_map.get(language, language)
-            # Special instructions for different languages
-            if language == "zh":
-                # Chinese requires more characters to express equivalent content
-                language_instructions = f"""
-\nPlease provide your response in {target_language}.
-
-LANGUAGE-SPECIFIC INSTRUCTIONS FOR CHINESE:
-- Chinese summaries should be clear and concise, using appropriate character count
-- Length requirements (must follow):
-  * short summary type:
-    - Videos under 10 minutes: ~50-70 characters per minute
-    - 10-30 minute videos: ~40-60 characters per minute (minimum 500 characters total)
-    - 30-60 minute videos: ~30-50 characters per minute (minimum 1200 characters total)
-    - Videos over 60 minutes: ~25-40 characters per minute (minimum 2000 characters total)
-  * detailed summary type:
-    - Videos under 10 minutes: ~80-100 characters per minute
-    - 10-30 minute videos: ~70-90 characters per minute (minimum 1000 characters total)
-    - 30-60 minute videos: ~60-80 characters per minute (minimum 2500 characters total)
-    - Videos over 60 minutes: ~50-70 characters per minute (minimum 3500 characters total)
-- Use natural Chinese expressions, avoid direct translations from English
-- Ensure each timestamp section is concise and appropriately detailed
-
-Format example:
-0:00 - [Section title]
-Content summary... (control character count based on summary type)
-
-2:15 - [Section title]
-Content summary... (control character count based on summary type)
-"""
-            else:
-                language_instructions = f"\nPlease provide your response in {target_language}."
-        else:
-            # 英文特殊指导
-            language_instructions = """
-ENGLISH-SPECIFIC INSTRUCTIONS:
-- English summaries must be comprehensive and detailed
-- For videos under 60 minutes, use the higher end of the word count range
-- Include specific quotes and details from the video
-- DO NOT make the summary too short - utilize the full context window
-- If the video discusses complex topics, provide even more detailed explanations
-"""
-        
-        # Add format note to instructions
-        if format_note:
-            if language_instructions:
-                language_instructions = format_note + language_instructions
-            else:
-                language_instructions = format_note
-        
-        # Enhanced prompts using metadata
-        prompts = {
-            "short": f"""You are analyzing a YouTube video titled "{title}".
-
-IMPORTANT: All section titles must be plain text. Do NOT use asterisks, stars, or markdown formatting for section titles. Section titles must not be bold, italic, or surrounded by any special symbols.
-
-Video description:
-{description}
-
-{chapters_text}
-
-Please create a concise summary of the video transcript. Your summary must:
-1. Cover the ENTIRE video content (unless the video is over 2 hours, then you may summarize the first 2 hours)
-2. Divide the content into sections based on natural topic shifts in the transcript
-3. Start each section with an ACCURATE timestamp (MM:SS format) directly from the transcript markers
-4. Each section must start with a short, descriptive section title summarizing the main point of that section.
-5. Present timestamps in STRICT chronological order (from beginning to end)
-6. LENGTH REQUIREMENT (CRITICAL):
-   - For videos under 10 minutes: 40-60 words/characters per minute of video
-   - For videos 10-30 minutes: 30-50 words/characters per minute (minimum 400 words total)
-   - For videos 30-60 minutes: 25-40 words/characters per minute (minimum 900 words total)
-   - For videos over 60 minutes: 20-30 words/characters per minute (minimum 1800 words total)
-   - For Chinese content: character counts should be 1.5-2x the above word counts
-7. Focus on main points, keep explanations brief but comprehensive
-
-Example format:
-Correct example:
-0:00 - Section Title
-Brief description of this section
-
-2:15 - Section Title
-Brief description of another section
-
-Incorrect examples (do NOT use these):
-0:00 - **Section Title**
-0:00 - *Section Title*
-0:00 - __Section Title__
-
-etc.
-
-CRITICAL RULES:
-- Each line in the transcript has a timestamp in the [MM:SS] format. USE THESE TIMESTAMPS to mark the beginning of your summary sections.
-- If the video has chapters, use those chapter timestamps as primary section dividers.
-- For videos without chapters, identify natural topic shifts in the transcript and use the timestamps at those points.
-- Your summary MUST cover the complete video content in chronological order.
-- Ensure balanced coverage - don't focus too much on early parts and rush through later parts.
-- YOU MUST MEET THE MINIMUM LENGTH REQUIREMENTS specified above. DO NOT make the summary too short.
-- Never generate timestamps that exceed the video duration.
-- Each section must start with a short, descriptive section title summarizing the main point of that section.
-- Do NOT use asterisks, stars, or markdown formatting for section titles. Section titles must be plain text only, with no special symbols.
-
-The summary should help viewers quickly understand the entire video's content.{language_instructions}""",
+            metadata = summary_input.metadata
+            events.put_nowait(format_sse("metadata", {
+                "video_id": video_id,
+                "title": metadata["title"],
+                "description": metadata["description"],
+                "transcript": summary_input.transcript.to_entries(),
+                "chapters": metadata["chapters"]
+            }))
             
-            "detailed": f"""You are analyzing a YouTube video titled "{title}".
-
-IMPORTANT: All section titles must be plain text. Do NOT use asterisks, stars, or markdown formatting for section titles. Section titles must not be bold, italic, or surrounded by any special symbols.
-
-Video description:
-{description}
-
-{chapters_text}
-
-Please provide a detailed summary of the video transcript. Your summary must:
-1. Cover the ENTIRE video content (unless the video is over 2 hours, then you may summarize the first 2 hours)
-2. Organize the summary by natural content sections (topic changes in the transcript)
-3. Start each section with an ACCURATE timestamp (MM:SS format) directly from the transcript markers
-4. Each section must start with a short, descriptive section title summarizing the main point of that section.
-5. Present timestamps in STRICT chronological order (from beginning to end)
-6. LENGTH REQUIREMENT (CRITICAL):
-   - For videos under 10 minutes: 80-120 words/characters per minute of video
-   - For videos 10-30 minutes: 60-90 words/characters per minute (minimum 800 words total)
-   - For videos 30-60 minutes: 50-70 words/characters per minute (minimum 1800 words total)
-   - For videos over 60 minutes: 40-60 words/characters per minute (minimum 3000 words total)
-   - For Chinese content: character counts should be 1.5-2x the above word counts
-7. Include specific details, examples, and insights from each section
-
-Your summary should follow this format:
-Correct example:
-0:00 - Section Title
-Detailed summary of this section's content...
-
-2:15 - Section Title
-Detailed summary of this section's content...
-
-Incorrect examples (do NOT use these):
-0:00 - **Section Title**
-0:00 - *Section Title*
-0:00 - __Section Title__
-
-etc.
-
-CRITICAL RULES:
-- Each line in the transcript has a timestamp in the [MM:SS] format. USE THESE TIMESTAMPS to mark the beginning of your summary sections.
-- If the video has chapters, use those chapter timestamps as primary section dividers.
-- For videos without chapters, identify natural topic shifts in the transcript and use the timestamps at those points.
-- Your summary MUST cover the complete video content in chronological order.
-- Ensure balanced coverage - don't focus too much on early parts and rush through later parts.
-- YOU MUST MEET THE MINIMUM LENGTH REQUIREMENTS specified above. DO NOT make the summary too short.
-- Include concrete details, quotes, examples and specific points from the video.
-- Never generate timestamps that exceed the video duration.
-- Each section must start with a short, descriptive section title summarizing the main point of that section.
-- Do NOT use asterisks, stars, or markdown formatting for section titles. Section titles must be plain text only, with no special symbols.
-
-The goal is to create a well-structured, comprehensive summary that covers the entire video's content while highlighting the most important information.{language_instructions}"""
-        }
-    else:
-        # Language instructions
-        language_instructions = ""
-        if language != "en":
-            language_map = {
-                "zh": "Chinese (中文)",
-                "es": "Spanish (Español)",
-                "fr": "French (Français)",
-                "de": "German (Deutsch)",
-                "ja": "Japanese (日本語)",
-                "ko": "Korean (한국어)",
-            }
-            target_language = language_map.get(language, language)
-            # Special instructions for different languages
-            if language == "zh":
-                # Chinese requires more characters to express equivalent content
-                language_instructions = f"""
-\nPlease provide your response in {target_language}.
-
-LANGUAGE-SPECIFIC INSTRUCTIONS FOR CHINESE:
-- Chinese summaries should be clear and concise, using appropriate character count
-- Length requirements (must follow):
-  * short summary type:
-    - Videos under 10 minutes: ~50-70 characters per minute
-    - 10-30 minute videos: ~40-60 characters per minute (minimum 500 characters total)
-    - 30-60 minute videos: ~30-50 characters per minute (minimum 1200 characters total)
-    - Videos over 60 minutes: ~25-40 characters per minute (minimum 2000 characters total)
-  * detailed summary type:
-    - Videos under 10 minutes: ~80-100 characters per minute
-    - 10-30 minute videos: ~70-90 characters per minute (minimum 1000 characters total)
-    - 30-60 minute videos: ~60-80 characters per minute (minimum 2500 characters total)
-    - Videos over 60 minutes: ~50-70 characters per minute (minimum 3500 characters total)
-- Use natural Chinese expressions, avoid direct translations from English
-- Ensure each timestamp section is concise and appropriately detailed
-
-Format example:
-0:00 - [Section title]
-Content summary... (control character count based on summary type)
-
-2:15 - [Section title]
-Content summary... (control character count based on summary type)
-"""
-            else:
-                language_instructions = f"\nPlease provide your response in {target_language}."
+            # Forward tokens as soon as the model produces them
+            summary_parts = []
+            call_info = {}
+            try:
+                async for delta in stream_summary(summary_input, request.summary_type, request.language, call_info):
+                    summary_parts.append(delta)
+                    events.put_nowait(format_sse("token", {"text": delta}))
+            except Exception as e:
+                print(f"Error generating streamed summary: {str(e)}")
+                raise SummaryGenerationError(str(e)) from e
             
-        # Add format note to instructions
-        if format_note:
-            if language_instructions:
-                language_instructions = format_note + language_instructions
-            else:
-                language_instructions = format_note
+            summary = "".join(summary_parts)
+            print(f"[DEBUG] Streamed summary length: {len(summary)} characters")
             
-        # Original prompts if no metadata is available
-        prompts = {
-            "short": f"""Please create a concise summary of the video transcript. Your summary must:
-1. Cover the ENTIRE video content (unless the video is over 2 hours, then you may summarize the first 2 hours)
-2. Divide the content into 3-5 sections based on natural topic shifts in the transcript
-3. Start each section with an ACCURATE timestamp (MM:SS format) derived DIRECTLY from the transcript
-4. Present timestamps in STRICT chronological order (from beginning to end)
-5. Adjust summary length based on video duration - use approximately 20-30 words per minute of video
-6. Focus on main points, keep explanations brief but comprehensive
-
-Example format:
-0:00 - Brief description of this section
-2:15 - Brief description of another section
-etc.
-
-CRITICAL RULES:
-- DO NOT INVENT OR HALLUCINATE ANY TIMESTAMPS. Only use timestamps that appear in the [MM:SS] format in the transcript.
-- Your summary MUST cover the complete video content in chronological order
-- Only use timestamps that are explicitly marked in the transcript
-- Ensure balanced coverage - don't focus too much on early parts and rush through later parts
-- Keep the total summary length proportional to video length (20-30 words per minute)
-- Never introduce timestamps that exceed the video duration
-
-The summary should help viewers quickly understand the entire video's content.{language_instructions}""",
-
-            "detailed": f"""Please provide a detailed summary of the video transcript. Your summary must:
-1. Cover the ENTIRE video content (unless the video is over 2 hours, then you may summarize the first 2 hours)
-2. Organize the summary into 4-6 logical sections based on content shifts in the transcript
-3. Start each section with an ACCURATE timestamp (MM:SS format) derived DIRECTLY from the transcript
-4. Present timestamps in STRICT chronological order (from beginning to end)
-5. Adjust summary length based on video duration - use approximately 40-70 words per minute of video
-6. Include specific details, examples, and insights from each section
-
-Your summary should follow this format:
-0:00 - [Section Title]
-Detailed summary of this section's content...
-
-2:15 - [Section Title]
-Detailed summary of this section's content...
-
-etc.
-
-CRITICAL RULES:
-- DO NOT INVENT OR HALLUCINATE ANY TIMESTAMPS. Only use timestamps that appear in the [MM:SS] format in the transcript.
-- Your summary MUST cover the complete video content in chronological order
-- Only use timestamps that are explicitly marked in the transcript
-- Ensure balanced coverage - don't focus too much on early parts and rush through later parts
-- Keep the total summary length proportional to video length (40-70 words per minute)
-- Provide more details than the concise summary, but still focus on what's most important
-- Never introduce timestamps that exceed the video duration
-
-The goal is to create a well-structured, comprehensive summary that covers the entire video's content while highlighting the most important information.{language_instructions}"""
+            result = make_summary_result(summary_input, summary, call_info.get("model"))
+            await cache_summary_result(result, request.summary_type, request.language)
+            return result
+        finally:
+            # No more events: the leading response (if still connected) picks up the result
+            events.put_nowait(None)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            # Disable proxy buffering (nginx) so tokens reach the client immediately
+            "X-Accel-Buffering": "no",
         }
+    )
+
+# Function to build the system prompt for a summary request
+def build_system_prompt(summary_input: SummaryInput, summary_type: str, language: str = "en", format_note: str = "") -> Tuple[str, str]:
+    """
+    Render the system prompt from the template registry
     
-    try:
-        # Calculate video duration directly from the text if possible
-        match = re.search(r'\[(\d+:\d+)\]\s*End of video', text)
-        if match:
-            video_duration_str = match.group(1)
-            # Add video duration to prompt
-            video_duration_text = f"\nIMPORTANT: The video's EXACT duration is {video_duration_str}. DO NOT generate timestamps beyond this time."
-            
-            # Extract minutes and seconds for calculating expected output length
-            duration_parts = video_duration_str.split(':')
-            if len(duration_parts) == 2:
-                minutes = int(duration_parts[0])
-                seconds = int(duration_parts[1])
-                total_minutes = minutes + seconds/60
-                
-                # Add expected length guidance based on video duration
-                if summary_type == "detailed":
-                    expected_words = 0
-                    if total_minutes <= 10:
-                        expected_words = int(total_minutes * 100)
-                    elif total_minutes <= 30:
-                        expected_words = int(10 * 100 + (total_minutes - 10) * 75)
-                    elif total_minutes <= 60:
-                        expected_words = int(10 * 100 + 20 * 75 + (total_minutes - 30) * 60)
-                    else:
-                        expected_words = int(10 * 100 + 20 * 75 + 30 * 60 + (total_minutes - 60) * 50)
-                    
-                    if language == "zh":
-                        expected_words = int(expected_words * 1.7)  # 中文字符需要更多
-                    
-                    length_guidance = f"\nYour summary should be approximately {expected_words} words/characters in length to adequately cover this {int(total_minutes)}-minute video."
-                else:
-                    expected_words = 0
-                    if total_minutes <= 10:
-                        expected_words = int(total_minutes * 50)
-                    elif total_minutes <= 30:
-                        expected_words = int(10 * 50 + (total_minutes - 10) * 40)
-                    elif total_minutes <= 60:
-                        expected_words = int(10 * 50 + 20 * 40 + (total_minutes - 30) * 35)
-                    else:
-                        expected_words = int(10 * 50 + 20 * 40 + 30 * 35 + (total_minutes - 60) * 25)
-                    
-                    if language == "zh":
-                        expected_words = int(expected_words * 1.7)  # 中文字符需要更多
-                    
-                    length_guidance = f"\nYour summary should be approximately {expected_words} words/characters in length to adequately cover this {int(total_minutes)}-minute video."
-                
-                # Add length guidance to prompts
-                video_duration_text += length_guidance
-            
-            for summary_type_key in prompts:
-                if isinstance(prompts[summary_type_key], dict) and "system_content" in prompts[summary_type_key]:
-                    prompts[summary_type_key]["system_content"] += video_duration_text
-                else:
-                    prompts[summary_type_key] += video_duration_text
-        
-        # Extract reference timestamps to help the model
-        time_points = []
-        time_matches = re.finditer(r'\[(\d+:\d+)\]\s*([^\[]+)', text)
-        
-        # Take approximately 10 evenly spaced timestamps as reference points
-        all_matches = list(time_matches)
-        if all_matches:
-            step = max(1, len(all_matches) // 10)
-            for i in range(0, len(all_matches), step):
-                if i < len(all_matches):
-                    match = all_matches[i]
-                    timestamp = match.group(1)
-                    sample_text = match.group(2).strip()[:50] + ('...' if len(match.group(2).strip()) > 50 else '')
-                    time_points.append(f"{timestamp} - \"{sample_text}\"")
-        
-            # Add reference timestamps to prompt
-            if time_points:
-                time_points_text = "\n\nReference timestamps in transcript (MM:SS - text sample):\n" + "\n".join(time_points)
-                
-                if isinstance(prompts[summary_type], dict) and "system_content" in prompts[summary_type]:
-                    prompts[summary_type]["system_content"] += time_points_text
-                else:
-                    prompts[summary_type] += time_points_text
-        
-        # Use OpenRouter API to generate summary with Claude 3.7 Sonnet
-        client = OpenAI(
-            api_key=openai_api_key,
-            base_url="https://openrouter.ai/api/v1",
+    Only the requested summary type is rendered: its static prefix is a
+    precompiled constant, followed by the per-video block.
+    
+    Returns:
+        Tuple of (static prefix, per-video block)
+    """
+    template = get_summary_template(summary_type, with_metadata=bool(summary_input.metadata))
+    system_prompt = template.render(summary_input, summary_type, language, format_note)
+    print(f"[DEBUG] System prompt length: {len(system_prompt[0]) + len(system_prompt[1])}")
+    return system_prompt
+
+@lru_cache(maxsize=32)
+def static_prefix_tokens(static_prefix: str) -> int:
+    """Token estimate of a static prompt prefix (the prefixes are constants, so estimate each once)."""
+    return estimate_tokens(static_prefix)
+
+def summary_messages(system_prompt: Tuple[str, str], content: str) -> List[Dict[str, Any]]:
+    """Chat messages of a summary call: the system prompt (static prefix, then the per-video block) and the input."""
+    static_prefix, dynamic_block = system_prompt
+    return [
+        {"role": "system", "content": f"{static_prefix}\n\n{dynamic_block}"},
+        {"role": "user", "content": content}
+    ]
+
+def strip_end_marker(text: str) -> str:
+    """Cut a summary at the end marker, in case the provider did not apply the stop sequence."""
+    if SUMMARY_END_MARKER in text:
+        text = text.split(SUMMARY_END_MARKER, 1)[0]
+    return text.rstrip()
+
+async def until_end_marker(deltas: AsyncIterator[str]) -> AsyncIterator[str]:
+    """
+    Pass streamed text through until the summary end marker shows up
+    
+    The marker can arrive split over several chunks, so the last
+    len(marker) - 1 characters are held back until it is clear they do not
+    start it.
+    """
+    pending = ""
+    keep = len(SUMMARY_END_MARKER) - 1
+    async for delta in deltas:
+        pending += delta
+        if SUMMARY_END_MARKER in pending:
+            head = pending.split(SUMMARY_END_MARKER, 1)[0].rstrip()
+            if head:
+                yield head
+            return
+        if len(pending) > keep:
+            yield pending[:-keep]
+            pending = pending[-keep:]
+    if pending:
+        yield pending
+
+def check_summary_complete(summary: str, finish_reason: Optional[str], max_tokens: int):
+    """
+    Reject summaries that must not be cached or saved
+    
+    Raises:
+        SummaryGenerationError: If the model hit the output cap or returned no text
+    """
+    if finish_reason == "length":
+        raise SummaryGenerationError(f"Summary was cut off at the output cap of {max_tokens} tokens")
+    if not summary.strip():
+        raise SummaryGenerationError("Model returned an empty summary")
+
+def record_llm_usage(kind: str, usage: Any) -> Optional[Dict[str, int]]:
+    """Add the usage of one response to the metrics and log its prompt cache hits; returns the recorded counts."""
+    counts = llm_usage.record(kind, usage)
+    if counts:
+        print(f"[DEBUG] {kind} call usage: prompt={counts['prompt_tokens']} (cached={counts['cached_tokens']}), completion={counts['completion_tokens']}")
+    return counts
+
+async def summarize_window(window: Transcript, index: int, count: int, metadata: Optional[Dict[str, Any]],
+                           max_tokens: int, deadline: float) -> str:
+    """Summarize one transcript window into timestamped notes."""
+    start = window.start_time
+    end = window.end_time
+    system_prompt = render_window_prompt(metadata, index, count, start, end)
+    content = create_enhanced_text(window, end_marker=False)
+    client = get_llm_client()
+    
+    async def call(model: str):
+        await llm_rate_limiter.acquire(deadline)
+        return await client.chat.completions.create(
+            model=model,
+            messages=summary_messages(system_prompt, content),
+            max_tokens=max_tokens,
+            temperature=0.3,
         )
-        print(f"[DEBUG] System prompt length: {len(prompts[summary_type])}")
-        print(f"[DEBUG] Transcript text length: {len(text)}")
+    
+    response, model = await call_with_fallback(
+        route_models("window", estimate_tokens(content)), call, attempt_timeout(max_tokens), deadline, "window"
+    )
+    record_llm_usage("window", response.usage)
+    notes = response.choices[0].message.content
+    print(f"[DEBUG] Window {index + 1}/{count} notes length: {len(notes)} characters ({model})")
+    return notes
+
+async def condense_transcript(summary_input: SummaryInput, plan: Dict[str, Any], deadline: float) -> str:
+    """
+    Map step of chunked summarization
+    
+    The transcript is split into the windows the budget plan asked for, the
+    windows are summarized in parallel, and the merged notes replace the
+    transcript as input to the final summary call.
+    
+    Args:
+        summary_input: Summary input of the video (its merged segments are split)
+        plan: Budget plan from plan_summary_budget (mode "chunked")
+        deadline: time.monotonic() value by which the LLM calls have to be done
         
-        try:
-            response = client.chat.completions.create(
-                model="anthropic/claude-sonnet-4.5",
-                messages=[
-                    {"role": "system", "content": prompts[summary_type]},
-                    {"role": "user", "content": text}
-                ],
-                max_tokens=10000,
+    Returns:
+        Merged, timestamped notes ending with the video end marker
+        
+    Raises:
+        Exception: If a window summary fails
+    """
+    metadata = summary_input.metadata
+    windows = split_transcript_windows(summary_input.segments, plan["window_tokens"])
+    # Entry boundaries can add a window; the merged notes still have to fit the final call
+    window_output_tokens = max(1, min(plan["window_output_tokens"], plan["input_tokens"] // len(windows)))
+    print(f"[DEBUG] Transcript is ~{plan['transcript_tokens']} tokens, summarizing {len(windows)} windows in parallel")
+    start_time = time.time()
+    notes = await gather_limited(
+        lambda item: summarize_window(item[1], item[0], len(windows), metadata, window_output_tokens, deadline),
+        list(enumerate(windows)),
+        SUMMARY_MAP_CONCURRENCY
+    )
+    print(f"[DEBUG] Window summaries finished in {time.time() - start_time:.2f} seconds")
+    
+    merged = "\n\n".join(notes)
+    merged += f"\n\n[{format_timestamp(summary_input.duration)}] End of video."
+    return merged
+
+async def prepare_summary_call(summary_input: SummaryInput, summary_type: str, language: str, deadline: float):
+    """
+    Plan the token budget of a summary call and build its input
+    
+    Long transcripts are condensed window by window first (map step).
+    
+    Returns:
+        Tuple of (system prompt as (static prefix, per-video block), user message content, max_tokens)
+    """
+    system_prompt = build_system_prompt(summary_input, summary_type, language, TRANSCRIPT_FORMAT_NOTE)
+    system_tokens = static_prefix_tokens(system_prompt[0]) + estimate_tokens(system_prompt[1])
+    # Reserve only as many output tokens as the target length needs
+    output_tokens = summary_output_tokens(summary_input.duration, summary_type, language)
+    plan = plan_summary_budget(system_tokens, summary_input.transcript_tokens, output_tokens)
+    print(f"[DEBUG] Token budget: mode={plan['mode']}, system~{plan['system_tokens']}, transcript~{plan['transcript_tokens']}, max_tokens={plan['max_tokens']}")
+    
+    if plan["mode"] == "chunked":
+        content = await condense_transcript(summary_input, plan, deadline)
+        system_prompt = build_system_prompt(summary_input, summary_type, language, PARTIAL_NOTES_FORMAT_NOTE)
+        return system_prompt, content, plan["max_tokens"]
+    return system_prompt, summary_input.enhanced_text, plan["max_tokens"]
+
+# Function to generate summary using OpenRouter API
+async def generate_summary(summary_input: SummaryInput, summary_type: str, language: str = "en",
+                           call_info: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Generate the summary of a video in one (or, for long videos, a map-reduce) pass
+    
+    The model is picked by route_models; if it fails, is rate limited or
+    too slow, the call falls back to the next candidate. Requests go through
+    the shared rate limiter, and transient failures are retried on the same
+    model with jittered backoff first, all within LLM_REQUEST_DEADLINE_SECONDS.
+    
+    Args:
+        summary_input: Transcript, metadata and derived prompt inputs (see prepare_summary_input)
+        summary_type: Summary type ("short" or "detailed")
+        language: Summary language code
+        call_info: Optional dictionary that receives the model that produced the summary
+        
+    Returns:
+        Summary text
+        
+    Raises:
+        SummaryGenerationError: If no model produced a summary, or it was cut off or empty
+    """
+    deadline = request_deadline()
+    try:
+        system_prompt, content, max_tokens = await prepare_summary_call(summary_input, summary_type, language, deadline)
+        print(f"[DEBUG] Transcript text length: {len(summary_input.enhanced_text)}")
+        
+        # Use OpenRouter API through the shared, pooled async client
+        client = get_llm_client()
+        
+        async def call(model: str):
+            await llm_rate_limiter.acquire(deadline)
+            return await client.chat.completions.create(
+                model=model,
+                messages=summary_messages(system_prompt, content),
+                max_tokens=max_tokens,
                 temperature=0.7,
+                # Stop as soon as the summary is complete
+                stop=[SUMMARY_END_MARKER],
+            )
+        
+        try:
+            response, model = await call_with_fallback(
+                route_models(summary_type, summary_input.transcript_tokens, language),
+                call, attempt_timeout(max_tokens), deadline
             )
-            
-            print(f"[DEBUG] Received response from OpenRouter API")
-            
-            # Debug the response content
-            response_content = response.choices[0].message.content
-            print(f"[DEBUG] Summary length: {len(response_content)} characters")
-            
-            return response.choices[0].message.content
         except Exception as e:
             print(f"[DEBUG] Error during API call: {str(e)}")
             raise e
+        
+        print(f"[DEBUG] Received response from OpenRouter API ({model})")
+        if call_info is not None:
+            call_info["model"] = model
+        record_llm_usage("summary", response.usage)
+        
+        # Debug the response content
+        response_content = strip_end_marker(response.choices[0].message.content or "")
+        print(f"[DEBUG] Summary length: {len(response_content)} characters")
+        check_summary_complete(response_content, response.choices[0].finish_reason, max_tokens)
+        
+        return response_content
+    except SummaryGenerationError as e:
+        print(f"Error generating summary: {str(e)}")
+        raise
     except Exception as e:
-        # If API fails, return a placeholder
         print(f"Error generating summary: {str(e)}")
-        return "Summary generation failed. Please try again later."
+        raise SummaryGenerationError(str(e)) from e
+
+async def summary_stream_deltas(stream, completion: Dict[str, Any]) -> AsyncIterator[str]:
+    """
+    Text deltas of a streamed completion
+    
+    The usage chunk at the end is recorded; its token counts and the
+    finish_reason of the completion are copied into completion.
+    """
+    async for chunk in stream:
+        if chunk.usage:
+            completion.update(record_llm_usage("summary", chunk.usage) or {})
+        if chunk.choices and chunk.choices[0].finish_reason:
+            completion["finish_reason"] = chunk.choices[0].finish_reason
+        if chunk.choices and chunk.choices[0].delta and chunk.choices[0].delta.content:
+            yield chunk.choices[0].delta.content
+
+# Function to stream summary tokens from OpenRouter API as they are generated
+async def stream_summary(summary_input: SummaryInput, summary_type: str, language: str = "en",
+                         call_info: Optional[Dict[str, Any]] = None) -> AsyncIterator[str]:
+    """
+    Stream the summary text piece by piece as the model produces it
+    
+    Long transcripts are condensed window by window before the streamed final
+    call. The model can only be switched, and the call retried, before the
+    first token: a model that fails or sends nothing within
+    MODEL_FIRST_TOKEN_TIMEOUT_SECONDS is replaced by the next candidate from
+    route_models.
+    
+    Args:
+        summary_input: Transcript, metadata and derived prompt inputs (see prepare_summary_input)
+        summary_type: Summary type ("short" or "detailed")
+        language: Summary language code
+        call_info: Optional dictionary that receives the model that produced the summary
+        
+    Yields:
+        Text deltas of the summary
+        
+    Raises:
+        SummaryGenerationError: If the summary was cut off at the output cap or is empty
+        Exception: If the API call fails
+    """
+    deadline = request_deadline()
+    system_prompt, content, max_tokens = await prepare_summary_call(summary_input, summary_type, language, deadline)
+    print(f"[DEBUG] Transcript text length: {len(summary_input.enhanced_text)}")
+    
+    client = get_llm_client()
+    completion: Dict[str, Any] = {}
+    
+    async def open_stream(model: str):
+        await llm_rate_limiter.acquire(deadline)
+        started = time.time()
+        stream = await client.chat.completions.create(
+            model=model,
+            messages=summary_messages(system_prompt, content),
+            max_tokens=max_tokens,
+            temperature=0.7,
+            stop=[SUMMARY_END_MARKER],
+            stream=True,
+            # The usage arrives in a final chunk
+            stream_options={"include_usage": True},
+        )
+        deltas = summary_stream_deltas(stream, completion)
+        try:
+            first = await deltas.__anext__()
+        except StopAsyncIteration:
+            first = ""
+        except BaseException:
+            # Failed or abandoned for the next model: release the connection
+            await stream.close()
+            raise
+        return stream, deltas, first, started
+    
+    (stream, deltas, first, started), model = await call_with_fallback(
+        route_models(summary_type, summary_input.transcript_tokens, language),
+        open_stream, MODEL_FIRST_TOKEN_TIMEOUT_SECONDS, deadline
+    )
+    print(f"[DEBUG] Streaming summary from {model}")
+    if call_info is not None:
+        call_info["model"] = model
+    
+    async def all_deltas():
+        if first:
+            yield first
+        async for delta in deltas:
+            yield delta
+    
+    streamed = []
+    try:
+        async for delta in until_end_marker(all_deltas()):
+            streamed.append(delta)
+            yield delta
+        # Only a stream that ran to its usage chunk tells how fast the model was
+        record_model_speed(model, time.time() - started, completion.get("completion_tokens"))
+    finally:
+        # Closes the connection early if the marker arrived before the stream ended
+        await stream.close()
+    check_summary_complete("".join(streamed), completion.get("finish_reason"), max_tokens)
 
 # Health check endpoint
 @app.get("/health")
 async def health_check():
     return {"status": "ok"}
 
-# 数据库测试端点
+# Transcript provider and model health (success rate, latency histogram, circuit
+# breaker state) and LLM token usage with prompt cache hits
+@app.get("/api/metrics")
+async def get_metrics():
+    return {
+        "transcript_providers": provider_health.snapshot(),
+        "models": model_health.snapshot(),
+        "llm_rate_limiter": llm_rate_limiter.snapshot(),
+        "llm_usage": llm_usage.snapshot()
+    }
+
+# 数据库测试端点 (同步函数, FastAPI会在线程池中执行, 不阻塞事件循环)
 @app.get("/api/db-test")
-async def test_db_connection(db: Session = Depends(get_db)):
+def test_db_connection(db: Session = Depends(get_db)):
     try:
         # 检查数据库连接
         db.execute("SELECT 1")
@@ -793,6 +1004,22 @@ async def test_db_connection(db: Session = Depends(get_db)):
             "message": str(e)
         }
 
+# Create the shared LLM client once per worker and start the background workers
+@app.on_event("startup")
+async def startup_llm_client():
+    init_llm_client()
+    job_workers.start()
+    cache_janitor.start()
+
+# Stop the background workers, close the LLM connection pool and release the blocking I/O pool on shutdown
+@app.on_event("shutdown")
+async def shutdown_clients():
+    await job_workers.stop()
+    await cache_janitor.stop()
+    await close_llm_client()
+    shutdown_blocking_executor()
+    transcript_executor.shutdown(wait=False, cancel_futures=True)
+
 # CORS middleware to allow frontend requests
 from fastapi.middleware.cors import CORSMiddleware
 app.add_middleware(
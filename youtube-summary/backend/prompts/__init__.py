@@ -1,4 +1,8 @@
 # YouTube Summary Prompts Package
 """
 这个包包含YouTube Summary应用的提示词模板
-""" 
\ No newline at end of file
+"""
+from prompts.registry import PromptTemplate, get_summary_template, render_window_prompt
+from prompts.summary_prompts import SUMMARY_END_MARKER
+
+__all__ = ["PromptTemplate", "get_summary_template", "render_window_prompt", "SUMMARY_END_MARKER"]
@@ -0,0 +1,114 @@
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
+
+from prompts.summary_prompts import (
+    VIDEO_DETAILS_HEADING, SHORT_PREFIX, DETAILED_PREFIX, SHORT_PREFIX_NO_METADATA,
+    DETAILED_PREFIX_NO_METADATA, WINDOW_NOTES_PREFIX, LANGUAGE_NAMES,
+    CHINESE_INSTRUCTIONS, ENGLISH_INSTRUCTIONS
+)
+from utils.summary_input import format_timestamp
+from utils.token_budget import expected_summary_length
+
+@lru_cache(maxsize=64)
+def language_instructions(language: str, with_metadata: bool = True) -> str:
+    """Instructions for the summary language (rendered once per language)."""
+    if language == "en":
+        return ENGLISH_INSTRUCTIONS if with_metadata else ""
+    target_language = LANGUAGE_NAMES.get(language, language)
+    if language == "zh":
+        # Chinese requires more characters to express equivalent content
+        return f"\n\nPlease provide your response in {target_language}.\n{CHINESE_INSTRUCTIONS}"
+    return f"\nPlease provide your response in {target_language}."
+
+class PromptTemplate:
+    """
+    System prompt for one summary type
+
+    The prompt is the static prefix followed by a per-video block. The prefix
+    is a module constant shared by every request using the template; only
+    the short per-video block (title, description, chapters, duration,
+    reference points, language) is rendered per request.
+    """
+
+    __slots__ = ('name', 'prefix', 'with_metadata')
+
+    def __init__(self, name: str, prefix: str, with_metadata: bool):
+        self.name = name
+        self.prefix = prefix
+        self.with_metadata = with_metadata
+
+    def render_video_block(self, summary_input, summary_type: str, language: str = "en", format_note: str = "") -> str:
+        """
+        Render the per-video part of the prompt
+
+        Args:
+            summary_input: SummaryInput of the video
+            summary_type: Summary type, for the expected length
+            language: Summary language code
+            format_note: Note about the format of the user message (transcript or partial notes)
+
+        Returns:
+            The block that follows the static prefix
+        """
+        duration = summary_input.duration
+        parts = [VIDEO_DETAILS_HEADING]
+
+        if self.with_metadata:
+            metadata = summary_input.metadata
+            parts.append(f"\nTitle: \"{metadata.get('title', '')}\"\n\nVideo description:\n{metadata.get('description', '')}\n")
+            chapters = metadata.get("chapters", [])
+            if chapters:
+                parts.append("\nVideo chapters:\n")
+                for chapter in chapters:
+                    parts.append(f"- {format_timestamp(chapter['start_time'])}: {chapter['title']}\n")
+
+        parts.append(format_note)
+        parts.append(language_instructions(language, self.with_metadata))
+
+        # Video duration and expected length guidance
+        expected_words = expected_summary_length(duration, summary_type, language)
+        parts.append(f"\nIMPORTANT: The video's EXACT duration is {format_timestamp(duration)}. DO NOT generate timestamps beyond this time.")
+        parts.append(f"\nYour summary should be approximately {expected_words} words/characters in length to adequately cover this {int(duration / 60)}-minute video.")
+
+        # Reference timestamps to help the model
+        if summary_input.reference_points:
+            parts.append("\n\nReference timestamps in transcript (MM:SS - text sample):\n")
+            parts.append("\n".join(f"{point['timestamp']} - \"{point['text']}\"" for point in summary_input.reference_points))
+        return "".join(parts)
+
+    def render(self, summary_input, summary_type: str, language: str = "en", format_note: str = "") -> Tuple[str, str]:
+        """The system prompt as (static prefix, per-video block); the prefix always comes first."""
+        return self.prefix, self.render_video_block(summary_input, summary_type, language, format_note)
+
+# Summary templates by (summary type, video metadata available)
+SUMMARY_TEMPLATES = {
+    ("short", True): PromptTemplate("short", SHORT_PREFIX, True),
+    ("detailed", True): PromptTemplate("detailed", DETAILED_PREFIX, True),
+    ("short", False): PromptTemplate("short", SHORT_PREFIX_NO_METADATA, False),
+    ("detailed", False): PromptTemplate("detailed", DETAILED_PREFIX_NO_METADATA, False),
+}
+
+def get_summary_template(summary_type: str, with_metadata: bool = True) -> PromptTemplate:
+    """
+    Look up the template of a summary type
+
+    Raises:
+        ValueError: If the summary type is unknown
+    """
+    template = SUMMARY_TEMPLATES.get((summary_type, bool(with_metadata)))
+    if template is None:
+        raise ValueError(f"Unknown summary type: {summary_type}")
+    return template
+
+def render_window_block(metadata: Optional[Dict[str, Any]], index: int, count: int, start: float, end: float) -> str:
+    """Per-window part of the map step prompt (follows WINDOW_NOTES_PREFIX)."""
+    title = (metadata or {}).get("title", "")
+    block = "PART DETAILS\n"
+    if title:
+        block += f"Video title: \"{title}\"\n"
+    block += f"This is part {index + 1} of {count} and covers {format_timestamp(start)} to {format_timestamp(end)} of the video."
+    return block
+
+def render_window_prompt(metadata: Optional[Dict[str, Any]], index: int, count: int, start: float, end: float) -> Tuple[str, str]:
+    """The system prompt for one window of a long transcript, as (static prefix, per-window block)."""
+    return WINDOW_NOTES_PREFIX, render_window_block(metadata, index, count, start, end)
@@ -0,0 +1,219 @@
+"""
+Static prompt text for video summaries
+
+Everything in this module is the same for every video, so the system
+prefixes built from it are byte-identical between requests. Per-video
+details (title, description, chapters, duration, reference points,
+language) are rendered separately, see prompts.registry.
+"""
+
+# Heading of the per-video block that follows every static prefix
+VIDEO_DETAILS_HEADING = "VIDEO DETAILS"
+
+# Closing line of every summary; the calls pass it as a stop sequence, so
+# generation ends as soon as the summary is complete
+SUMMARY_END_MARKER = "<<END_OF_SUMMARY>>"
+END_MARKER_INSTRUCTION = f"""
+
+When the summary is complete, write {SUMMARY_END_MARKER} on its own line and nothing after it. Do not add closing remarks, notes or offers after the last section."""
+
+# Prefixes used when the video metadata is available
+SHORT_PREFIX = f"""You are analyzing a YouTube video. Its title, description, chapters and duration are listed under {VIDEO_DETAILS_HEADING} at the end of these instructions.
+
+IMPORTANT: All section titles must be plain text. Do NOT use asterisks, stars, or markdown formatting for section titles. Section titles must not be bold, italic, or surrounded by any special symbols.
+
+Please create a concise summary of the video transcript. Your summary must:
+1. Cover the ENTIRE video content (unless the video is over 2 hours, then you may summarize the first 2 hours)
+2. Divide the content into sections based on natural topic shifts in the transcript
+3. Start each section with an ACCURATE timestamp (MM:SS format) directly from the transcript markers
+4. Each section must start with a short, descriptive section title summarizing the main point of that section.
+5. Present timestamps in STRICT chronological order (from beginning to end)
+6. LENGTH REQUIREMENT (CRITICAL):
+   - For videos under 10 minutes: 40-60 words/characters per minute of video
+   - For videos 10-30 minutes: 30-50 words/characters per minute (minimum 400 words total)
+   - For videos 30-60 minutes: 25-40 words/characters per minute (minimum 900 words total)
+   - For videos over 60 minutes: 20-30 words/characters per minute (minimum 1800 words total)
+   - For Chinese content: character counts should be 1.5-2x the above word counts
+7. Focus on main points, keep explanations brief but comprehensive
+
+Example format:
+Correct example:
+0:00 - Section Title
+Brief description of this section
+
+2:15 - Section Title
+Brief description of another section
+
+Incorrect examples (do NOT use these):
+0:00 - **Section Title**
+0:00 - *Section Title*
+0:00 - __Section Title__
+
+etc.
+
+CRITICAL RULES:
+- Each line in the transcript has a timestamp in the [MM:SS] format. USE THESE TIMESTAMPS to mark the beginning of your summary sections.
+- If the video has chapters, use those chapter timestamps as primary section dividers.
+- For videos without chapters, identify natural topic shifts in the transcript and use the timestamps at those points.
+- Your summary MUST cover the complete video content in chronological order.
+- Ensure balanced coverage - don't focus too much on early parts and rush through later parts.
+- YOU MUST MEET THE MINIMUM LENGTH REQUIREMENTS specified above. DO NOT make the summary too short.
+- Never generate timestamps that exceed the video duration.
+- Each section must start with a short, descriptive section title summarizing the main point of that section.
+- Do NOT use asterisks, stars, or markdown formatting for section titles. Section titles must be plain text only, with no special symbols.
+
+The summary should help viewers quickly understand the entire video's content.""" + END_MARKER_INSTRUCTION
+
+DETAILED_PREFIX = f"""You are analyzing a YouTube video. Its title, description, chapters and duration are listed under {VIDEO_DETAILS_HEADING} at the end of these instructions.
+
+IMPORTANT: All section titles must be plain text. Do NOT use asterisks, stars, or markdown formatting for section titles. Section titles must not be bold, italic, or surrounded by any special symbols.
+
+Please provide a detailed summary of the video transcript. Your summary must:
+1. Cover the ENTIRE video content (unless the video is over 2 hours, then you may summarize the first 2 hours)
+2. Organize the summary by natural content sections (topic changes in the transcript)
+3. Start each section with an ACCURATE timestamp (MM:SS format) directly from the transcript markers
+4. Each section must start with a short, descriptive section title summarizing the main point of that section.
+5. Present timestamps in STRICT chronological order (from beginning to end)
+6. LENGTH REQUIREMENT (CRITICAL):
+   - For videos under 10 minutes: 80-120 words/characters per minute of video
+   - For videos 10-30 minutes: 60-90 words/characters per minute (minimum 800 words total)
+   - For videos 30-60 minutes: 50-70 words/characters per minute (minimum 1800 words total)
+   - For videos over 60 minutes: 40-60 words/characters per minute (minimum 3000 words total)
+   - For Chinese content: character counts should be 1.5-2x the above word counts
+7. Include specific details, examples, and insights from each section
+
+Your summary should follow this format:
+Correct example:
+0:00 - Section Title
+Detailed summary of this section's content...
+
+2:15 - Section Title
+Detailed summary of this section's content...
+
+Incorrect examples (do NOT use these):
+0:00 - **Section Title**
+0:00 - *Section Title*
+0:00 - __Section Title__
+
+etc.
+
+CRITICAL RULES:
+- Each line in the transcript has a timestamp in the [MM:SS] format. USE THESE TIMESTAMPS to mark the beginning of your summary sections.
+- If the video has chapters, use those chapter timestamps as primary section dividers.
+- For videos without chapters, identify natural topic shifts in the transcript and use the timestamps at those points.
+- Your summary MUST cover the complete video content in chronological order.
+- Ensure balanced coverage - don't focus too much on early parts and rush through later parts.
+- YOU MUST MEET THE MINIMUM LENGTH REQUIREMENTS specified above. DO NOT make the summary too short.
+- Include concrete details, quotes, examples and specific points from the video.
+- Never generate timestamps that exceed the video duration.
+- Each section must start with a short, descriptive section title summarizing the main point of that section.
+- Do NOT use asterisks, stars, or markdown formatting for section titles. Section titles must be plain text only, with no special symbols.
+
+The goal is to create a well-structured, comprehensive summary that covers the entire video's content while highlighting the most important information.""" + END_MARKER_INSTRUCTION
+
+# Prefixes used when no video metadata is available
+SHORT_PREFIX_NO_METADATA = """Please create a concise summary of the video transcript. Your summary must:
+1. Cover the ENTIRE video content (unless the video is over 2 hours, then you may summarize the first 2 hours)
+2. Divide the content into 3-5 sections based on natural topic shifts in the transcript
+3. Start each section with an ACCURATE timestamp (MM:SS format) derived DIRECTLY from the transcript
+4. Present timestamps in STRICT chronological order (from beginning to end)
+5. Adjust summary length based on video duration - use approximately 20-30 words per minute of video
+6. Focus on main points, keep explanations brief but comprehensive
+
+Example format:
+0:00 - Brief description of this section
+2:15 - Brief description of another section
+etc.
+
+CRITICAL RULES:
+- DO NOT INVENT OR HALLUCINATE ANY TIMESTAMPS. Only use timestamps that appear in the [MM:SS] format in the transcript.
+- Your summary MUST cover the complete video content in chronological order
+- Only use timestamps that are explicitly marked in the transcript
+- Ensure balanced coverage - don't focus too much on early parts and rush through later parts
+- Keep the total summary length proportional to video length (20-30 words per minute)
+- Never introduce timestamps that exceed the video duration
+
+The summary should help viewers quickly understand the entire video's content.""" + END_MARKER_INSTRUCTION
+
+DETAILED_PREFIX_NO_METADATA = """Please provide a detailed summary of the video transcript. Your summary must:
+1. Cover the ENTIRE video content (unless the video is over 2 hours, then you may summarize the first 2 hours)
+2. Organize the summary into 4-6 logical sections based on content shifts in the transcript
+3. Start each section with an ACCURATE timestamp (MM:SS format) derived DIRECTLY from the transcript
+4. Present timestamps in STRICT chronological order (from beginning to end)
+5. Adjust summary length based on video duration - use approximately 40-70 words per minute of video
+6. Include specific details, examples, and insights from each section
+
+Your summary should follow this format:
+0:00 - [Section Title]
+Detailed summary of this section's content...
+
+2:15 - [Section Title]
+Detailed summary of this section's content...
+
+etc.
+
+CRITICAL RULES:
+- DO NOT INVENT OR HALLUCINATE ANY TIMESTAMPS. Only use timestamps that appear in the [MM:SS] format in the transcript.
+- Your summary MUST cover the complete video content in chronological order
+- Only use timestamps that are explicitly marked in the transcript
+- Ensure balanced coverage - don't focus too much on early parts and rush through later parts
+- Keep the total summary length proportional to video length (40-70 words per minute)
+- Provide more details than the concise summary, but still focus on what's most important
+- Never introduce timestamps that exceed the video duration
+
+The goal is to create a well-structured, comprehensive summary that covers the entire video's content while highlighting the most important information.""" + END_MARKER_INSTRUCTION
+
+# Map step of long videos: notes on one window of the transcript
+WINDOW_NOTES_PREFIX = """You are taking notes on one part of the transcript of a YouTube video. Which part, and the video title, are given under PART DETAILS at the end of these instructions.
+
+Write detailed, chronological notes on this part only. Your notes must:
+1. Cover the ENTIRE part, from its first to its last line
+2. Be organized by topic, each topic starting with the [MM:SS] timestamp marker from the transcript where it begins
+3. Keep the concrete details, names, numbers, examples and quotes that a summary of the whole video would need
+4. Only use timestamps that appear in the [MM:SS] format in the transcript
+
+Write the notes in the language of the transcript. Do not add an introduction or a conclusion."""
+
+# Target language names for non-English summaries
+LANGUAGE_NAMES = {
+    "zh": "Chinese (中文)",
+    "es": "Spanish (Español)",
+    "fr": "French (Français)",
+    "de": "German (Deutsch)",
+    "ja": "Japanese (日本語)",
+    "ko": "Korean (한국어)",
+}
+
+CHINESE_INSTRUCTIONS = """
+LANGUAGE-SPECIFIC INSTRUCTIONS FOR CHINESE:
+- Chinese summaries should be clear and concise, using appropriate character count
+- Length requirements (must follow):
+  * short summary type:
+    - Videos under 10 minutes: ~50-70 characters per minute
+    - 10-30 minute videos: ~40-60 characters per minute (minimum 500 characters total)
+    - 30-60 minute videos: ~30-50 characters per minute (minimum 1200 characters total)
+    - Videos over 60 minutes: ~25-40 characters per minute (minimum 2000 characters total)
+  * detailed summary type:
+    - Videos under 10 minutes: ~80-100 characters per minute
+    - 10-30 minute videos: ~70-90 characters per minute (minimum 1000 characters total)
+    - 30-60 minute videos: ~60-80 characters per minute (minimum 2500 characters total)
+    - Videos over 60 minutes: ~50-70 characters per minute (minimum 3500 characters total)
+- Use natural Chinese expressions, avoid direct translations from English
+- Ensure each timestamp section is concise and appropriately detailed
+
+Format example:
+0:00 - [Section title]
+Content summary... (control character count based on summary type)
+
+2:15 - [Section title]
+Content summary... (control character count based on summary type)
+"""
+
+ENGLISH_INSTRUCTIONS = """
+ENGLISH-SPECIFIC INSTRUCTIONS:
+- English summaries must be comprehensive and detailed
+- For videos under 60 minutes, use the higher end of the word count range
+- Include specific quotes and details from the video
+- DO NOT make the summary too short - utilize the full context window
+- If the video discusses complex topics, provide even more detailed explanations
+"""
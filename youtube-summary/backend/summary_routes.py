@@ -35,6 +35,7 @@ class SummaryWithVideoResponse(SummaryResponse):
     video_thumbnail_url: Optional[str] = None
     summary_type: str
     language: str
+    model: Optional[str] = None
     
     class Config:
         from_attributes = True
@@ -112,6 +113,7 @@ def get_user_summaries(
         Summary.is_favorite,
         Summary.summary_type,
         Summary.language,
+        Summary.model,
         Summary.created_at,
         Video.title.label("video_title"),
         Video.youtube_id.label("video_youtube_id"),
@@ -146,6 +148,7 @@ def get_summary(
         Summary.is_favorite,
         Summary.summary_type,
         Summary.language,
+        Summary.model,
         Summary.created_at,
         Video.title.label("video_title"),
         Video.youtube_id.label("video_youtube_id"),
@@ -6,7 +6,7 @@ import time
 
 # Add parent directory to module search path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from utils.youtube_utils import extract_video_id, get_transcript, get_transcript_with_youtube_api, get_transcript_with_ytdlp
+from utils.youtube_utils import extract_video_id, get_transcript, fetch_transcript_with_youtube_api, fetch_transcript_with_ytdlp
 
 def test_fallback_mechanism(video_id_or_url: str, debug_mode: bool = False):
     """
@@ -54,7 +54,7 @@ def test_fallback_mechanism(video_id_or_url: str, debug_mode: bool = False):
         # Save transcript for further analysis
         output_file = f"{video_id}_fallback_transcript.json"
         with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(transcript, f, ensure_ascii=False, indent=2)
+            json.dump(transcript.to_entries(), f, ensure_ascii=False, indent=2)
         
         print(f"\nTranscript saved to: {output_file}")
         
@@ -83,15 +83,15 @@ def test_forced_fallback(video_id_or_url: str, debug_mode: bool = False):
         
         # Store original methods
         original_methods = [
-            ("youtube_transcript_api", get_transcript_with_youtube_api),
-            ("yt-dlp", get_transcript_with_ytdlp)
+            ("youtube_transcript_api", fetch_transcript_with_youtube_api),
+            ("yt-dlp", fetch_transcript_with_ytdlp)
         ]
         
         # Override the methods list with our mock
         import utils.youtube_utils
         utils.youtube_utils.methods = [
             ("youtube_transcript_api", failing_youtube_api),
-            ("yt-dlp", get_transcript_with_ytdlp)
+            ("yt-dlp", fetch_transcript_with_ytdlp)
         ]
         
         # Record start time
@@ -99,7 +99,8 @@ def test_forced_fallback(video_id_or_url: str, debug_mode: bool = False):
         
         # Call the function with fallback
         try:
-            transcript = get_transcript(video_id)
+            # Bypass the transcript store so the providers are actually called
+            transcript = get_transcript(video_id, refresh=True)
             success = True
         except Exception as e:
             print(f"All methods failed: {e}")
@@ -0,0 +1,60 @@
+import sys
+import os
+
+# Add parent directory to module search path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.provider_health import ProviderHealth
+
+PROVIDERS = [("youtube_transcript_api", None), ("yt-dlp", None)]
+
+def names(providers):
+    return [name for name, _ in providers]
+
+def test_unknown_providers_keep_configured_order():
+    """Providers without history are tried in the configured order."""
+    health = ProviderHealth()
+    assert names(health.order(PROVIDERS)) == ["youtube_transcript_api", "yt-dlp"]
+
+def test_faster_provider_ranked_first():
+    """Of two healthy providers, the one with the lower median latency goes first."""
+    health = ProviderHealth()
+    for _ in range(3):
+        health.record("youtube_transcript_api", "success", 5.0)
+        health.record("yt-dlp", "success", 1.0)
+    assert names(health.order(PROVIDERS)) == ["yt-dlp", "youtube_transcript_api"]
+
+def test_hedge_losses_do_not_improve_ranking():
+    """A provider that keeps losing hedges is not ranked by its cut-off run times."""
+    health = ProviderHealth()
+    for _ in range(3):
+        health.record("yt-dlp", "success", 8.0)
+    for _ in range(10):
+        # The API answers after 5s; yt-dlp, started at the 4s hedge, is cancelled after 1s
+        health.record("youtube_transcript_api", "success", 5.0)
+        health.record("yt-dlp", "cancelled", 1.0)
+    order = names(health.order(PROVIDERS))
+    print(f"Order after hedge losses: {order}")
+    assert order == ["youtube_transcript_api", "yt-dlp"]
+    assert health.latency("yt-dlp") == 8.0
+    # The cancelled runs still show up in the histogram
+    assert health.snapshot()["yt-dlp"]["latency_histogram"]["le_1s"] == 10
+
+def test_open_circuit_skipped():
+    """A provider whose breaker is open is left out; a single trial follows the cool-down."""
+    health = ProviderHealth(breaker_failures=2, cooldown_seconds=0)
+    health.record("youtube_transcript_api", "failure", 1.0)
+    health.record("youtube_transcript_api", "failure", 1.0)
+    # Cool-down over: one half-open trial, ranked last for its failures
+    assert names(health.order(PROVIDERS)) == ["yt-dlp", "youtube_transcript_api"]
+    # The trial slot is taken until released
+    assert names(health.order(PROVIDERS)) == ["yt-dlp"]
+    health.release("youtube_transcript_api")
+    health.trip("yt-dlp", 60)
+    assert names(health.order(PROVIDERS)) == ["youtube_transcript_api"]
+
+if __name__ == "__main__":
+    test_unknown_providers_keep_configured_order()
+    test_faster_provider_ranked_first()
+    test_hedge_losses_do_not_improve_ranking()
+    test_open_circuit_skipped()
+    print("\n===== Provider health tests passed =====")
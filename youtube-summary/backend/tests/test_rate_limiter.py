@@ -0,0 +1,132 @@
+import sys
+import os
+import time
+import asyncio
+
+import httpx
+from openai import APIStatusError
+
+# Add parent directory to module search path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import utils.rate_limiter as rate_limiter
+import utils.model_router as model_router
+from utils.provider_health import ProviderHealth
+from utils.rate_limiter import TokenBucket, RateLimitTimeout, LLM_MAX_ATTEMPTS, _parse_seconds, rate_limit_hints
+
+# Keep the retry backoff short
+rate_limiter.LLM_RETRY_BASE_SECONDS = 0.01
+
+def api_error(status_code, headers=None):
+    """An API error as the OpenAI SDK raises it for the given status."""
+    response = httpx.Response(status_code, headers=headers, request=httpx.Request("POST", "https://openrouter.ai/api/v1/chat/completions"))
+    return APIStatusError(f"Error code: {status_code}", response=response, body=None)
+
+def run_fallback(models, outcomes):
+    """Run call_with_fallback with fresh model health; outcomes maps model -> error to raise (None succeeds)."""
+    shared_health = model_router.model_health
+    model_router.model_health = health = ProviderHealth(label="model")
+    calls = []
+
+    async def call(model):
+        calls.append(model)
+        if outcomes.get(model) is not None:
+            raise outcomes[model]
+        return f"answer from {model}"
+
+    async def run():
+        return await model_router.call_with_fallback(models, call, 5, rate_limiter.request_deadline(30))
+
+    try:
+        result = asyncio.run(run())
+    except Exception as e:
+        result = e
+    finally:
+        model_router.model_health = shared_health
+    print(f"Calls: {calls}, result: {result!r}")
+    return calls, result, health.snapshot()
+
+def test_parse_seconds():
+    """Rate limit reset values are read in all the formats in use."""
+    assert _parse_seconds("7") == 7
+    assert _parse_seconds("1m30s") == 90
+    assert _parse_seconds("250ms") == 0.25
+    assert 3 < _parse_seconds(str(int((time.time() + 5) * 1000))) <= 5
+    assert 3 < _parse_seconds(str(int(time.time() + 5))) <= 5
+    assert _parse_seconds("abc") is None
+    assert _parse_seconds(None) is None
+
+def test_rate_limit_hints():
+    """Retry-After, remaining requests and the reset time come out of the headers."""
+    headers = httpx.Headers({"retry-after": "3", "x-ratelimit-remaining-requests": "12", "x-ratelimit-reset-requests": "2s"})
+    assert rate_limit_hints(headers) == (3, 12, 2)
+    assert rate_limit_hints(httpx.Headers({})) == (None, None, None)
+
+def test_token_bucket_reserve():
+    """The burst is free, later requests wait their turn at the configured rate."""
+    bucket = TokenBucket(rate=2, burst=2)
+    delays = [round(bucket.reserve(), 1) for _ in range(4)]
+    print(f"Delays: {delays}")
+    assert delays == [0, 0, 0.5, 1.0]
+
+def test_token_bucket_deadline():
+    """A request whose turn comes after its deadline fails at once and gives its token back."""
+    bucket = TokenBucket(rate=1, burst=1)
+    assert bucket.reserve() == 0
+    try:
+        bucket.reserve(time.monotonic() + 0.5)
+        assert False, "expected RateLimitTimeout"
+    except RateLimitTimeout as e:
+        print(f"Rejected: {e}")
+    # The rejected request did not push back the next one
+    assert round(bucket.reserve(), 1) == 1.0
+
+def test_token_bucket_rate_limited():
+    """A 429 halves the rate and pauses the bucket for the Retry-After time."""
+    bucket = TokenBucket(rate=4, burst=4, min_rate=1)
+    bucket.observe(429, httpx.Headers({"retry-after": "3"}))
+    snapshot = bucket.snapshot()
+    assert snapshot["rate_per_second"] == 2
+    assert 2.5 < snapshot["paused_seconds"] <= 3
+    assert bucket.reserve() >= 2.5
+
+def test_retries_before_fallback():
+    """A failing model is retried, then the next model is tried; the failure is recorded once."""
+    calls, result, health = run_fallback(["a", "b"], {"a": api_error(500)})
+    assert result == ("answer from b", "b")
+    assert calls == ["a"] * model_router.MODEL_ATTEMPTS_BEFORE_FALLBACK + ["b"]
+    assert health["a"]["attempts"] == 1
+    assert health["a"]["consecutive_failures"] == 1
+    assert health["a"]["circuit"] == "closed"
+
+def test_last_model_gets_all_attempts():
+    """The last candidate is retried LLM_MAX_ATTEMPTS times before the error surfaces."""
+    calls, result, health = run_fallback(["a", "b"], {"a": api_error(500), "b": api_error(503)})
+    assert isinstance(result, APIStatusError) and result.status_code == 503
+    assert calls == ["a"] * model_router.MODEL_ATTEMPTS_BEFORE_FALLBACK + ["b"] * LLM_MAX_ATTEMPTS
+    # One request does not open the circuits on its own
+    assert all(stats["circuit"] == "closed" and stats["attempts"] == 1 for stats in health.values())
+
+def test_rate_limited_model_falls_back_at_once():
+    """A 429 moves on to the next model right away and opens the limited model's circuit."""
+    calls, result, health = run_fallback(["a", "b"], {"a": api_error(429, {"retry-after": "30"})})
+    assert result == ("answer from b", "b")
+    assert calls == ["a", "b"]
+    assert health["a"]["circuit"] == "open"
+
+def test_final_error_not_retried():
+    """Errors that retrying cannot fix (e.g. a bad request) are not retried."""
+    calls, result, health = run_fallback(["a", "b"], {"a": api_error(400), "b": api_error(400)})
+    assert isinstance(result, APIStatusError) and result.status_code == 400
+    assert calls == ["a", "b"]
+
+if __name__ == "__main__":
+    test_parse_seconds()
+    test_rate_limit_hints()
+    test_token_bucket_reserve()
+    test_token_bucket_deadline()
+    test_token_bucket_rate_limited()
+    test_retries_before_fallback()
+    test_last_model_gets_all_attempts()
+    test_rate_limited_model_falls_back_at_once()
+    test_final_error_not_retried()
+    print("\n===== Rate limiter and model fallback tests passed =====")
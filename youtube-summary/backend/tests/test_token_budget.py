@@ -0,0 +1,58 @@
+import sys
+import os
+
+# Add parent directory to module search path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.token_budget import (
+    plan_summary_budget, summary_output_tokens, estimate_tokens,
+    MODEL_CONTEXT_TOKENS, CONTEXT_SAFETY_TOKENS, SUMMARY_MAX_OUTPUT_TOKENS, SUMMARY_MIN_OUTPUT_TOKENS,
+)
+
+SYSTEM_TOKENS = 1500
+
+def test_short_transcript_single_pass():
+    """A transcript within the input budget goes to the model in one call."""
+    plan = plan_summary_budget(SYSTEM_TOKENS, 5000, 2000)
+    print(f"Plan for 5k tokens: {plan}")
+    assert plan["mode"] == "single"
+    assert plan["window_tokens"] is None
+    assert plan["max_tokens"] == 2000
+
+def test_window_notes_fit_final_input():
+    """The merged window notes never exceed the final call's input budget."""
+    for transcript_tokens in (30000, 100000, 400000, 1000000, 5000000):
+        plan = plan_summary_budget(SYSTEM_TOKENS, transcript_tokens, 8000)
+        notes_tokens = plan["window_count"] * plan["window_output_tokens"]
+        print(f"{transcript_tokens} tokens: {plan['window_count']} windows x {plan['window_output_tokens']} = {notes_tokens}")
+        assert plan["mode"] == "chunked"
+        assert plan["window_count"] >= 2
+        assert plan["window_tokens"] * plan["window_count"] >= transcript_tokens
+        assert notes_tokens <= plan["input_tokens"]
+        assert SYSTEM_TOKENS + notes_tokens + plan["max_tokens"] + CONTEXT_SAFETY_TOKENS <= MODEL_CONTEXT_TOKENS
+
+def test_output_cap_respected():
+    """max_tokens stays within the requested cap and SUMMARY_MAX_OUTPUT_TOKENS."""
+    assert plan_summary_budget(SYSTEM_TOKENS, 5000, 10 ** 6)["max_tokens"] == SUMMARY_MAX_OUTPUT_TOKENS
+    assert plan_summary_budget(SYSTEM_TOKENS, 5000)["max_tokens"] == SUMMARY_MAX_OUTPUT_TOKENS
+
+def test_summary_output_tokens_bounds():
+    """Output caps grow with the video length and stay within the configured bounds."""
+    short = summary_output_tokens(60, "short")
+    long = summary_output_tokens(3 * 3600, "detailed")
+    print(f"Output caps: 1 min short {short}, 3 h detailed {long}")
+    assert short == SUMMARY_MIN_OUTPUT_TOKENS
+    assert short < long <= SUMMARY_MAX_OUTPUT_TOKENS
+
+def test_estimate_tokens_scripts():
+    """CJK characters count one token each; ASCII words about one token."""
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("你好世界") == 4
+    assert estimate_tokens("hello world") == 2
+
+if __name__ == "__main__":
+    test_short_transcript_single_pass()
+    test_window_notes_fit_final_input()
+    test_output_cap_respected()
+    test_summary_output_tokens_bounds()
+    test_estimate_tokens_scripts()
+    print("\n===== Token budget tests passed =====")
@@ -0,0 +1,120 @@
+import sys
+import os
+
+# Add parent directory to module search path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.transcript import Transcript
+from utils.transcript_chunks import merge_segments, split_transcript_windows, SEGMENT_MAX_SECONDS, SEGMENT_MAX_GAP_SECONDS
+
+ENTRIES = [
+    {"text": "first", "start": 0.0, "duration": 2.0},
+    {"text": "second", "start": 2.0, "duration": 2.0},
+    {"text": "third", "start": 4.5, "duration": 1.5},
+    {"text": "fourth", "start": 7.0, "duration": 3.0},
+    {"text": "fifth", "start": 10.0, "duration": 2.0},
+]
+
+def cues(count, seconds=2.0, text="word"):
+    """Back-to-back cues of the same length."""
+    return Transcript.from_entries([{"text": text, "start": i * seconds, "duration": seconds} for i in range(count)])
+
+def test_round_trip():
+    """The dict and column forms convert back and forth unchanged."""
+    transcript = Transcript.from_entries(ENTRIES)
+    assert transcript.to_entries() == ENTRIES
+    assert Transcript.from_columns(transcript.to_columns()).to_entries() == ENTRIES
+    assert len(transcript) == 5
+    assert transcript.text_length == sum(len(entry["text"]) for entry in ENTRIES)
+
+def test_index_slicing():
+    """Index slices are views with their own indices, bounds and end time."""
+    transcript = Transcript.from_entries(ENTRIES)
+    middle = transcript[1:4]
+    assert [entry["text"] for entry in middle] == ["second", "third", "fourth"]
+    assert middle[0] == ENTRIES[1]
+    assert middle[-1] == ENTRIES[3]
+    assert middle.text(1) == "third"
+    assert middle.start_time == 2.0
+    assert middle.end_time == 10.0
+    assert middle.text_length == len("secondthirdfourth")
+    # Slices of slices stay within the view
+    assert middle[1:][0]["text"] == "third"
+    assert len(transcript[4:2]) == 0 and not transcript[4:2]
+    try:
+        middle[3]
+        assert False, "expected IndexError"
+    except IndexError:
+        pass
+
+def test_time_slicing():
+    """slice_time returns the cues starting in [start, end)."""
+    transcript = Transcript.from_entries(ENTRIES)
+    assert [entry["text"] for entry in transcript.slice_time(2.0, 7.0)] == ["second", "third"]
+    assert [entry["text"] for entry in transcript.slice_time(4.0, 100)] == ["third", "fourth", "fifth"]
+    assert len(transcript.slice_time(12.5, 20)) == 0
+    # Time slices of an index slice stay within it
+    assert [entry["text"] for entry in transcript[:2].slice_time(0, 100)] == ["first", "second"]
+
+def test_empty_transcript():
+    """An empty transcript has no cues and covers no time."""
+    transcript = Transcript.from_entries([])
+    assert len(transcript) == 0 and not transcript
+    assert transcript.start_time == 0.0 and transcript.end_time == 0.0
+    assert transcript.to_entries() == []
+
+def test_merge_sentences():
+    """Cues are merged until a sentence ends, keeping the first start and the last end."""
+    transcript = Transcript.from_entries([
+        {"text": "so today we", "start": 0.0, "duration": 3.0},
+        {"text": "look at caching.", "start": 3.0, "duration": 4.0},
+        {"text": "first the", "start": 7.0, "duration": 2.0},
+        {"text": "basics", "start": 9.0, "duration": 2.0},
+    ])
+    merged = merge_segments(transcript)
+    print(f"Merged segments: {merged.to_entries()}")
+    assert merged.to_entries() == [
+        {"text": "so today we look at caching.", "start": 0.0, "duration": 7.0},
+        {"text": "first the basics", "start": 7.0, "duration": 4.0},
+    ]
+
+def test_merge_limits():
+    """Segments end at SEGMENT_MAX_SECONDS and at pauses longer than SEGMENT_MAX_GAP_SECONDS."""
+    merged = merge_segments(cues(60))
+    assert len(merged) > 1
+    assert all(merged.duration(i) <= SEGMENT_MAX_SECONDS for i in range(len(merged)))
+    assert merged.end_time == 120.0
+    paused = Transcript.from_entries([
+        {"text": "before", "start": 0.0, "duration": 1.0},
+        {"text": "after", "start": 1.0 + SEGMENT_MAX_GAP_SECONDS + 1, "duration": 1.0},
+    ])
+    assert [entry["text"] for entry in merge_segments(paused)] == ["before", "after"]
+
+def test_merge_cjk_and_blank_cues():
+    """CJK text is joined without spaces and blank cues are dropped."""
+    transcript = Transcript.from_entries([
+        {"text": "今天我们", "start": 0.0, "duration": 2.0},
+        {"text": "  ", "start": 2.0, "duration": 1.0},
+        {"text": "讲缓存", "start": 2.0, "duration": 2.0},
+    ])
+    assert [entry["text"] for entry in merge_segments(transcript)] == ["今天我们讲缓存"]
+
+def test_split_windows():
+    """Windows are consecutive views that cover the transcript without splitting cues."""
+    transcript = cues(100)
+    windows = split_transcript_windows(transcript, 50)
+    assert len(windows) > 1
+    assert sum(len(window) for window in windows) == len(transcript)
+    assert windows[0].start_time == 0.0 and windows[-1].end_time == transcript.end_time
+    for previous, window in zip(windows, windows[1:]):
+        assert previous.end_time == window.start_time
+
+if __name__ == "__main__":
+    test_round_trip()
+    test_index_slicing()
+    test_time_slicing()
+    test_empty_transcript()
+    test_merge_sentences()
+    test_merge_limits()
+    test_merge_cjk_and_blank_cues()
+    test_split_windows()
+    print("\n===== Transcript type tests passed =====")
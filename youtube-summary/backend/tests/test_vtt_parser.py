@@ -0,0 +1,71 @@
+import sys
+import os
+
+# Add parent directory to module search path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.vtt_parser import iter_vtt_segments, parse_vtt_file
+
+# Manual track downloaded by yt-dlp (kept in tests/, the transcripts cache is cleaned up at runtime)
+MANUAL_TRACK_VTT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "dQw4w9WgXcQ.en.vtt")
+
+# Manual track: the same line twice in a row is spoken twice
+MANUAL_VTT = """WEBVTT
+Kind: captions
+Language: en
+
+00:00:01.000 --> 00:00:02.000
+Yes
+
+00:00:02.000 --> 00:00:03.000
+Yes
+
+00:00:03.500 --> 00:00:05.000
+Are you sure?
+"""
+
+# Auto-generated rollup track: every cue repeats the last line of the previous one
+ROLLUP_VTT = """WEBVTT
+Kind: captions
+Language: en
+
+00:00:01.000 --> 00:00:03.000 align:start position:0%
+hello<00:00:01.500><c> everyone</c>
+
+00:00:03.000 --> 00:00:03.010 align:start position:0%
+hello everyone
+
+00:00:03.010 --> 00:00:05.000 align:start position:0%
+hello everyone
+welcome<00:00:03.500><c> back</c>
+
+00:00:05.000 --> 00:00:07.000 align:start position:0%
+welcome back
+yes<00:00:05.500><c> yes</c>
+"""
+
+def test_manual_repeated_lines():
+    """Repeated lines of a manual track are all kept."""
+    texts = [segment["text"] for segment in iter_vtt_segments(MANUAL_VTT.splitlines())]
+    print(f"Manual track segments: {texts}")
+    assert texts == ["Yes", "Yes", "Are you sure?"]
+
+def test_rollup_lines_collapsed():
+    """Lines a rollup cue repeats from the previous cue are emitted once."""
+    texts = [segment["text"] for segment in iter_vtt_segments(ROLLUP_VTT.splitlines())]
+    print(f"Rollup track segments: {texts}")
+    assert texts == ["hello everyone", "welcome back", "yes yes"]
+
+def test_downloaded_manual_track():
+    """Every repeated chorus line of a downloaded manual track survives parsing."""
+    assert os.path.exists(MANUAL_TRACK_VTT), f"Test fixture {MANUAL_TRACK_VTT} is missing"
+    with open(MANUAL_TRACK_VTT, "r", encoding="utf-8") as f:
+        expected = f.read().count("give you up")
+    parsed = sum(segment["text"].count("give you up") for segment in parse_vtt_file(MANUAL_TRACK_VTT))
+    print(f"'give you up' in the VTT file: {expected}, in the parsed transcript: {parsed}")
+    assert parsed == expected
+
+if __name__ == "__main__":
+    test_manual_repeated_lines()
+    test_rollup_lines_collapsed()
+    test_downloaded_manual_track()
+    print("\n===== VTT parser tests passed =====")
@@ -129,7 +129,7 @@ def save_test_results(video_id, metadata, transcript, enhanced_text):
     
     # 保存文本转录
     with open(f"{output_dir}/transcript.json", "w", encoding="utf-8") as f:
-        json.dump(transcript, f, ensure_ascii=False, indent=2)
+        json.dump(transcript.to_entries(), f, ensure_ascii=False, indent=2)
     
     # 保存增强文本
     with open(f"{output_dir}/enhanced_text.txt", "w", encoding="utf-8") as f:
@@ -0,0 +1,63 @@
+import os
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Iterable, List
+
+# Dedicated thread pool for blocking work (yt-dlp, transcript APIs, database sessions).
+# The default asyncio executor is sized from the CPU count, which is far too small
+# for I/O bound work when many summaries are in flight on one worker.
+BLOCKING_IO_WORKERS = int(os.getenv("BLOCKING_IO_WORKERS", "64"))
+
+blocking_executor = ThreadPoolExecutor(
+    max_workers=BLOCKING_IO_WORKERS,
+    thread_name_prefix="blocking-io",
+)
+
+async def run_blocking(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """
+    Run a blocking function in the dedicated thread pool without blocking the event loop
+
+    Args:
+        func: Blocking function to call
+        *args: Positional arguments for func
+        **kwargs: Keyword arguments for func
+
+    Returns:
+        Whatever func returns
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(blocking_executor, functools.partial(func, *args, **kwargs))
+
+def shutdown_blocking_executor():
+    """Stop accepting new blocking work and release the worker threads."""
+    blocking_executor.shutdown(wait=False, cancel_futures=True)
+
+async def gather_limited(func: Callable[..., Awaitable[Any]], items: Iterable[Any], limit: int) -> List[Any]:
+    """
+    Run func(item) for every item concurrently, with at most limit calls in flight
+
+    Args:
+        func: Coroutine function taking one item
+        items: Items to process
+        limit: Maximum number of concurrent calls
+
+    Returns:
+        Results in the same order as items
+
+    Raises:
+        Exception: The first exception raised by func (the other calls are cancelled)
+    """
+    semaphore = asyncio.Semaphore(max(1, limit))
+
+    async def run(item):
+        async with semaphore:
+            return await func(item)
+
+    tasks = [asyncio.ensure_future(run(item)) for item in items]
+    try:
+        return await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
@@ -0,0 +1,142 @@
+import os
+import time
+import asyncio
+import threading
+from collections import OrderedDict
+from typing import Iterable, Optional
+
+from utils.async_utils import run_blocking
+
+# Cache directory maintenance settings
+CACHE_MAX_BYTES = int(os.getenv("CACHE_MAX_BYTES", str(512 * 1024 * 1024)))  # 512 MB
+CACHE_EXPIRE_SECONDS = int(os.getenv("CACHE_EXPIRE_SECONDS", str(7 * 24 * 3600)))  # 7 days
+CACHE_JANITOR_INTERVAL = float(os.getenv("CACHE_JANITOR_INTERVAL", "300"))
+# Files written by other worker processes only show up in this process' index after a rescan
+CACHE_RESCAN_INTERVAL = float(os.getenv("CACHE_RESCAN_INTERVAL", "3600"))
+
+class CacheIndex:
+    """
+    In-memory LRU index (path -> size, last access time) of the files in a cache directory
+
+    Callers record files as they write or read them, so the janitor can pick
+    eviction victims without walking the directory.
+    """
+
+    def __init__(self, directory: str, protected: Iterable[str] = ()):
+        self.directory = directory
+        # File names that are never evicted (e.g. cookies.txt)
+        self.protected = set(protected)
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.total_bytes = 0
+
+    def ensure_dir(self):
+        if not os.path.exists(self.directory):
+            os.makedirs(self.directory, exist_ok=True)
+
+    def touch(self, path: str):
+        """Record that a file was written or read (marks it most recently used)."""
+        if os.path.basename(path) in self.protected:
+            return
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            self.discard(path)
+            return
+        with self._lock:
+            previous = self._entries.pop(path, None)
+            if previous is not None:
+                self.total_bytes -= previous[0]
+            self._entries[path] = (size, time.time())
+            self.total_bytes += size
+
+    def discard(self, path: str):
+        """Forget a file that was removed."""
+        with self._lock:
+            previous = self._entries.pop(path, None)
+            if previous is not None:
+                self.total_bytes -= previous[0]
+
+    def rescan(self):
+        """Rebuild the index from the directory (startup and occasional reconciliation only)."""
+        self.ensure_dir()
+        entries = []
+        for entry in os.scandir(self.directory):
+            if not entry.is_file() or entry.name in self.protected:
+                continue
+            stat = entry.stat()
+            entries.append((stat.st_mtime, entry.path, stat.st_size))
+        entries.sort()
+        with self._lock:
+            self._entries = OrderedDict((path, (size, mtime)) for mtime, path, size in entries)
+            self.total_bytes = sum(size for _, _, size in entries)
+
+    def evict(self, max_bytes: int = CACHE_MAX_BYTES, expire_seconds: int = CACHE_EXPIRE_SECONDS) -> int:
+        """
+        Delete expired files, then least recently used files until the cache fits max_bytes
+
+        Returns:
+            Number of files removed
+        """
+        expired_before = time.time() - expire_seconds
+        victims = []
+        with self._lock:
+            remaining = self.total_bytes
+            # Entries are kept in LRU order, oldest first
+            for path, (size, last_access) in self._entries.items():
+                if last_access >= expired_before and remaining <= max_bytes:
+                    break
+                victims.append(path)
+                remaining -= size
+
+        removed = 0
+        for path in victims:
+            try:
+                os.remove(path)
+                removed += 1
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                print(f"[WARN] Failed to remove old cache file {path}: {e}")
+                continue
+            self.discard(path)
+        return removed
+
+class CacheJanitor:
+    """Background task that keeps a CacheIndex directory within its byte budget."""
+
+    def __init__(self, index: CacheIndex, interval: float = CACHE_JANITOR_INTERVAL):
+        self.index = index
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+        self._last_rescan = 0.0
+
+    def start(self):
+        """Start the janitor task (call from the running event loop)."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def run_once(self) -> int:
+        if time.time() - self._last_rescan > CACHE_RESCAN_INTERVAL:
+            self._last_rescan = time.time()
+            await run_blocking(self.index.rescan)
+        removed = await run_blocking(self.index.evict)
+        if removed:
+            print(f"[INFO] Cache janitor removed {removed} files, {self.index.total_bytes} bytes in use")
+        return removed
+
+    async def _run(self):
+        while True:
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"[ERROR] Cache janitor failed: {str(e)}")
+            await asyncio.sleep(self.interval)
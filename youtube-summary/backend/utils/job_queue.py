@@ -0,0 +1,307 @@
+import os
+import json
+import uuid
+import time
+import asyncio
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from database.db import SessionLocal
+from database.models import SummaryJob
+from utils.async_utils import run_blocking
+
+# Async summary job settings
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "2"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+# Running jobs that have not been updated for this long are treated as orphaned
+# (e.g. the worker was restarted mid-job) and put back in the queue
+JOB_STALE_SECONDS = int(os.getenv("JOB_STALE_SECONDS", "900"))
+
+class PermanentJobError(Exception):
+    """Job failure that retrying cannot fix (e.g. the video has no transcript)."""
+
+def _job_to_dict(job: SummaryJob) -> Dict[str, Any]:
+    return {
+        "job_id": job.id,
+        "user_id": job.user_id,
+        "video_id": job.video_id,
+        "summary_type": job.summary_type,
+        "language": job.language,
+        "status": job.status,
+        "stage": job.stage,
+        "result": json.loads(job.result) if job.result else None,
+        "error": job.error,
+        "attempts": job.attempts,
+        "created_at": job.created_at,
+        "updated_at": job.updated_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at
+    }
+
+def create_job(user_id: Optional[int], video_id: str, summary_type: str, language: str) -> Dict[str, Any]:
+    """
+    Add a summary job to the queue
+
+    Args:
+        user_id: Owner of the job, None for anonymous requests
+        video_id: YouTube video ID
+        summary_type: Summary type ("short" or "detailed")
+        language: Summary language code
+
+    Returns:
+        The created job as a dictionary
+    """
+    now = datetime.utcnow()
+    db = SessionLocal()
+    try:
+        job = SummaryJob(
+            id=uuid.uuid4().hex,
+            user_id=user_id,
+            video_id=video_id,
+            summary_type=summary_type,
+            language=language,
+            status="queued",
+            attempts=0,
+            created_at=now,
+            updated_at=now
+        )
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+        return _job_to_dict(job)
+    finally:
+        db.close()
+
+def get_job(job_id: str) -> Optional[Dict[str, Any]]:
+    """Load a job by ID, or None if it does not exist."""
+    db = SessionLocal()
+    try:
+        job = db.query(SummaryJob).filter(SummaryJob.id == job_id).first()
+        return _job_to_dict(job) if job else None
+    finally:
+        db.close()
+
+def claim_next_job() -> Optional[Dict[str, Any]]:
+    """
+    Atomically take the oldest queued job and mark it as running
+
+    Uses SELECT ... FOR UPDATE SKIP LOCKED where the database supports it, and
+    a conditional UPDATE on the status, so several workers (and worker
+    processes) can share one queue without running a job twice.
+    """
+    db = SessionLocal()
+    try:
+        for _ in range(5):
+            job = db.query(SummaryJob)\
+                .filter(SummaryJob.status == "queued")\
+                .order_by(SummaryJob.created_at.asc())\
+                .with_for_update(skip_locked=True)\
+                .first()
+            if not job:
+                db.rollback()
+                return None
+            now = datetime.utcnow()
+            claimed = db.query(SummaryJob)\
+                .filter(SummaryJob.id == job.id, SummaryJob.status == "queued")\
+                .update({
+                    SummaryJob.status: "running",
+                    SummaryJob.stage: None,
+                    SummaryJob.attempts: SummaryJob.attempts + 1,
+                    SummaryJob.started_at: now,
+                    SummaryJob.updated_at: now
+                }, synchronize_session=False)
+            db.commit()
+            if claimed:
+                db.refresh(job)
+                return _job_to_dict(job)
+            # Another worker claimed it first; try the next one
+        return None
+    finally:
+        db.close()
+
+def update_job_stage(job_id: str, stage: str):
+    """Record the pipeline stage a running job has reached (also acts as a heartbeat)."""
+    db = SessionLocal()
+    try:
+        db.query(SummaryJob).filter(SummaryJob.id == job_id).update({
+            SummaryJob.stage: stage,
+            SummaryJob.updated_at: datetime.utcnow()
+        })
+        db.commit()
+    finally:
+        db.close()
+
+def complete_job(job_id: str, result: Dict[str, Any]):
+    """Mark a job as succeeded and store its result."""
+    now = datetime.utcnow()
+    db = SessionLocal()
+    try:
+        db.query(SummaryJob).filter(SummaryJob.id == job_id).update({
+            SummaryJob.status: "succeeded",
+            SummaryJob.stage: None,
+            SummaryJob.result: json.dumps(result, ensure_ascii=False),
+            SummaryJob.error: None,
+            SummaryJob.updated_at: now,
+            SummaryJob.finished_at: now
+        })
+        db.commit()
+    finally:
+        db.close()
+
+def fail_job(job_id: str, error: str, retry: bool = True) -> str:
+    """
+    Record a job failure; the job is queued again while attempts remain
+
+    Returns:
+        The job's new status ("queued" or "failed")
+    """
+    now = datetime.utcnow()
+    db = SessionLocal()
+    try:
+        job = db.query(SummaryJob).filter(SummaryJob.id == job_id).first()
+        if not job:
+            return "failed"
+        job.error = error
+        job.updated_at = now
+        if retry and job.attempts < JOB_MAX_ATTEMPTS:
+            job.status = "queued"
+        else:
+            job.status = "failed"
+            job.finished_at = now
+        job.stage = None
+        db.commit()
+        return job.status
+    finally:
+        db.close()
+
+def requeue_stale_jobs() -> int:
+    """
+    Put running jobs whose worker went away (no update for JOB_STALE_SECONDS) back in the queue
+
+    The interrupted run already counted as an attempt when the job was
+    claimed, so jobs that have used up JOB_MAX_ATTEMPTS (e.g. one that hangs
+    or crashes its worker every time) are marked as failed instead.
+
+    Returns:
+        Number of jobs put back in the queue
+    """
+    now = datetime.utcnow()
+    stale_before = now - timedelta(seconds=JOB_STALE_SECONDS)
+    db = SessionLocal()
+    try:
+        stale = db.query(SummaryJob)\
+            .filter(SummaryJob.status == "running", SummaryJob.updated_at < stale_before)
+        failed = stale.filter(SummaryJob.attempts >= JOB_MAX_ATTEMPTS)\
+            .update({
+                SummaryJob.status: "failed",
+                SummaryJob.stage: None,
+                SummaryJob.error: "Job was interrupted on every attempt",
+                SummaryJob.updated_at: now,
+                SummaryJob.finished_at: now
+            }, synchronize_session=False)
+        count = stale.filter(SummaryJob.attempts < JOB_MAX_ATTEMPTS)\
+            .update({SummaryJob.status: "queued", SummaryJob.stage: None}, synchronize_session=False)
+        db.commit()
+        if count:
+            print(f"[INFO] Requeued {count} stale summary jobs")
+        if failed:
+            print(f"[WARN] Failed {failed} stale summary jobs that used up their {JOB_MAX_ATTEMPTS} attempts")
+        return count
+    finally:
+        db.close()
+
+JobHandler = Callable[[Dict[str, Any], Callable[[str], Awaitable[None]]], Awaitable[Dict[str, Any]]]
+
+class JobWorkerPool:
+    """
+    Bounded pool of asyncio workers processing queued summary jobs
+
+    Jobs live in the summary_jobs table, so queued work survives a restart.
+    The handler receives the job dictionary and a set_stage coroutine and
+    returns the JSON-serializable result to store.
+    """
+
+    def __init__(self, handler: JobHandler, workers: int = JOB_WORKERS):
+        self.handler = handler
+        self.workers = workers
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._last_stale_check = 0.0
+
+    def start(self):
+        """Start the worker tasks (call from the running event loop)."""
+        if self._tasks:
+            return
+        self._wakeup = asyncio.Event()
+        for n in range(self.workers):
+            self._tasks.append(asyncio.create_task(self._worker(n)))
+        print(f"[INFO] Started {self.workers} summary job workers")
+
+    def notify(self):
+        """Wake idle workers after a job was enqueued."""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def stop(self):
+        """Cancel the workers; interrupted jobs are requeued once they become stale."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _next_job(self) -> Optional[Dict[str, Any]]:
+        if time.time() - self._last_stale_check > JOB_POLL_INTERVAL * 30:
+            self._last_stale_check = time.time()
+            await run_blocking(requeue_stale_jobs)
+        return await run_blocking(claim_next_job)
+
+    async def _worker(self, n: int):
+        while True:
+            try:
+                job = await self._next_job()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"[ERROR] Job worker {n} failed to poll the queue: {str(e)}")
+                job = None
+
+            if job is None:
+                # Idle: wait until a job is enqueued or the poll interval passes
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=JOB_POLL_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            try:
+                await self._run_job(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Job bookkeeping failed; the job is requeued once it becomes stale
+                print(f"[ERROR] Job worker {n} failed to record job {job['job_id']}: {str(e)}")
+
+    async def _run_job(self, job: Dict[str, Any]):
+        job_id = job["job_id"]
+        print(f"[INFO] Processing summary job {job_id} ({job['video_id']}, attempt {job['attempts']})")
+
+        async def set_stage(stage: str):
+            await run_blocking(update_job_stage, job_id, stage)
+
+        try:
+            result = await self.handler(job, set_stage)
+        except asyncio.CancelledError:
+            raise
+        except PermanentJobError as e:
+            await run_blocking(fail_job, job_id, str(e), False)
+            print(f"[ERROR] Summary job {job_id} failed: {str(e)}")
+            return
+        except Exception as e:
+            status = await run_blocking(fail_job, job_id, str(e), True)
+            print(f"[ERROR] Summary job {job_id} failed ({status}): {str(e)}")
+            return
+
+        await run_blocking(complete_job, job_id, result)
+        print(f"[INFO] Summary job {job_id} succeeded")
@@ -0,0 +1,90 @@
+import os
+from typing import Optional
+
+import httpx
+from openai import AsyncOpenAI
+from dotenv import load_dotenv
+
+from utils.rate_limiter import observe_llm_response
+
+# Load environment variables
+load_dotenv()
+
+OPENROUTER_BASE_URL = "https://openrouter.ai/api/v1"
+
+# Connection pool limits for the shared LLM client
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "100"))
+LLM_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("LLM_MAX_KEEPALIVE_CONNECTIONS", "20"))
+LLM_KEEPALIVE_EXPIRY = float(os.getenv("LLM_KEEPALIVE_EXPIRY", "120"))
+
+# Timeouts (seconds). The read timeout applies between received chunks, so it
+# has to cover the time the model needs before it starts answering.
+LLM_CONNECT_TIMEOUT = float(os.getenv("LLM_CONNECT_TIMEOUT", "10"))
+LLM_READ_TIMEOUT = float(os.getenv("LLM_READ_TIMEOUT", "300"))
+LLM_WRITE_TIMEOUT = float(os.getenv("LLM_WRITE_TIMEOUT", "30"))
+LLM_POOL_TIMEOUT = float(os.getenv("LLM_POOL_TIMEOUT", "30"))
+
+# One long-lived client per worker process
+_llm_client: Optional[AsyncOpenAI] = None
+
+def http2_available() -> bool:
+    """HTTP/2 needs the optional h2 package (installed with httpx[http2])."""
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+def init_llm_client() -> AsyncOpenAI:
+    """
+    Create the shared OpenRouter client with a pooled HTTP connection
+
+    Returns:
+        The shared AsyncOpenAI client
+    """
+    global _llm_client
+    if _llm_client is not None:
+        return _llm_client
+
+    http2 = http2_available()
+    http_client = httpx.AsyncClient(
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=LLM_MAX_CONNECTIONS,
+            max_keepalive_connections=LLM_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=LLM_KEEPALIVE_EXPIRY,
+        ),
+        timeout=httpx.Timeout(
+            connect=LLM_CONNECT_TIMEOUT,
+            read=LLM_READ_TIMEOUT,
+            write=LLM_WRITE_TIMEOUT,
+            pool=LLM_POOL_TIMEOUT,
+        ),
+        # Every response's rate limit headers feed the shared request limiter
+        event_hooks={"response": [observe_llm_response]},
+    )
+    api_key = os.getenv("OPENROUTER_API_KEY")
+    _llm_client = AsyncOpenAI(
+        # The SDK refuses to start without a key; requests will fail with 401 instead
+        api_key=api_key or "missing-openrouter-api-key",
+        base_url=OPENROUTER_BASE_URL,
+        http_client=http_client,
+        # Retries are scheduled by utils.rate_limiter.with_retries, within the request deadline
+        max_retries=0,
+    )
+    print(f"[INFO] LLM client initialized (http2={http2}, max_connections={LLM_MAX_CONNECTIONS})")
+    return _llm_client
+
+def get_llm_client() -> AsyncOpenAI:
+    """Return the shared client, creating it if app startup did not run (e.g. in scripts)."""
+    if _llm_client is None:
+        return init_llm_client()
+    return _llm_client
+
+async def close_llm_client():
+    """Close the shared client and its connection pool."""
+    global _llm_client
+    if _llm_client is not None:
+        await _llm_client.close()
+        _llm_client = None
+        print("[INFO] LLM client closed")
@@ -0,0 +1,71 @@
+import threading
+from typing import Any, Dict, Optional
+
+def _usage_value(obj: Any, name: str) -> int:
+    if obj is None:
+        return 0
+    value = obj.get(name) if isinstance(obj, dict) else getattr(obj, name, None)
+    return int(value or 0)
+
+def cached_prompt_tokens(usage: Any) -> int:
+    """
+    Prompt tokens served from the provider's prompt cache
+
+    OpenRouter reports them as usage.prompt_tokens_details.cached_tokens
+    for every provider. No cache hints are sent, so these come from automatic
+    prefix caching, which only starts once a prompt prefix is long enough.
+    """
+    if usage is None:
+        return 0
+    details = usage.get("prompt_tokens_details") if isinstance(usage, dict) else getattr(usage, "prompt_tokens_details", None)
+    return _usage_value(details, "cached_tokens")
+
+class LLMUsageStats:
+    """
+    Token usage of the LLM calls of a worker, per call kind (summary, window, ...)
+
+    Tracks prompt, cached prompt and completion tokens, so the prompt cache
+    hit ratio can be monitored.
+    """
+
+    def __init__(self):
+        self._kinds: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, kind: str, usage: Any) -> Optional[Dict[str, int]]:
+        """
+        Record the usage block of one response
+
+        Args:
+            kind: Call kind ("summary", "window", ...)
+            usage: The response usage (SDK object or dict); None is ignored
+
+        Returns:
+            The prompt / cached / completion token counts of this call, or None without usage
+        """
+        if usage is None:
+            return None
+        counts = {
+            "prompt_tokens": _usage_value(usage, "prompt_tokens"),
+            "cached_tokens": cached_prompt_tokens(usage),
+            "completion_tokens": _usage_value(usage, "completion_tokens"),
+        }
+        with self._lock:
+            totals = self._kinds.setdefault(kind, {"calls": 0, "prompt_tokens": 0, "cached_tokens": 0, "completion_tokens": 0})
+            totals["calls"] += 1
+            for name, value in counts.items():
+                totals[name] += value
+        return counts
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Totals per call kind with the share of prompt tokens read from the cache."""
+        with self._lock:
+            result = {}
+            for kind, totals in self._kinds.items():
+                result[kind] = dict(totals)
+                result[kind]["cache_hit_ratio"] = (
+                    round(totals["cached_tokens"] / totals["prompt_tokens"], 4) if totals["prompt_tokens"] else None
+                )
+            return result
+
+llm_usage = LLMUsageStats()
@@ -0,0 +1,136 @@
+import os
+import json
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from sqlalchemy.exc import IntegrityError
+
+from database.db import SessionLocal
+from database.models import Video
+from utils.cache_utils import TTLCache
+from utils.youtube_utils import get_video_metadata
+
+# Layered video metadata cache settings
+METADATA_MEMORY_TTL_SECONDS = int(os.getenv("METADATA_MEMORY_TTL_SECONDS", "3600"))  # 1 hour
+METADATA_MEMORY_MAX_ENTRIES = int(os.getenv("METADATA_MEMORY_MAX_ENTRIES", "2048"))
+# Rows older than this are refreshed from YouTube on the next request
+METADATA_DB_TTL_SECONDS = int(os.getenv("METADATA_DB_TTL_SECONDS", str(7 * 24 * 3600)))  # 7 days
+
+# In-process layer in front of the videos table
+_memory_cache = TTLCache(maxsize=METADATA_MEMORY_MAX_ENTRIES, ttl=METADATA_MEMORY_TTL_SECONDS)
+
+def _row_to_metadata(row: Video) -> Dict[str, Any]:
+    return {
+        'title': row.title,
+        'description': row.description or '',
+        'chapters': json.loads(row.chapters) if row.chapters else [],
+        'thumbnail_url': row.thumbnail_url or '',
+        'channel': row.channel or '',
+        'duration': row.duration
+    }
+
+def load_stored_metadata(video_id: str, max_age: Optional[float] = METADATA_DB_TTL_SECONDS) -> Optional[Dict[str, Any]]:
+    """
+    Load video metadata from the videos table
+
+    Rows created before metadata was stored (no metadata_updated_at) lack the
+    description and chapters and count as a miss.
+
+    Args:
+        video_id: YouTube video ID
+        max_age: Maximum age in seconds, or None to accept stale rows
+
+    Returns:
+        Metadata dictionary, or None on a miss
+    """
+    db = SessionLocal()
+    try:
+        row = db.query(Video).filter(Video.youtube_id == video_id).first()
+        if row is None or row.metadata_updated_at is None:
+            return None
+        if max_age is not None and row.metadata_updated_at < datetime.utcnow() - timedelta(seconds=max_age):
+            return None
+        return _row_to_metadata(row)
+    finally:
+        db.close()
+
+def store_metadata(video_id: str, metadata: Dict[str, Any]):
+    """
+    Create or refresh the videos row of a video with freshly fetched metadata
+
+    Args:
+        video_id: YouTube video ID
+        metadata: Dictionary returned by get_video_metadata
+    """
+    db = SessionLocal()
+    try:
+        for attempt in range(2):
+            row = db.query(Video).filter(Video.youtube_id == video_id).first()
+            if row is None:
+                row = Video(youtube_id=video_id)
+                db.add(row)
+            row.title = metadata.get('title') or 'Untitled Video'
+            row.description = metadata.get('description', '')
+            row.chapters = json.dumps(metadata.get('chapters', []), ensure_ascii=False)
+            row.thumbnail_url = metadata.get('thumbnail_url', '')
+            row.channel = metadata.get('channel', '')
+            if metadata.get('duration') is not None:
+                row.duration = int(metadata['duration'])
+            row.metadata_updated_at = datetime.utcnow()
+            try:
+                db.commit()
+                return
+            except IntegrityError:
+                # Another request created the row first; update that one instead
+                db.rollback()
+    finally:
+        db.close()
+
+def load_video_metadata(video_id: str) -> Dict[str, Any]:
+    """
+    Get video metadata from the in-process cache, the videos table or yt-dlp, in that order
+
+    Metadata fetched from yt-dlp is written back to both layers. If yt-dlp
+    fails while a stale row exists, the stale row is served instead.
+
+    Args:
+        video_id: YouTube video ID
+
+    Returns:
+        Dictionary containing title, description, chapters, thumbnail_url, channel and duration
+
+    Raises:
+        Exception: If metadata retrieval fails and nothing is stored
+    """
+    metadata = _memory_cache.get(video_id)
+    if metadata is not None:
+        return metadata
+
+    try:
+        metadata = load_stored_metadata(video_id)
+    except Exception as e:
+        print(f"[WARN] Metadata lookup failed for {video_id}: {e}")
+        metadata = None
+    if metadata is not None:
+        print(f"[CACHE] Loaded metadata for {video_id} from the videos table")
+        _memory_cache.set(video_id, metadata)
+        return metadata
+
+    try:
+        metadata = get_video_metadata(video_id)
+    except Exception:
+        try:
+            stale = load_stored_metadata(video_id, max_age=None)
+        except Exception:
+            stale = None
+        if stale is None:
+            raise
+        print(f"[WARN] Refreshing metadata for {video_id} failed, serving the stored copy")
+        return stale
+
+    try:
+        store_metadata(video_id, metadata)
+    except Exception as e:
+        print(f"[WARN] Failed to store metadata for {video_id}: {e}")
+    _memory_cache.set(video_id, metadata)
+    return metadata
@@ -0,0 +1,200 @@
+import os
+import json
+import time
+import asyncio
+import hashlib
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+from openai import APIStatusError
+
+from utils.provider_health import ProviderHealth
+from utils.rate_limiter import RateLimitTimeout, is_retryable, with_retries
+
+# Models the default routing table picks from
+DEFAULT_SUMMARY_MODEL = os.getenv("DEFAULT_SUMMARY_MODEL", "anthropic/claude-sonnet-4.5")
+FAST_SUMMARY_MODEL = os.getenv("FAST_SUMMARY_MODEL", "anthropic/claude-haiku-4.5")
+
+# Model latency is tracked as seconds per 1000 output tokens, so long and
+# short summaries compare; models whose median is above this are tried last
+MODEL_SLOW_SECONDS_PER_1K_TOKENS = float(os.getenv("MODEL_SLOW_SECONDS_PER_1K_TOKENS", "40"))
+# A call that has not answered in time is abandoned for the next model (the
+# last candidate is always waited for). The time allowed grows with the
+# requested max_tokens; streams only wait for the first token.
+MODEL_ATTEMPT_BASE_SECONDS = float(os.getenv("MODEL_ATTEMPT_BASE_SECONDS", "30"))
+MODEL_ATTEMPT_SECONDS_PER_TOKEN = float(os.getenv("MODEL_ATTEMPT_SECONDS_PER_TOKEN", "0.025"))
+MODEL_FIRST_TOKEN_TIMEOUT_SECONDS = float(os.getenv("MODEL_FIRST_TOKEN_TIMEOUT_SECONDS", "30"))
+# Attempts at a model with a fallback left; the last candidate gets the full LLM_MAX_ATTEMPTS
+MODEL_ATTEMPTS_BEFORE_FALLBACK = int(os.getenv("MODEL_ATTEMPTS_BEFORE_FALLBACK", "2"))
+# How long a rate limited model is skipped when the 429 has no Retry-After header
+MODEL_RATE_LIMIT_COOLDOWN_SECONDS = float(os.getenv("MODEL_RATE_LIMIT_COOLDOWN_SECONDS", "60"))
+
+# Routing table: the first rule matching the call decides the models, in the
+# order they are tried. A rule matches on any of summary_type ("short",
+# "detailed" or "window" for the map step of long videos), languages and
+# max_transcript_tokens; keys left out match everything.
+DEFAULT_MODEL_ROUTES = [
+    # Short summaries of short videos: the fast model is good enough
+    {"summary_type": "short", "max_transcript_tokens": 12000, "models": [FAST_SUMMARY_MODEL, DEFAULT_SUMMARY_MODEL]},
+    {"summary_type": "short", "languages": ["en"], "max_transcript_tokens": 24000, "models": [FAST_SUMMARY_MODEL, DEFAULT_SUMMARY_MODEL]},
+    # Window notes are merged and rewritten by the final call
+    {"summary_type": "window", "models": [FAST_SUMMARY_MODEL, DEFAULT_SUMMARY_MODEL]},
+    {"models": [DEFAULT_SUMMARY_MODEL, FAST_SUMMARY_MODEL]},
+]
+
+def load_model_routes() -> List[Dict[str, Any]]:
+    """
+    Routing table from the MODEL_ROUTES environment variable (a JSON list of rules)
+
+    Falls back to DEFAULT_MODEL_ROUTES if the variable is unset or invalid.
+    """
+    raw = os.getenv("MODEL_ROUTES")
+    if not raw:
+        return DEFAULT_MODEL_ROUTES
+    try:
+        routes = json.loads(raw)
+        if not isinstance(routes, list) or not all(isinstance(rule, dict) and rule.get("models") for rule in routes):
+            raise ValueError("expected a list of rules with a non-empty models list")
+    except ValueError as e:
+        print(f"[WARN] Ignoring invalid MODEL_ROUTES: {e}")
+        return DEFAULT_MODEL_ROUTES
+    return routes
+
+MODEL_ROUTES = load_model_routes()
+
+# Part of the shared summary cache key: summaries are cached per routing
+# table, so changing the table regenerates them
+ROUTING_VERSION = "routes-" + hashlib.sha1(json.dumps(MODEL_ROUTES, sort_keys=True).encode()).hexdigest()[:8]
+
+# Success rate, latency (seconds per 1000 output tokens) and circuit breaker state per model
+model_health = ProviderHealth(label="model")
+
+def attempt_timeout(max_tokens: int) -> float:
+    """Seconds an attempt asking for max_tokens output tokens may take before the next model is tried."""
+    return MODEL_ATTEMPT_BASE_SECONDS + max_tokens * MODEL_ATTEMPT_SECONDS_PER_TOKEN
+
+def record_model_speed(model: str, elapsed: float, output_tokens: Optional[int]):
+    """Record how fast a model produced its output (seconds per 1000 output tokens)."""
+    if output_tokens:
+        model_health.record_latency(model, elapsed * 1000 / output_tokens)
+
+def _output_tokens(result: Any) -> Optional[int]:
+    usage = getattr(result, "usage", None)
+    return getattr(usage, "completion_tokens", None) if usage is not None else None
+
+def _rule_matches(rule: Dict[str, Any], summary_type: str, transcript_tokens: int, language: Optional[str]) -> bool:
+    if rule.get("summary_type") not in (None, summary_type):
+        return False
+    if rule.get("languages") is not None and language not in rule["languages"]:
+        return False
+    if rule.get("max_transcript_tokens") is not None and transcript_tokens > rule["max_transcript_tokens"]:
+        return False
+    return True
+
+def route_models(summary_type: str, transcript_tokens: int, language: Optional[str] = None) -> List[str]:
+    """
+    Models to try for one call, preferred first
+
+    The routing table gives the candidates; models with an open circuit
+    (failing or rate limited) are left out and models that are currently slow
+    move to the end.
+
+    Args:
+        summary_type: "short", "detailed" or "window"
+        transcript_tokens: Token estimate of the call input
+        language: Summary language code (None for window notes)
+
+    Returns:
+        Model names in the order to try them
+    """
+    rule = next((rule for rule in MODEL_ROUTES if _rule_matches(rule, summary_type, transcript_tokens, language)), None)
+    candidates = list(dict.fromkeys(rule["models"] if rule else [DEFAULT_SUMMARY_MODEL]))
+    available = [name for name, _ in model_health.order([(model, None) for model in candidates], rank=False)]
+    fast = [model for model in available if (model_health.latency(model) or 0.0) <= MODEL_SLOW_SECONDS_PER_1K_TOKENS]
+    return fast + [model for model in available if model not in fast]
+
+def rate_limit_seconds(error: BaseException) -> Optional[float]:
+    """Seconds to leave a model alone after a 429 (its Retry-After), or None if the error is not a rate limit."""
+    if not isinstance(error, APIStatusError) or error.status_code != 429:
+        return None
+    try:
+        return float(error.response.headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return MODEL_RATE_LIMIT_COOLDOWN_SECONDS
+
+def record_model_failure(model: str, error: BaseException):
+    """Count a failed call against the model; a rate limit opens its circuit for the Retry-After time."""
+    model_health.record(model, "failure", None)
+    retry_after = rate_limit_seconds(error)
+    if retry_after is not None:
+        model_health.trip(model, retry_after)
+
+def _retry_before_fallback(error: BaseException) -> bool:
+    # Rate limits and our own timeouts go straight to the next model
+    return is_retryable(error) and not isinstance(error, asyncio.TimeoutError) and rate_limit_seconds(error) is None
+
+async def call_with_fallback(models: Sequence[str], call: Callable[[str], Awaitable[Any]],
+                             timeout: float, deadline: float, kind: str = "summary") -> Tuple[Any, str]:
+    """
+    Run call(model) with each model in turn until one succeeds
+
+    Transient errors are retried on the same model (with_retries) before the
+    next model is tried: MODEL_ATTEMPTS_BEFORE_FALLBACK times while there is
+    a fallback left, LLM_MAX_ATTEMPTS times for the last candidate. Attempts
+    at models with a fallback are abandoned after timeout seconds; that
+    counts as a timeout, not as a failure of the model. A model's outcome is
+    recorded once, after its retries, so a single failing request cannot
+    open the circuits on its own. Outcomes, and the speed of completions that
+    report their usage, feed model_health, which route_models uses next time.
+
+    Args:
+        models: Models to try, from route_models
+        call: Coroutine function making the request with the given model
+        timeout: Seconds before an attempt with a fallback left is abandoned (see attempt_timeout)
+        deadline: time.monotonic() value by which the call has to be done (see request_deadline)
+        kind: Call kind for log messages
+
+    Returns:
+        Tuple of (call result, model that produced it)
+
+    Raises:
+        Exception: The error of the last model if every model failed
+    """
+    models = list(models)
+    last_error: Optional[BaseException] = None
+    for position, model in enumerate(models):
+        if time.monotonic() >= deadline:
+            for unused in models[position:]:
+                model_health.release(unused)
+            break
+        has_fallback = position < len(models) - 1
+        start_time = time.time()
+        try:
+            if has_fallback:
+                result = await with_retries(lambda: call(model), deadline, kind, MODEL_ATTEMPTS_BEFORE_FALLBACK,
+                                            _retry_before_fallback, timeout)
+            else:
+                result = await with_retries(lambda: call(model), deadline, kind)
+        except (asyncio.CancelledError, RateLimitTimeout):
+            # Cancelled, or throttled on our side: not the model's fault
+            for unused in models[position:]:
+                model_health.release(unused)
+            raise
+        except asyncio.TimeoutError as e:
+            # Given up on by us: the model may just be busy with a long answer
+            model_health.record(model, "timeout", None)
+            last_error = e
+            if has_fallback:
+                print(f"[WARN] {kind} call to {model} gave no answer after {timeout:g}s, falling back to {models[position + 1]}")
+            continue
+        except Exception as e:
+            record_model_failure(model, e)
+            last_error = e
+            if has_fallback:
+                print(f"[WARN] {kind} call to {model} failed ({e}), falling back to {models[position + 1]}")
+            continue
+        model_health.record(model, "success", None)
+        record_model_speed(model, time.time() - start_time, _output_tokens(result))
+        for unused in models[position + 1:]:
+            model_health.release(unused)
+        return result, model
+    raise last_error if last_error is not None else Exception(f"No model available for {kind} call")
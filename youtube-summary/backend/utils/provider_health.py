@@ -0,0 +1,205 @@
+import os
+import time
+import threading
+from bisect import bisect_left
+from collections import deque
+from typing import Any, Dict, List, Optional, Sequence
+
+# Per-provider health tracking settings
+PROVIDER_HEALTH_WINDOW = int(os.getenv("PROVIDER_HEALTH_WINDOW", "50"))
+# Consecutive failures that open a provider's circuit breaker
+PROVIDER_BREAKER_FAILURES = int(os.getenv("PROVIDER_BREAKER_FAILURES", "3"))
+PROVIDER_BREAKER_COOLDOWN_SECONDS = float(os.getenv("PROVIDER_BREAKER_COOLDOWN_SECONDS", "120"))
+# Upper bounds (seconds) of the latency histogram buckets; the last bucket is open-ended
+LATENCY_BUCKETS = (0.5, 1, 2, 4, 8, 15, 30, 60)
+
+class ProviderStats:
+    """Rolling outcomes, latency histogram and circuit breaker state of one provider."""
+
+    def __init__(self, window: int):
+        # True / False per recent attempt that finished (success / failure)
+        self.outcomes = deque(maxlen=window)
+        # Recent latencies (seconds) of finished attempts, used for ranking
+        self.latencies = deque(maxlen=window)
+        # All attempts; hedge losers add the time they ran before being cancelled
+        self.histogram = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.consecutive_failures = 0
+        # Attempts the caller gave up on (client-side timeouts), not counted as failures
+        self.timeouts = 0
+        self.open_until = 0.0
+        self.trial_in_flight = False
+
+    @property
+    def success_rate(self) -> Optional[float]:
+        if not self.outcomes:
+            return None
+        return sum(self.outcomes) / len(self.outcomes)
+
+    def latency_quantile(self, q: float) -> Optional[float]:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+class ProviderHealth:
+    """
+    Health of the transcript providers, shared by all requests of a worker
+
+    Every finished attempt updates the provider's rolling success rate and
+    latency histogram. After PROVIDER_BREAKER_FAILURES consecutive failures
+    the provider's circuit opens and it is skipped for
+    PROVIDER_BREAKER_COOLDOWN_SECONDS; after that a single trial request is
+    let through (half-open) and its outcome closes or re-opens the circuit.
+    order() ranks the available providers by success rate and typical
+    latency, so the fastest healthy provider is tried first.
+
+    The same tracking is used for the summary models (see utils.model_router);
+    label names the kind of provider in log messages.
+    """
+
+    def __init__(self, window: int = PROVIDER_HEALTH_WINDOW,
+                 breaker_failures: int = PROVIDER_BREAKER_FAILURES,
+                 cooldown_seconds: float = PROVIDER_BREAKER_COOLDOWN_SECONDS,
+                 label: str = "transcript provider"):
+        self.label = label
+        self.window = window
+        self.breaker_failures = breaker_failures
+        self.cooldown_seconds = cooldown_seconds
+        self._stats: Dict[str, ProviderStats] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, name: str) -> ProviderStats:
+        stats = self._stats.get(name)
+        if stats is None:
+            stats = self._stats[name] = ProviderStats(self.window)
+        return stats
+
+    def record(self, name: str, outcome: str, elapsed: Optional[float]):
+        """
+        Record one provider attempt
+
+        Args:
+            name: Provider name
+            outcome: "success", "no_transcript" (answered, the video has none; counts as
+                a success), "failure", "cancelled" (lost a hedge; only its latency is counted,
+                in the histogram) or "timeout" (abandoned by the caller; counted apart from failures)
+            elapsed: Latency of the attempt, or None to record only the outcome
+        """
+        with self._lock:
+            stats = self._get(name)
+            if elapsed is not None:
+                # A hedge loser was cut short: its time says nothing about how fast it answers
+                self._add_latency(stats, elapsed, ranked=outcome != "cancelled")
+            if outcome in ("cancelled", "timeout"):
+                if outcome == "timeout":
+                    stats.timeouts += 1
+                stats.trial_in_flight = False
+                return
+            success = outcome != "failure"
+            stats.outcomes.append(success)
+            stats.trial_in_flight = False
+            if success:
+                stats.consecutive_failures = 0
+                stats.open_until = 0.0
+            else:
+                stats.consecutive_failures += 1
+                if stats.consecutive_failures >= self.breaker_failures:
+                    if stats.open_until <= time.time():
+                        print(f"[WARN] Opening circuit for {self.label} {name} "
+                              f"for {self.cooldown_seconds:.0f}s after {stats.consecutive_failures} failures")
+                    stats.open_until = time.time() + self.cooldown_seconds
+
+    def record_latency(self, name: str, elapsed: float):
+        """Add a latency measured after the attempt's outcome was recorded."""
+        with self._lock:
+            self._add_latency(self._get(name), elapsed)
+
+    @staticmethod
+    def _add_latency(stats: ProviderStats, elapsed: float, ranked: bool = True):
+        if ranked:
+            stats.latencies.append(elapsed)
+        stats.histogram[bisect_left(LATENCY_BUCKETS, elapsed)] += 1
+
+    def trip(self, name: str, seconds: float):
+        """Open a provider's circuit for a given time (e.g. the Retry-After of a rate limit)."""
+        with self._lock:
+            stats = self._get(name)
+            stats.open_until = max(stats.open_until, time.time() + seconds)
+            stats.trial_in_flight = False
+        print(f"[WARN] Opening circuit for {self.label} {name} for {seconds:.0f}s")
+
+    def latency(self, name: str, q: float = 0.5) -> Optional[float]:
+        """Latency quantile of a provider, or None before its first attempt."""
+        with self._lock:
+            stats = self._stats.get(name)
+            return stats.latency_quantile(q) if stats is not None else None
+
+    def release(self, name: str):
+        """Give back a half-open trial slot that order() handed out but was never used."""
+        with self._lock:
+            stats = self._stats.get(name)
+            if stats is not None:
+                stats.trial_in_flight = False
+
+    def _score(self, stats: Optional[ProviderStats]):
+        # Unknown providers get the benefit of the doubt; ties keep the configured order
+        if stats is None or not stats.outcomes:
+            return (1.0, 0.0)
+        median = stats.latency_quantile(0.5) or 0.0
+        # Bucket the rate so small differences don't reshuffle the order on every request
+        return (round(stats.success_rate, 1), median)
+
+    def order(self, providers: Sequence[Any], rank: bool = True) -> List[Any]:
+        """
+        Order (name, method) providers for one fetch
+
+        Providers with an open circuit are left out; once the cool-down is
+        over, one caller gets the provider back as a half-open trial. If
+        every circuit is open, all providers are returned in the configured
+        order rather than failing without trying.
+
+        Args:
+            providers: Sequence of (name, method) tuples in configured order
+            rank: Sort by success rate and latency; False keeps the configured order
+
+        Returns:
+            The providers to try, best first
+        """
+        now = time.time()
+        available = []
+        with self._lock:
+            for position, provider in enumerate(providers):
+                stats = self._stats.get(provider[0])
+                if stats is not None and stats.open_until:
+                    if now < stats.open_until or stats.trial_in_flight:
+                        continue
+                    # Half-open: let exactly one trial through
+                    stats.trial_in_flight = True
+                success_rate, median = self._score(stats)
+                available.append((-success_rate, median, position, provider))
+        if not available:
+            return list(providers)
+        if rank:
+            available.sort(key=lambda item: item[:3])
+        return [item[3] for item in available]
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Current health of every provider seen so far (for monitoring)."""
+        now = time.time()
+        with self._lock:
+            result = {}
+            for name, stats in self._stats.items():
+                labels = [f"le_{bound:g}s" for bound in LATENCY_BUCKETS] + ["inf"]
+                result[name] = {
+                    "success_rate": stats.success_rate,
+                    "attempts": len(stats.outcomes),
+                    "latency_p50": stats.latency_quantile(0.5),
+                    "latency_p90": stats.latency_quantile(0.9),
+                    "latency_histogram": dict(zip(labels, stats.histogram)),
+                    "consecutive_failures": stats.consecutive_failures,
+                    "timeouts": stats.timeouts,
+                    "circuit": "open" if now < stats.open_until else ("half_open" if stats.open_until else "closed"),
+                }
+            return result
+
+provider_health = ProviderHealth()
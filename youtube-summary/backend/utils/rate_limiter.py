@@ -0,0 +1,262 @@
+import os
+import re
+import time
+import random
+import asyncio
+import threading
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+import httpx
+from openai import APIConnectionError, APIStatusError
+
+# Client-side request rate for the LLM API (per worker process). The rate
+# halves on every 429 and recovers a little with every successful response,
+# so throughput backs off gradually under upstream pressure.
+LLM_RATE_LIMIT_RPS = float(os.getenv("LLM_RATE_LIMIT_RPS", "5"))
+LLM_RATE_LIMIT_BURST = int(os.getenv("LLM_RATE_LIMIT_BURST", "10"))
+LLM_RATE_LIMIT_MIN_RPS = float(os.getenv("LLM_RATE_LIMIT_MIN_RPS", "0.2"))
+LLM_RATE_RECOVERY_RPS = float(os.getenv("LLM_RATE_RECOVERY_RPS", "0.1"))
+
+# Retries of failed LLM calls: full-jitter exponential backoff, all within
+# the deadline of the request
+LLM_MAX_ATTEMPTS = int(os.getenv("LLM_MAX_ATTEMPTS", "4"))
+LLM_RETRY_BASE_SECONDS = float(os.getenv("LLM_RETRY_BASE_SECONDS", "1"))
+LLM_RETRY_MAX_BACKOFF_SECONDS = float(os.getenv("LLM_RETRY_MAX_BACKOFF_SECONDS", "20"))
+LLM_REQUEST_DEADLINE_SECONDS = float(os.getenv("LLM_REQUEST_DEADLINE_SECONDS", "300"))
+
+# Status codes worth another attempt
+RETRYABLE_STATUS_CODES = {408, 409, 429}
+
+class RateLimitTimeout(Exception):
+    """No request slot frees up before the deadline of the request."""
+
+def _parse_seconds(value: Optional[str]) -> Optional[float]:
+    """
+    Seconds until a rate limit resets, from any of the header formats in use
+
+    Accepts plain seconds, epoch seconds or milliseconds (OpenRouter's
+    X-RateLimit-Reset), durations like "1m30s" or "250ms", and HTTP dates
+    (Retry-After).
+    """
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        number = float(value)
+    except ValueError:
+        number = None
+    if number is not None:
+        if number > 1e12:
+            return max(0.0, number / 1000 - time.time())
+        if number > 1e9:
+            return max(0.0, number - time.time())
+        return max(0.0, number)
+    parts = re.findall(r'(\d+(?:\.\d+)?)(ms|h|m|s)', value)
+    if parts and "".join(a + b for a, b in parts) == value:
+        scale = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+        return sum(float(amount) * scale[unit] for amount, unit in parts)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+def _first_header(headers, *names: str) -> Optional[str]:
+    for name in names:
+        value = headers.get(name)
+        if value is not None:
+            return value
+    return None
+
+def rate_limit_hints(headers) -> Tuple[Optional[float], Optional[int], Optional[float]]:
+    """
+    Read the rate limit headers of a response
+
+    Returns:
+        Tuple of (Retry-After seconds, remaining requests, seconds until the limit resets);
+        each is None when the header is missing
+    """
+    retry_after = _parse_seconds(headers.get("retry-after"))
+    remaining = _first_header(headers, "x-ratelimit-remaining-requests", "x-ratelimit-remaining")
+    try:
+        remaining = int(float(remaining)) if remaining is not None else None
+    except ValueError:
+        remaining = None
+    reset = _parse_seconds(_first_header(headers, "x-ratelimit-reset-requests", "x-ratelimit-reset"))
+    return retry_after, remaining, reset
+
+class TokenBucket:
+    """
+    Adaptive token bucket for outgoing LLM requests, shared by all requests of a worker
+
+    Every request reserves a token; when none is left the caller waits its
+    turn, or fails right away with RateLimitTimeout if its turn would come
+    after its deadline. The rate adapts to the upstream limits: a 429
+    halves it (down to min_rate) and pauses the bucket for the Retry-After
+    time, successful responses raise it again by recovery requests per
+    second, and the remaining / reset headers cap the tokens on hand.
+    """
+
+    def __init__(self, rate: float = LLM_RATE_LIMIT_RPS, burst: int = LLM_RATE_LIMIT_BURST,
+                 min_rate: float = LLM_RATE_LIMIT_MIN_RPS, recovery: float = LLM_RATE_RECOVERY_RPS):
+        self.max_rate = rate
+        self.min_rate = min(min_rate, rate)
+        self.recovery = recovery
+        self.burst = burst
+        self.rate = rate
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        # No tokens accrue while the bucket is paused
+        elapsed = now - max(self.updated, min(now, self.paused_until))
+        if elapsed > 0:
+            self.tokens = min(self.burst, self.tokens + elapsed * self.rate)
+        self.updated = now
+
+    def reserve(self, deadline: Optional[float] = None) -> float:
+        """
+        Take a token, possibly ahead of time
+
+        Args:
+            deadline: time.monotonic() value the request must be sent by, or None
+
+        Returns:
+            Seconds to wait before sending the request
+
+        Raises:
+            RateLimitTimeout: If the token would only be available after the deadline
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.tokens -= 1
+            delay = max(0.0, self.paused_until - now)
+            if self.tokens < 0:
+                delay += -self.tokens / self.rate
+            if deadline is not None and now + delay > deadline:
+                self.tokens += 1
+                raise RateLimitTimeout(f"LLM request rate limit: next slot in {delay:.1f}s is past the request deadline")
+            return delay
+
+    async def acquire(self, deadline: Optional[float] = None):
+        """Wait for a token (see reserve)."""
+        delay = self.reserve(deadline)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def pause(self, seconds: float):
+        """Stop handing out tokens for the given time."""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.paused_until = max(self.paused_until, now + seconds)
+            self.tokens = min(self.tokens, 0.0)
+
+    def observe(self, status_code: int, headers):
+        """
+        Adapt to one LLM API response
+
+        Args:
+            status_code: HTTP status of the response
+            headers: Response headers
+        """
+        retry_after, remaining, reset = rate_limit_hints(headers)
+        if status_code == 429:
+            with self._lock:
+                self._refill(time.monotonic())
+                self.rate = max(self.min_rate, self.rate / 2)
+            print(f"[WARN] LLM API rate limited, lowering the request rate to {self.rate:.2f}/s")
+        elif status_code < 400:
+            with self._lock:
+                self._refill(time.monotonic())
+                self.rate = min(self.max_rate, self.rate + self.recovery)
+        if retry_after is not None and status_code in (429, 503):
+            self.pause(retry_after)
+        elif remaining is not None:
+            if remaining <= 0 and reset:
+                self.pause(reset)
+            else:
+                with self._lock:
+                    self.tokens = min(self.tokens, float(remaining))
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current limiter state (for monitoring)."""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            return {
+                "rate_per_second": round(self.rate, 3),
+                "max_rate_per_second": self.max_rate,
+                "tokens": round(self.tokens, 2),
+                "paused_seconds": round(max(0.0, self.paused_until - now), 2),
+            }
+
+llm_rate_limiter = TokenBucket()
+
+async def observe_llm_response(response: httpx.Response):
+    """httpx response hook of the shared LLM client: feeds every response's rate limit headers to the limiter."""
+    llm_rate_limiter.observe(response.status_code, response.headers)
+
+def request_deadline(seconds: float = LLM_REQUEST_DEADLINE_SECONDS) -> float:
+    """Deadline (a time.monotonic() value) for the LLM calls of one request."""
+    return time.monotonic() + seconds
+
+def is_retryable(error: BaseException) -> bool:
+    """Rate limits, upstream 5xx, timeouts and connection errors are retried; other errors are final."""
+    if isinstance(error, APIStatusError):
+        return error.status_code in RETRYABLE_STATUS_CODES or error.status_code >= 500
+    return isinstance(error, (APIConnectionError, asyncio.TimeoutError))
+
+def retry_delay(attempt: int, error: BaseException) -> float:
+    """Full-jitter backoff for the given retry, at least the Retry-After of the error."""
+    delay = random.uniform(0, min(LLM_RETRY_MAX_BACKOFF_SECONDS, LLM_RETRY_BASE_SECONDS * 2 ** attempt))
+    if isinstance(error, APIStatusError):
+        retry_after = _parse_seconds(error.response.headers.get("retry-after"))
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+    return delay
+
+async def with_retries(call: Callable[[], Awaitable[Any]], deadline: float, kind: str = "summary",
+                       attempts: int = LLM_MAX_ATTEMPTS, retry_if: Callable[[BaseException], bool] = is_retryable,
+                       timeout: Optional[float] = None) -> Any:
+    """
+    Run an LLM call, retrying transient failures until the deadline
+
+    Args:
+        call: Coroutine function making the call (a fresh attempt every time)
+        deadline: time.monotonic() value by which the call has to be done
+        kind: Call kind for log messages
+        attempts: Maximum number of attempts
+        retry_if: Decides whether an error is worth another attempt
+        timeout: Seconds after which a single attempt is abandoned, or None to wait until the deadline
+
+    Returns:
+        The result of the first successful attempt
+
+    Raises:
+        Exception: The last error, once it is not retryable, the attempts are
+            used up or the next attempt would start after the deadline
+        asyncio.TimeoutError: If the deadline passes, or the timeout of an attempt runs out
+    """
+    attempt = 0
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise asyncio.TimeoutError(f"{kind} call ran out of time")
+        try:
+            return await asyncio.wait_for(call(), remaining if timeout is None else min(timeout, remaining))
+        except Exception as e:
+            error = e
+        attempt += 1
+        if time.monotonic() >= deadline:
+            raise asyncio.TimeoutError(f"{kind} call did not finish before the request deadline") from error
+        if attempt >= attempts or not retry_if(error):
+            raise error
+        delay = retry_delay(attempt - 1, error)
+        if time.monotonic() + delay >= deadline:
+            raise error
+        print(f"[WARN] {kind} call failed ({error}), retry {attempt}/{attempts - 1} in {delay:.1f}s")
+        await asyncio.sleep(delay)
@@ -0,0 +1,68 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls that share a key into a single execution
+
+    The first caller for a key starts the work; callers that arrive while it is
+    still running await the same task instead of repeating it. Deduplication is
+    per worker process.
+
+    Callers that consume the work's progress themselves (e.g. a streamed
+    response) start it with start() and follow it on their own; the task
+    keeps running for the others if that caller goes away.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+
+    def get_inflight(self, key: Hashable) -> Optional[asyncio.Future]:
+        """Return the running task for key, if any."""
+        return self._inflight.get(key)
+
+    def start(self, key: Hashable, func: Callable[..., Awaitable[Any]], *args, **kwargs) -> asyncio.Future:
+        """
+        Start func(*args, **kwargs) as the task for key, unless one is already running
+
+        Unlike do(), this does not wait: the caller awaits the returned task
+        (shielded, since others share it) whenever it needs the result.
+
+        Returns:
+            The new task, or the one already running for key
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(func(*args, **kwargs))
+            self._inflight[key] = task
+            task.add_done_callback(lambda finished: self._finish(key, finished))
+        return task
+
+    async def do(self, key: Hashable, func: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        """
+        Run func(*args, **kwargs) once per key among concurrent callers
+
+        Args:
+            key: Deduplication key
+            func: Coroutine function doing the actual work
+            *args: Positional arguments for func
+            **kwargs: Keyword arguments for func
+
+        Returns:
+            The (shared) result of func
+
+        Raises:
+            Exception: Whatever func raised, re-raised in every caller
+        """
+        if key in self._inflight:
+            print(f"[DEBUG] Joining in-flight request for {key}")
+
+        # Shield the shared task so one caller disconnecting does not cancel it for the others
+        return await asyncio.shield(self.start(key, func, *args, **kwargs))
+
+    def _finish(self, key: Hashable, task: asyncio.Future):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Mark the exception as retrieved even if every caller has gone away
+        if not task.cancelled():
+            task.exception()
@@ -0,0 +1,152 @@
+import os
+import json
+from datetime import datetime, timedelta
+from typing import Dict, Any, Optional, Tuple
+
+from sqlalchemy.exc import IntegrityError
+
+from database.db import SessionLocal
+from database.models import SharedSummary
+from utils.cache_utils import TTLCache
+from utils.transcript import transcript_to_json
+
+# Shared (cross-user) summary cache settings
+SUMMARY_CACHE_TTL_SECONDS = int(os.getenv("SUMMARY_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))  # 7 days
+SUMMARY_CACHE_MAX_ENTRIES = int(os.getenv("SUMMARY_CACHE_MAX_ENTRIES", "256"))  # in-process entries
+SUMMARY_CACHE_MAX_ROWS = int(os.getenv("SUMMARY_CACHE_MAX_ROWS", "5000"))  # database rows
+
+# In-process layer in front of the shared_summaries table
+_memory_cache = TTLCache(maxsize=SUMMARY_CACHE_MAX_ENTRIES, ttl=SUMMARY_CACHE_TTL_SECONDS)
+
+def make_cache_key(youtube_id: str, summary_type: str, language: str, model: str, prompt_version: str) -> Tuple[str, str, str, str, str]:
+    """Build the shared cache key for a summary request."""
+    return (youtube_id, summary_type, language, model, prompt_version)
+
+def _filter_by_key(query, key):
+    youtube_id, summary_type, language, model, prompt_version = key
+    return query.filter(
+        SharedSummary.youtube_id == youtube_id,
+        SharedSummary.summary_type == summary_type,
+        SharedSummary.language == language,
+        SharedSummary.model == model,
+        SharedSummary.prompt_version == prompt_version
+    )
+
+def _row_to_result(row: SharedSummary) -> Dict[str, Any]:
+    result = json.loads(row.payload)
+    result["summary"] = row.summary_text
+    result["enhanced_text"] = row.transcript_text
+    result["shared_summary_id"] = row.id
+    return result
+
+def peek_cached_summary(key) -> Optional[Dict[str, Any]]:
+    """
+    Look up a summary in the in-process layer only
+
+    Never touches the database, so it is safe to call from the event loop.
+    """
+    return _memory_cache.get(key)
+
+def get_cached_summary(key) -> Optional[Dict[str, Any]]:
+    """
+    Look up a summary in the in-process layer, then in the shared_summaries table
+
+    Args:
+        key: Key built with make_cache_key
+
+    Returns:
+        Cached result dictionary (response fields plus summary, enhanced_text
+        and shared_summary_id), or None on a miss
+    """
+    result = _memory_cache.get(key)
+    if result is not None:
+        return result
+
+    db = SessionLocal()
+    try:
+        row = _filter_by_key(db.query(SharedSummary), key).first()
+        if not row:
+            return None
+
+        now = datetime.utcnow()
+        if row.created_at < now - timedelta(seconds=SUMMARY_CACHE_TTL_SECONDS):
+            # Expired: drop it so the summary gets regenerated
+            db.delete(row)
+            db.commit()
+            return None
+
+        row.hit_count = (row.hit_count or 0) + 1
+        row.last_accessed_at = now
+        db.commit()
+
+        result = _row_to_result(row)
+        _memory_cache.set(key, result)
+        return result
+    finally:
+        db.close()
+
+def store_summary(key, result: Dict[str, Any]) -> Optional[int]:
+    """
+    Store a freshly generated summary in both cache layers
+
+    Args:
+        key: Key built with make_cache_key
+        result: Response fields plus "summary" and "enhanced_text"
+
+    Returns:
+        ID of the shared_summaries row
+    """
+    youtube_id, summary_type, language, model, prompt_version = key
+    payload = {k: v for k, v in result.items() if k not in ("summary", "enhanced_text", "shared_summary_id")}
+    now = datetime.utcnow()
+
+    db = SessionLocal()
+    try:
+        row = _filter_by_key(db.query(SharedSummary), key).first()
+        if row is None:
+            row = SharedSummary(
+                youtube_id=youtube_id,
+                summary_type=summary_type,
+                language=language,
+                model=model,
+                prompt_version=prompt_version,
+                hit_count=0
+            )
+            db.add(row)
+        row.summary_text = result["summary"]
+        row.transcript_text = result.get("enhanced_text")
+        row.payload = json.dumps(payload, ensure_ascii=False, default=transcript_to_json)
+        row.created_at = now
+        row.last_accessed_at = now
+        try:
+            db.commit()
+        except IntegrityError:
+            # Another worker stored the same key first; keep its row
+            db.rollback()
+            row = _filter_by_key(db.query(SharedSummary), key).first()
+            if row is None:
+                return None
+
+        shared_summary_id = row.id
+        _evict_rows(db)
+
+        cached = dict(result)
+        cached["shared_summary_id"] = shared_summary_id
+        _memory_cache.set(key, cached)
+        return shared_summary_id
+    finally:
+        db.close()
+
+def _evict_rows(db):
+    """Delete expired rows and the least recently used rows above SUMMARY_CACHE_MAX_ROWS."""
+    expired_before = datetime.utcnow() - timedelta(seconds=SUMMARY_CACHE_TTL_SECONDS)
+    db.query(SharedSummary).filter(SharedSummary.created_at < expired_before).delete(synchronize_session=False)
+
+    total = db.query(SharedSummary).count()
+    overflow = total - SUMMARY_CACHE_MAX_ROWS
+    if overflow > 0:
+        stale_ids = [row_id for (row_id,) in db.query(SharedSummary.id)
+                     .order_by(SharedSummary.last_accessed_at.asc())
+                     .limit(overflow)]
+        db.query(SharedSummary).filter(SharedSummary.id.in_(stale_ids)).delete(synchronize_session=False)
+    db.commit()
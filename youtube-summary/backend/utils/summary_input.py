@@ -0,0 +1,57 @@
+from typing import Any, Dict, List, Optional
+
+from utils.transcript import Transcript
+from utils.transcript_chunks import merge_segments
+from utils.token_budget import estimate_tokens
+from utils.youtube_utils import create_enhanced_text
+
+# Number of evenly spaced transcript samples listed in the prompt
+REFERENCE_POINT_COUNT = 10
+REFERENCE_TEXT_CHARS = 50
+
+def format_timestamp(seconds: float) -> str:
+    """MM:SS, the same format as the transcript markers."""
+    return f"{int(seconds // 60)}:{int(seconds % 60):02d}"
+
+def pick_reference_points(segments: Transcript, count: int = REFERENCE_POINT_COUNT) -> List[Dict[str, Any]]:
+    """
+    About count evenly spaced (timestamp, text sample) pairs from a transcript
+
+    Returns:
+        List of dictionaries with start (seconds), timestamp (MM:SS) and a short text sample
+    """
+    points = []
+    step = max(1, len(segments) // count)
+    for i in range(0, len(segments), step):
+        text = segments.text(i).strip()
+        sample = text[:REFERENCE_TEXT_CHARS] + ('...' if len(text) > REFERENCE_TEXT_CHARS else '')
+        points.append({
+            'start': segments.start(i),
+            'timestamp': format_timestamp(segments.start(i)),
+            'text': sample
+        })
+    return points
+
+class SummaryInput:
+    """
+    Everything the summary step needs for one video, computed once
+
+    transcript holds the original caption cues (returned by the API),
+    segments the merged sentence-level segments the prompt is built from.
+    Duration, reference points and the token estimate are derived here so
+    the prompt builders never have to parse them back out of the text.
+    """
+
+    __slots__ = ('video_id', 'transcript', 'segments', 'metadata', 'enhanced_text',
+                 'duration', 'reference_points', 'transcript_tokens')
+
+    def __init__(self, video_id: str, transcript: Transcript, metadata: Dict[str, Any],
+                 segments: Optional[Transcript] = None):
+        self.video_id = video_id
+        self.transcript = transcript
+        self.metadata = metadata
+        self.segments = merge_segments(transcript) if segments is None else segments
+        self.enhanced_text = create_enhanced_text(self.segments)
+        self.duration = transcript.end_time
+        self.reference_points = pick_reference_points(self.segments)
+        self.transcript_tokens = estimate_tokens(self.enhanced_text)
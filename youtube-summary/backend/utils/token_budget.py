@@ -0,0 +1,167 @@
+import os
+import re
+import math
+from typing import Any, Dict, Optional
+
+# Context / output budget settings for summary calls
+MODEL_CONTEXT_TOKENS = int(os.getenv("MODEL_CONTEXT_TOKENS", "200000"))
+SUMMARY_MAX_OUTPUT_TOKENS = int(os.getenv("SUMMARY_MAX_OUTPUT_TOKENS", "10000"))
+# Headroom for estimation error and chat message framing
+CONTEXT_SAFETY_TOKENS = int(os.getenv("CONTEXT_SAFETY_TOKENS", "2000"))
+# Transcripts above this many tokens are summarized window by window (map-reduce)
+SUMMARY_SINGLE_PASS_TOKENS = int(os.getenv("SUMMARY_SINGLE_PASS_TOKENS", "24000"))
+SUMMARY_WINDOW_TOKENS = int(os.getenv("SUMMARY_WINDOW_TOKENS", "12000"))
+SUMMARY_WINDOW_MAX_TOKENS = int(os.getenv("SUMMARY_WINDOW_MAX_TOKENS", "2000"))
+SUMMARY_WINDOW_MIN_TOKENS = int(os.getenv("SUMMARY_WINDOW_MIN_TOKENS", "400"))
+# Upper bound for the window size when very long transcripts need fewer, larger windows
+SUMMARY_WINDOW_MAX_INPUT_TOKENS = int(os.getenv("SUMMARY_WINDOW_MAX_INPUT_TOKENS", "60000"))
+# Output cap of the final summary call: the expected length times a margin
+# (the prompts ask for the upper end of the ranges), plus room for the
+# timestamps and section titles
+SUMMARY_OUTPUT_MARGIN = float(os.getenv("SUMMARY_OUTPUT_MARGIN", "1.6"))
+SUMMARY_OUTPUT_OVERHEAD_TOKENS = int(os.getenv("SUMMARY_OUTPUT_OVERHEAD_TOKENS", "200"))
+SUMMARY_MIN_OUTPUT_TOKENS = int(os.getenv("SUMMARY_MIN_OUTPUT_TOKENS", "512"))
+
+_WIDE_CHARS = '぀-ヿ㐀-䶿一-鿿가-힯豈-﫿'
+# One match per token-ish unit: a CJK/kana/hangul character, an ASCII word,
+# a digit run, a run of other letters (accents, Cyrillic, ...), or a symbol
+_TOKEN_UNIT_RE = re.compile(
+    rf'([{_WIDE_CHARS}])|([A-Za-z]+)|(\d+)|([^\W\d_A-Za-z{_WIDE_CHARS}]+)|[^\w\s]'
+)
+
+def estimate_tokens(text: str) -> int:
+    """
+    Offline token estimate that works across scripts
+
+    CJK characters count as one token each, ASCII words as one token plus one
+    per 7 extra letters, digit runs and other-script words as one token per 3
+    characters, and punctuation as one token per symbol. Close enough to the
+    BPE tokenizers of the hosted models for budgeting without calling them.
+    """
+    if not text:
+        return 0
+    tokens = 0
+    for match in _TOKEN_UNIT_RE.finditer(text):
+        wide, word, digits, other = match.groups()
+        if wide:
+            tokens += 1
+        elif word:
+            tokens += 1 + (len(word) - 1) // 7
+        elif digits:
+            tokens += (len(digits) + 2) // 3
+        elif other:
+            tokens += (len(other) + 2) // 3
+        else:
+            tokens += 1
+    return tokens
+
+# Target summary length per minute of video, by summary type, as
+# (up to minute, rate) bands. English rates are words, Chinese rates are
+# characters (the same bands the Chinese prompt instructions use).
+SUMMARY_LENGTH_RATES = {
+    "en": {
+        "short": [(10, 50), (30, 40), (60, 35), (None, 25)],
+        "detailed": [(10, 100), (30, 75), (60, 60), (None, 50)],
+    },
+    "zh": {
+        "short": [(10, 60), (30, 50), (60, 40), (None, 32)],
+        "detailed": [(10, 90), (30, 80), (60, 70), (None, 60)],
+    },
+}
+
+# Output tokens per unit of length (word, or character for Chinese/Japanese/Korean)
+TOKENS_PER_LENGTH_UNIT = {"en": 1.35, "zh": 1.0, "ja": 1.0, "ko": 1.0}
+DEFAULT_TOKENS_PER_LENGTH_UNIT = 1.8
+
+def expected_summary_length(duration_seconds: float, summary_type: str, language: str = "en") -> int:
+    """
+    Target summary length for a video
+
+    Returns:
+        Number of words, or characters for Chinese summaries
+    """
+    rates = SUMMARY_LENGTH_RATES.get(language, SUMMARY_LENGTH_RATES["en"])
+    bands = rates.get(summary_type, rates["short"])
+    total_minutes = max(0.0, duration_seconds / 60)
+    length = 0.0
+    previous_limit = 0
+    for limit, rate in bands:
+        upper = total_minutes if limit is None else min(total_minutes, limit)
+        if upper > previous_limit:
+            length += (upper - previous_limit) * rate
+        if limit is None or total_minutes <= limit:
+            break
+        previous_limit = limit
+    return int(length)
+
+def expected_output_tokens(duration_seconds: float, summary_type: str, language: str = "en") -> int:
+    """Output tokens the target summary length translates to."""
+    rate = TOKENS_PER_LENGTH_UNIT.get(language, DEFAULT_TOKENS_PER_LENGTH_UNIT)
+    return int(math.ceil(expected_summary_length(duration_seconds, summary_type, language) * rate))
+
+def summary_output_tokens(duration_seconds: float, summary_type: str, language: str = "en") -> int:
+    """
+    max_tokens for a summary of the target length, with a safety margin
+
+    Returns:
+        Between SUMMARY_MIN_OUTPUT_TOKENS and SUMMARY_MAX_OUTPUT_TOKENS
+    """
+    expected = expected_output_tokens(duration_seconds, summary_type, language)
+    tokens = int(math.ceil(expected * SUMMARY_OUTPUT_MARGIN)) + SUMMARY_OUTPUT_OVERHEAD_TOKENS
+    return max(SUMMARY_MIN_OUTPUT_TOKENS, min(SUMMARY_MAX_OUTPUT_TOKENS, tokens))
+
+def plan_summary_budget(system_tokens: int, transcript_tokens: int, max_output_tokens: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Decide how a transcript is fed to the model and how many output tokens to allow
+
+    Args:
+        system_tokens: Estimated tokens of the system prompt
+        transcript_tokens: Estimated tokens of the transcript text
+        max_output_tokens: Output cap to respect (defaults to SUMMARY_MAX_OUTPUT_TOKENS)
+
+    Returns:
+        Dictionary with:
+            mode: "single" (whole transcript in one call) or "chunked" (map-reduce)
+            input_tokens: Token budget for the final call's transcript/notes input
+            window_tokens / window_count / window_output_tokens: Map step sizing (chunked only)
+            max_tokens: max_tokens for the final call
+    """
+    output_tokens = min(max_output_tokens or SUMMARY_MAX_OUTPUT_TOKENS, SUMMARY_MAX_OUTPUT_TOKENS)
+    available = MODEL_CONTEXT_TOKENS - system_tokens - output_tokens - CONTEXT_SAFETY_TOKENS
+    input_budget = max(0, min(SUMMARY_SINGLE_PASS_TOKENS, available))
+
+    plan = {
+        "system_tokens": system_tokens,
+        "transcript_tokens": transcript_tokens,
+        "input_tokens": input_budget,
+        "mode": "single",
+        "window_tokens": None,
+        "window_count": 1,
+        "window_output_tokens": None,
+    }
+
+    if transcript_tokens > input_budget:
+        # Even windows, each well under SUMMARY_WINDOW_TOKENS
+        window_count = max(2, int(math.ceil(transcript_tokens / SUMMARY_WINDOW_TOKENS)))
+        # Too many windows to give each SUMMARY_WINDOW_MIN_TOKENS of notes:
+        # use fewer, larger windows (up to SUMMARY_WINDOW_MAX_INPUT_TOKENS each)
+        max_noted_windows = max(2, input_budget // SUMMARY_WINDOW_MIN_TOKENS)
+        if window_count > max_noted_windows:
+            window_count = max(max_noted_windows, int(math.ceil(transcript_tokens / SUMMARY_WINDOW_MAX_INPUT_TOKENS)))
+        # The merged notes have to fit the final call's input budget, even if
+        # that leaves the windows of huge transcripts less than the minimum
+        window_output_tokens = max(1, min(SUMMARY_WINDOW_MAX_TOKENS, input_budget // window_count))
+        plan.update({
+            "mode": "chunked",
+            "window_tokens": int(math.ceil(transcript_tokens / window_count)),
+            "window_count": window_count,
+            "window_output_tokens": window_output_tokens,
+        })
+        final_input_tokens = window_count * plan["window_output_tokens"]
+    else:
+        final_input_tokens = transcript_tokens
+
+    # Never ask for more output than the context has left
+    remaining = MODEL_CONTEXT_TOKENS - system_tokens - final_input_tokens - CONTEXT_SAFETY_TOKENS
+    plan["max_tokens"] = max(1, min(output_tokens, remaining))
+    return plan
@@ -0,0 +1,145 @@
+from array import array
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union
+
+class Transcript:
+    """
+    Compact, columnar transcript
+
+    Start times and durations live in typed arrays and all cue texts in one
+    string with an offsets array, instead of one dict per cue. Slicing by
+    index is O(1) and by time range O(log n); slices are views sharing the
+    same buffers. Dicts ({'text', 'start', 'duration'}) are only produced at
+    the API boundary (to_entries) or when a single cue is indexed.
+    """
+
+    __slots__ = ('_starts', '_durations', '_text', '_offsets', '_lo', '_hi')
+
+    def __init__(self, starts: array, durations: array, text: str, offsets: array, lo: int = 0, hi: Optional[int] = None):
+        self._starts = starts
+        self._durations = durations
+        self._text = text
+        # offsets[i]:offsets[i + 1] is the text of cue i (len(offsets) == cue count + 1)
+        self._offsets = offsets
+        self._lo = lo
+        self._hi = len(starts) if hi is None else hi
+
+    @classmethod
+    def from_entries(cls, entries: Iterable[Dict[str, Any]]) -> "Transcript":
+        """Build from the {'text', 'start', 'duration'} dict form."""
+        starts = array('d')
+        durations = array('d')
+        offsets = array('q', [0])
+        texts = []
+        length = 0
+        for entry in entries:
+            text = entry.get('text', '') or ''
+            starts.append(float(entry['start']))
+            durations.append(float(entry.get('duration', 0) or 0))
+            texts.append(text)
+            length += len(text)
+            offsets.append(length)
+        return cls(starts, durations, ''.join(texts), offsets)
+
+    @classmethod
+    def from_columns(cls, columns: Dict[str, List[Any]]) -> "Transcript":
+        """Inverse of to_columns."""
+        texts = columns['text']
+        offsets = array('q', [0])
+        length = 0
+        for text in texts:
+            length += len(text)
+            offsets.append(length)
+        return cls(array('d', columns['start']), array('d', columns['duration']), ''.join(texts), offsets)
+
+    def to_columns(self) -> Dict[str, List[Any]]:
+        """Column lists, for compact serialization."""
+        return {
+            'start': self._starts[self._lo:self._hi].tolist(),
+            'duration': self._durations[self._lo:self._hi].tolist(),
+            'text': [self.text(i) for i in range(len(self))],
+        }
+
+    def to_entries(self) -> List[Dict[str, Any]]:
+        """The {'text', 'start', 'duration'} dict form used by the API responses."""
+        return [self._entry(i) for i in range(self._lo, self._hi)]
+
+    def __len__(self) -> int:
+        return self._hi - self._lo
+
+    def __bool__(self) -> bool:
+        return self._hi > self._lo
+
+    def _index(self, i: int) -> int:
+        n = len(self)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError("transcript index out of range")
+        return self._lo + i
+
+    def _entry(self, k: int) -> Dict[str, Any]:
+        return {
+            'text': self._text[self._offsets[k]:self._offsets[k + 1]],
+            'start': self._starts[k],
+            'duration': self._durations[k]
+        }
+
+    def __getitem__(self, key: Union[int, slice]):
+        if isinstance(key, slice):
+            start, stop, step = key.indices(len(self))
+            if step != 1:
+                raise ValueError("Transcript slices do not support a step")
+            return Transcript(self._starts, self._durations, self._text, self._offsets,
+                              self._lo + start, self._lo + max(start, stop))
+        return self._entry(self._index(key))
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for k in range(self._lo, self._hi):
+            yield self._entry(k)
+
+    def start(self, i: int) -> float:
+        return self._starts[self._index(i)]
+
+    def duration(self, i: int) -> float:
+        return self._durations[self._index(i)]
+
+    def text(self, i: int) -> str:
+        k = self._index(i)
+        return self._text[self._offsets[k]:self._offsets[k + 1]]
+
+    @property
+    def start_time(self) -> float:
+        """Start of the first cue (0 for an empty transcript)."""
+        return self._starts[self._lo] if self else 0.0
+
+    @property
+    def end_time(self) -> float:
+        """End of the last cue, i.e. the covered video duration."""
+        if not self:
+            return 0.0
+        return self._starts[self._hi - 1] + self._durations[self._hi - 1]
+
+    @property
+    def text_length(self) -> int:
+        return self._offsets[self._hi] - self._offsets[self._lo]
+
+    def slice_time(self, start: float, end: float) -> "Transcript":
+        """Cues starting in [start, end) seconds, as a view (cues are sorted by start time)."""
+        lo = bisect_left(self._starts, start, self._lo, self._hi)
+        hi = bisect_left(self._starts, end, lo, self._hi)
+        return Transcript(self._starts, self._durations, self._text, self._offsets, lo, hi)
+
+def transcript_entries(transcript: Union[Transcript, List[Dict[str, Any]], None]) -> List[Dict[str, Any]]:
+    """Dict form of a transcript that may already be in dict form (e.g. loaded from a cache)."""
+    if transcript is None:
+        return []
+    if isinstance(transcript, Transcript):
+        return transcript.to_entries()
+    return transcript
+
+def transcript_to_json(value: Any) -> Any:
+    """json.dumps default hook that serializes Transcript objects in dict form."""
+    if isinstance(value, Transcript):
+        return value.to_entries()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
@@ -0,0 +1,104 @@
+import os
+from array import array
+from typing import List
+
+from utils.token_budget import estimate_tokens
+from utils.transcript import Transcript
+
+# Cue merging before prompt construction: adjacent cues are merged until a
+# sentence ends (after at least SEGMENT_MIN_SECONDS), or the segment would
+# exceed SEGMENT_MAX_SECONDS / SEGMENT_MAX_CHARS, or there is a pause longer
+# than SEGMENT_MAX_GAP_SECONDS
+SEGMENT_MIN_SECONDS = float(os.getenv("SEGMENT_MIN_SECONDS", "6"))
+SEGMENT_MAX_SECONDS = float(os.getenv("SEGMENT_MAX_SECONDS", "30"))
+SEGMENT_MAX_CHARS = int(os.getenv("SEGMENT_MAX_CHARS", "500"))
+SEGMENT_MAX_GAP_SECONDS = float(os.getenv("SEGMENT_MAX_GAP_SECONDS", "3"))
+
+_SENTENCE_END = ('.', '!', '?', '。', '！', '？', '…', '♪', '"', '”')
+
+def _is_wide(char: str) -> bool:
+    return '\u3040' <= char <= '\u30ff' or '\u3400' <= char <= '\u9fff' or '\uac00' <= char <= '\ud7af'
+
+def _join_text(left: str, right: str) -> str:
+    # No space between CJK characters
+    if left and right and _is_wide(left[-1]) and _is_wide(right[0]):
+        return left + right
+    return f"{left} {right}" if left else right
+
+def merge_segments(transcript: Transcript) -> Transcript:
+    """
+    Merge short caption cues into sentence- or time-window-level segments
+
+    Each merged segment keeps the start of its first cue and spans up to the
+    end of its last cue. The result feeds prompt construction, so there are
+    far fewer timestamp markers and tokens; the API keeps the original cues.
+
+    Args:
+        transcript: Transcript with the original cues
+
+    Returns:
+        New Transcript with the merged segments
+    """
+    starts = array('d')
+    durations = array('d')
+    texts = []
+
+    seg_start = seg_end = 0.0
+    seg_text = ''
+    for i in range(len(transcript)):
+        start = transcript.start(i)
+        end = start + transcript.duration(i)
+        text = transcript.text(i).strip()
+        if not text:
+            continue
+
+        if seg_text:
+            too_long = end - seg_start > SEGMENT_MAX_SECONDS or len(seg_text) + len(text) > SEGMENT_MAX_CHARS
+            pause = start - seg_end > SEGMENT_MAX_GAP_SECONDS
+            sentence_done = seg_text.endswith(_SENTENCE_END) and seg_end - seg_start >= SEGMENT_MIN_SECONDS
+            if too_long or pause or sentence_done:
+                starts.append(seg_start)
+                durations.append(seg_end - seg_start)
+                texts.append(seg_text)
+                seg_text = ''
+
+        if not seg_text:
+            seg_start, seg_end, seg_text = start, end, text
+        else:
+            seg_text = _join_text(seg_text, text)
+            seg_end = max(seg_end, end)
+
+    if seg_text:
+        starts.append(seg_start)
+        durations.append(seg_end - seg_start)
+        texts.append(seg_text)
+
+    return Transcript.from_columns({'start': starts, 'duration': durations, 'text': texts})
+
+def split_transcript_windows(transcript: Transcript, max_tokens: int) -> List[Transcript]:
+    """
+    Split a transcript into consecutive windows of at most max_tokens each
+
+    Entries are never split, so a single oversized entry gets a window of its own.
+
+    Args:
+        transcript: Full transcript
+        max_tokens: Token budget per window (timestamp markers included)
+
+    Returns:
+        List of windows, each a view (slice) of the transcript
+    """
+    windows = []
+    window_start = 0
+    current_tokens = 0
+    for i in range(len(transcript)):
+        # "[MM:SS] text " as create_enhanced_text renders it
+        entry_tokens = 4 + estimate_tokens(transcript.text(i))
+        if i > window_start and current_tokens + entry_tokens > max_tokens:
+            windows.append(transcript[window_start:i])
+            window_start = i
+            current_tokens = 0
+        current_tokens += entry_tokens
+    if window_start < len(transcript):
+        windows.append(transcript[window_start:])
+    return windows
@@ -0,0 +1,95 @@
+import os
+import json
+import zlib
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+
+from sqlalchemy.exc import IntegrityError
+
+from database.db import SessionLocal
+from database.models import StoredTranscript
+from utils.transcript import Transcript
+
+# Durable transcript store settings
+TRANSCRIPT_STORE_TTL_SECONDS = int(os.getenv("TRANSCRIPT_STORE_TTL_SECONDS", str(30 * 24 * 3600)))  # 30 days
+TRANSCRIPT_STORE_COMPRESSION_LEVEL = int(os.getenv("TRANSCRIPT_STORE_COMPRESSION_LEVEL", "6"))
+
+def compress_transcript(transcript: Transcript) -> bytes:
+    """Serialize a transcript to zlib-compressed, column-oriented JSON."""
+    data = json.dumps(transcript.to_columns(), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return zlib.compress(data, TRANSCRIPT_STORE_COMPRESSION_LEVEL)
+
+def decompress_transcript(data: bytes) -> Transcript:
+    """Inverse of compress_transcript (also reads rows stored as a list of entries)."""
+    payload = json.loads(zlib.decompress(data).decode("utf-8"))
+    if isinstance(payload, list):
+        return Transcript.from_entries(payload)
+    return Transcript.from_columns(payload)
+
+def load_transcript(video_id: str, language: Optional[str] = None) -> Optional[Tuple[Transcript, str, str]]:
+    """
+    Load a stored transcript that has not expired yet
+
+    Args:
+        video_id: YouTube video ID
+        language: Track language code, or None for the most recently stored track
+
+    Returns:
+        (transcript, language, source) tuple, or None on a miss
+    """
+    db = SessionLocal()
+    try:
+        query = db.query(StoredTranscript).filter(
+            StoredTranscript.video_id == video_id,
+            StoredTranscript.expires_at > datetime.utcnow()
+        )
+        if language:
+            query = query.filter(StoredTranscript.language == language)
+        row = query.order_by(StoredTranscript.created_at.desc()).first()
+        if not row:
+            return None
+        return decompress_transcript(row.data), row.language, row.source
+    finally:
+        db.close()
+
+def save_transcript(video_id: str, language: str, source: str, transcript: Transcript):
+    """
+    Store (or refresh) the full parsed transcript of a video track
+
+    Args:
+        video_id: YouTube video ID
+        language: Track language code
+        source: Name of the provider that fetched it
+        transcript: Full, unsampled transcript
+    """
+    now = datetime.utcnow()
+    data = compress_transcript(transcript)
+
+    db = SessionLocal()
+    try:
+        row = db.query(StoredTranscript).filter(
+            StoredTranscript.video_id == video_id,
+            StoredTranscript.language == language
+        ).first()
+        if row is None:
+            row = StoredTranscript(video_id=video_id, language=language)
+            db.add(row)
+        row.source = source
+        row.entry_count = len(transcript)
+        row.data = data
+        row.created_at = now
+        row.expires_at = now + timedelta(seconds=TRANSCRIPT_STORE_TTL_SECONDS)
+        try:
+            db.commit()
+        except IntegrityError:
+            # Another worker stored the same track first
+            db.rollback()
+            return
+
+        # Expired rows are only ever skipped on read; drop them here
+        db.query(StoredTranscript)\
+            .filter(StoredTranscript.expires_at <= now)\
+            .delete(synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
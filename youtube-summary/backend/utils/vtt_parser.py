@@ -0,0 +1,168 @@
+import re
+import html
+from typing import Any, Dict, IO, Iterable, Iterator, List, Optional, Union
+
+# Inline tags: <c>, </c>, <c.colorE5E5E5>, <i>, <v Speaker>, and word timestamps like <00:00:01.234>
+_INLINE_TAG_RE = re.compile(r'<[^>]*>')
+# Word timing tags (<00:00:01.234>) only appear in YouTube's auto-generated rollup tracks
+_WORD_TIMING_RE = re.compile(r'<\d{2}:\d{2}(?::\d{2})?\.\d{3}>')
+# How many recently emitted lines a rolling auto-caption cue can repeat
+_ROLLUP_LINES = 3
+# A rollup cue repeats the previous one only if it starts right where that one ended
+_ROLLUP_GAP_SECONDS = 0.05
+
+def convert_timestamp_to_seconds(timestamp: str) -> float:
+    """
+    Convert timestamp string to seconds
+
+    Args:
+        timestamp: String in format HH:MM:SS.mmm or MM:SS.mmm
+
+    Returns:
+        Seconds as float
+    """
+    parts = timestamp.replace(',', '.').split(':')
+
+    if len(parts) == 3:  # HH:MM:SS.mmm
+        hours = int(parts[0])
+        minutes = int(parts[1])
+        seconds = float(parts[2])
+        return hours * 3600 + minutes * 60 + seconds
+    elif len(parts) == 2:  # MM:SS.mmm
+        minutes = int(parts[0])
+        seconds = float(parts[1])
+        return minutes * 60 + seconds
+    else:
+        raise ValueError(f"Invalid timestamp format: {timestamp}")
+
+def clean_cue_line(line: str) -> str:
+    """Strip inline styling / word-timing tags and entities from one cue text line."""
+    line = _INLINE_TAG_RE.sub('', line)
+    return ' '.join(html.unescape(line).split())
+
+def _iter_cues(lines: Iterable[Union[str, bytes]]) -> Iterator[tuple]:
+    """Yield (start, end, text lines) for every cue, reading one line at a time."""
+    timing = None
+    text_lines: List[str] = []
+    skipping_block = False
+    first = True
+
+    for raw in lines:
+        line = raw.decode('utf-8', errors='replace') if isinstance(raw, bytes) else raw
+        line = line.rstrip('\r\n')
+        if first:
+            first = False
+            line = line.lstrip('\ufeff')
+            if line.startswith('WEBVTT'):
+                # Header block (Kind:, Language:, ...) runs until the first blank line
+                skipping_block = True
+                continue
+
+        if not line:
+            # An empty line ends the current block (YouTube uses " " as an empty text line)
+            if timing is not None:
+                yield timing[0], timing[1], text_lines
+            timing = None
+            text_lines = []
+            skipping_block = False
+            continue
+
+        if skipping_block:
+            continue
+
+        if '-->' in line:
+            if timing is not None:
+                # Cue without a separating blank line
+                yield timing[0], timing[1], text_lines
+                text_lines = []
+            start_str, _, rest = line.partition('-->')
+            try:
+                # Drop cue settings (align:start position:0% ...) after the end time
+                timing = (convert_timestamp_to_seconds(start_str.strip()),
+                          convert_timestamp_to_seconds(rest.strip().split(' ')[0]))
+            except ValueError as e:
+                print(f"Error parsing timestamp: {e}")
+                timing = None
+                skipping_block = True
+            continue
+
+        if timing is None:
+            # NOTE / STYLE / REGION blocks and cue identifiers
+            if line.startswith(('NOTE', 'STYLE', 'REGION')):
+                skipping_block = True
+            continue
+
+        text_lines.append(line)
+
+    if timing is not None:
+        yield timing[0], timing[1], text_lines
+
+def iter_vtt_segments(lines: Iterable[Union[str, bytes]], rollup: Optional[bool] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Incrementally parse WebVTT into clean, non-overlapping transcript segments
+
+    Works on any iterable of lines (an open text or binary file, a response
+    line iterator, ...), so the document is never held in memory as a whole.
+    Inline tags are stripped. In YouTube's rolling auto-captions, the lines a
+    cue repeats from the cue right before it are dropped, so every spoken
+    line is emitted once; manual captions are kept as they are, repeated
+    lines included. Each segment ends no later than the next one starts.
+
+    Args:
+        lines: WebVTT lines (str or UTF-8 bytes)
+        rollup: Whether the track is an auto-generated rollup track; None
+            detects it from the word timing tags those tracks carry
+
+    Yields:
+        Dictionaries with text, start and duration
+    """
+    recent: List[str] = []
+    previous_end: Optional[float] = None
+    pending: Optional[Dict[str, Any]] = None
+
+    for start, end, raw_lines in _iter_cues(lines):
+        if rollup is None and any(_WORD_TIMING_RE.search(line) for line in raw_lines):
+            rollup = True
+        cue_lines = [cleaned for cleaned in (clean_cue_line(line) for line in raw_lines) if cleaned]
+        if not cue_lines:
+            continue
+
+        # Rolling captions start with the tail of what the previous, contiguous cue showed
+        overlap = 0
+        if rollup and previous_end is not None and start <= previous_end + _ROLLUP_GAP_SECONDS:
+            for k in range(min(len(cue_lines), len(recent)), 0, -1):
+                if cue_lines[:k] == recent[-k:]:
+                    overlap = k
+                    break
+        previous_end = max(previous_end or 0.0, end)
+        new_lines = cue_lines[overlap:]
+        if not new_lines:
+            continue
+        recent = (recent + new_lines)[-_ROLLUP_LINES:]
+
+        if pending is not None:
+            if start < pending['start']:
+                start = pending['start']
+            # Clip the previous segment so segments never overlap
+            pending['duration'] = max(0.0, min(pending['start'] + pending['duration'], start) - pending['start'])
+            yield pending
+        pending = {
+            'text': ' '.join(new_lines),
+            'start': start,
+            'duration': max(0.0, end - start)
+        }
+
+    if pending is not None:
+        yield pending
+
+def parse_vtt_file(file: Union[str, IO]) -> List[Dict[str, Any]]:
+    """
+    Parse a WebVTT file path or open file object, streaming it line by line
+
+    Returns:
+        List of dictionaries with text, start and duration
+    """
+    if isinstance(file, str):
+        with open(file, 'r', encoding='utf-8', errors='replace') as f:
+            return list(iter_vtt_segments(f))
+    return list(iter_vtt_segments(file))
@@ -1,33 +1,69 @@
 import re
 import os
 import json
-import subprocess
 import requests
 import time
-from typing import Dict, Any, List, Optional, Tuple
-from youtube_transcript_api import YouTubeTranscriptApi
+import shutil
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Dict, Any, List, Optional, Tuple, Union
+from youtube_transcript_api import YouTubeTranscriptApi, NoTranscriptFound, TranscriptsDisabled, VideoUnavailable
 import yt_dlp
 
+from utils.transcript import Transcript
+from utils.vtt_parser import iter_vtt_segments, parse_vtt_file, convert_timestamp_to_seconds
+
+from utils.cache_janitor import CacheIndex
+from utils.cache_utils import TTLCache
+from utils.provider_health import provider_health
+
 # Unified cache directory for all transcript and info files
 CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'transcripts_cache')
-CACHE_EXPIRE_SECONDS = 7 * 24 * 3600  # 7 days
+COOKIES_FILENAME = 'cookies.txt'
+
+# Files written to CACHE_DIR are recorded here; a background CacheJanitor
+# (started by the app) enforces the expiry and size budget
+cache_index = CacheIndex(CACHE_DIR, protected=[COOKIES_FILENAME])
 
 def ensure_cache_dir():
-    if not os.path.exists(CACHE_DIR):
-        os.makedirs(CACHE_DIR)
+    cache_index.ensure_dir()
 
-def clean_cache_dir():
-    """Delete files in cache dir older than CACHE_EXPIRE_SECONDS."""
-    ensure_cache_dir()
-    now = time.time()
-    for fname in os.listdir(CACHE_DIR):
-        fpath = os.path.join(CACHE_DIR, fname)
-        if os.path.isfile(fpath):
-            if now - os.path.getmtime(fpath) > CACHE_EXPIRE_SECONDS:
-                try:
-                    os.remove(fpath)
-                except Exception as e:
-                    print(f"[WARN] Failed to remove old cache file {fpath}: {e}")
+# Videos found to have no transcript are remembered for a short while, so
+# repeated requests for them fail fast instead of running every provider again
+NO_TRANSCRIPT_CACHE_TTL_SECONDS = int(os.getenv("NO_TRANSCRIPT_CACHE_TTL_SECONDS", "600"))
+NO_TRANSCRIPT_CACHE_MAX_ENTRIES = int(os.getenv("NO_TRANSCRIPT_CACHE_MAX_ENTRIES", "10000"))
+no_transcript_cache = TTLCache(maxsize=NO_TRANSCRIPT_CACHE_MAX_ENTRIES, ttl=NO_TRANSCRIPT_CACHE_TTL_SECONDS)
+
+class NoTranscriptError(Exception):
+    """The video has no usable transcript (as opposed to a provider failing to fetch it)."""
+
+class QuietLogger:
+    """
+    yt-dlp logger that discards debug/warning output and keeps errors visible
+
+    yt-dlp logs all through extraction and download, so the logger is also
+    where a run whose result is no longer wanted is stopped: once abort is
+    set, the next message raises DownloadCancelled, which yt-dlp does not retry.
+    """
+    def __init__(self, abort: Optional[threading.Event] = None):
+        self.abort = abort
+
+    def check_abort(self):
+        if self.abort is not None and self.abort.is_set():
+            raise yt_dlp.utils.DownloadCancelled("transcript fetch abandoned")
+
+    def debug(self, msg):
+        self.check_abort()
+
+    def info(self, msg):
+        self.check_abort()
+
+    def warning(self, msg):
+        self.check_abort()
+
+    def error(self, msg):
+        print(f"[yt-dlp] {msg}")
 
 # Function to extract video ID from URL
 def extract_video_id(url: str) -> str:
@@ -46,122 +82,85 @@ def extract_video_id(url: str) -> str:
         return match.group(1)
     return url  # If no match, assume input is already a video ID
 
+# One YoutubeDL instance per thread, reused across metadata requests so the
+# extractors are only initialized once (instances are not thread-safe)
+_metadata_ydl = threading.local()
+
+def get_metadata_ydl() -> yt_dlp.YoutubeDL:
+    """Return this thread's YoutubeDL instance for metadata extraction."""
+    ydl = getattr(_metadata_ydl, 'ydl', None)
+    if ydl is None:
+        ydl_opts = {
+            'skip_download': True,
+            'noplaylist': True,
+            'quiet': True,
+            'no_warnings': True,
+            'logger': QuietLogger(),
+            'socket_timeout': 30,
+        }
+        cookies_path = os.path.join(CACHE_DIR, COOKIES_FILENAME)
+        if os.path.exists(cookies_path):
+            ydl_opts['cookiefile'] = cookies_path
+        ydl = yt_dlp.YoutubeDL(ydl_opts)
+        _metadata_ydl.ydl = ydl
+    return ydl
+
 # Function to get video metadata using yt-dlp
 def get_video_metadata(video_url: str) -> Dict[str, Any]:
     """
     Use yt-dlp to get YouTube video metadata
     
+    Runs the extractor in-process (no yt-dlp child process, no info.json file).
+    
     Args:
         video_url: YouTube URL or video ID
         
     Returns:
-        Dictionary containing title, description and chapters
+        Dictionary containing title, description, chapters, thumbnail_url,
+        channel and duration (seconds, None if unknown)
         
     Raises:
         Exception: If metadata retrieval fails
     """
     try:
-        clean_cache_dir()
-        ensure_cache_dir()
         # Ensure we have a complete URL
         if not video_url.startswith(('http://', 'https://')):
             video_url = f"https://www.youtube.com/watch?v={video_url}"
-            
-        # Run yt-dlp to get metadata
-        cmd = [
-            'yt-dlp',
-            '--skip-download',
-            '--print', 'webpage_url',
-            '--write-info-json',
-            '--no-warnings',
-            '--quiet',
-            video_url
-        ]
-        
-        # Execute command
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        
-        # Get video ID to find info file
-        video_id = extract_video_id(video_url)
-        info_filename = os.path.join(CACHE_DIR, f"{video_id}.info.json")
-        
-        # Read info file
-        if os.path.exists(info_filename):
-            with open(info_filename, 'r') as f:
-                info = json.load(f)
-                
-            # Clean up file
-            os.remove(info_filename)
-            
-            # Extract relevant information
-            title = info.get('title', 'Untitled Video')
-            description = info.get('description', '')
-            
-            # Extract chapters
-            chapters = []
-            if 'chapters' in info and info['chapters']:
-                for chapter in info['chapters']:
-                    chapters.append({
-                        'start_time': chapter.get('start_time', 0),
-                        'title': chapter.get('title', 'Unnamed Chapter')
-                    })
-            
-            return {
-                'title': title,
-                'description': description,
-                'chapters': chapters,
-                'thumbnail_url': info.get('thumbnail', ''),
-                'channel': info.get('channel', '')
-            }
-        else:
-            # If info file wasn't created, try alternative method
-            cmd = [
-                'yt-dlp',
-                '--skip-download',
-                '--dump-json',
-                video_url
-            ]
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            
-            if result.returncode == 0:
-                info = json.loads(result.stdout)
-                
-                # Extract relevant information
-                title = info.get('title', 'Untitled Video')
-                description = info.get('description', '')
-                
-                # Extract chapters
-                chapters = []
-                if 'chapters' in info and info['chapters']:
-                    for chapter in info['chapters']:
-                        chapters.append({
-                            'start_time': chapter.get('start_time', 0),
-                            'title': chapter.get('title', 'Unnamed Chapter')
-                        })
-                
-                return {
-                    'title': title,
-                    'description': description,
-                    'chapters': chapters,
-                    'thumbnail_url': info.get('thumbnail', ''),
-                    'channel': info.get('channel', '')
-                }
-            else:
-                raise Exception(f"Failed to extract metadata: {result.stderr}")
+        
+        info = get_metadata_ydl().extract_info(video_url, download=False)
+        if not info:
+            raise Exception("yt-dlp returned no video info")
+        
+        # Extract chapters
+        chapters = []
+        if info.get('chapters'):
+            for chapter in info['chapters']:
+                chapters.append({
+                    'start_time': chapter.get('start_time', 0),
+                    'title': chapter.get('title', 'Unnamed Chapter')
+                })
+        
+        return {
+            'title': info.get('title', 'Untitled Video'),
+            'description': info.get('description', '') or '',
+            'chapters': chapters,
+            'thumbnail_url': info.get('thumbnail', ''),
+            'channel': info.get('channel', ''),
+            'duration': info.get('duration')
+        }
     except Exception as e:
         raise Exception(f"Error retrieving video metadata: {str(e)}")
 
-def get_transcript_with_youtube_api(video_id: str, max_entries: int = 500, max_chars: int = 50000) -> List[Dict[str, Any]]:
+def fetch_transcript_with_youtube_api(video_id: str, abort: Optional[threading.Event] = None) -> Tuple[List[Dict[str, Any]], str]:
     """
-    Get YouTube video transcript using youtube_transcript_api
+    Fetch the full YouTube video transcript using youtube_transcript_api
     
     Args:
         video_id: YouTube video ID
-        max_entries: Maximum number of entries, will sample if exceeded
-        max_chars: Maximum character count, will trim if exceeded
+        abort: Set once the result is no longer needed (not checked: the API makes a single short request)
         
     Returns:
-        List of dictionaries containing text, start time and duration
+        (entries, language code) tuple; entries contain text, start time and duration
         
     Raises:
         Exception: If transcript retrieval fails
@@ -180,174 +179,66 @@ def get_transcript_with_youtube_api(video_id: str, max_entries: int = 500, max_c
                 'duration': snippet.duration
             })
         
-        # Check transcript length
-        print(f"Original transcript length: {len(transcript)} entries")
-        total_duration = 0
-        if transcript and len(transcript) > 0:
-            last_entry = transcript[-1]
-            total_duration = last_entry['start'] + last_entry['duration']
-            print(f"Estimated video duration: {int(total_duration // 60)}:{int(total_duration % 60):02d}")
-
-        # Calculate total text length
-        transcript_text_length = sum(len(entry.get('text', '')) for entry in transcript)
-        print(f"Original transcript text length: {transcript_text_length} characters")
-
-        # Sample if transcript is too long
-        if len(transcript) > max_entries or transcript_text_length > max_chars:
-            print(f"Transcript too long, sampling will be applied")
-            
-            # Ensure we cover the entire video range
-            if len(transcript) > max_entries:
-                # Calculate sampling interval
-                step = max(1, len(transcript) // max_entries)
-                print(f"Sampling interval: 1 entry every {step} entries")
-                
-                # Sample
-                sampled_transcript = []
-                # Ensure we include first entry
-                sampled_transcript.append(transcript[0])
-                
-                # Sample middle part
-                for i in range(step, len(transcript) - 1, step):
-                    sampled_transcript.append(transcript[i])
-                
-                # Ensure we include last entry
-                if transcript[-1] != sampled_transcript[-1]:
-                    sampled_transcript.append(transcript[-1])
-                
-                transcript = sampled_transcript
-                print(f"Sampled transcript length: {len(transcript)} entries")
-                
-                # Recalculate text length
-                transcript_text_length = sum(len(entry.get('text', '')) for entry in transcript)
-                print(f"Sampled transcript text length: {transcript_text_length} characters")
-            
-            # If still too many characters, trim text
-            if transcript_text_length > max_chars:
-                print(f"Text still too long, character trimming will be applied")
-                char_ratio = max_chars / transcript_text_length
-                for i in range(len(transcript)):
-                    text = transcript[i].get('text', '')
-                    max_entry_chars = int(len(text) * char_ratio)
-                    if len(text) > max_entry_chars:
-                        transcript[i]['text'] = text[:max_entry_chars] + "..."
-                
-                # Final length verification
-                final_length = sum(len(entry.get('text', '')) for entry in transcript)
-                print(f"Final transcript text length: {final_length} characters")
-                
-        return transcript
+        return transcript, getattr(fetched_transcript, 'language_code', None) or 'en'
                 
+    except (NoTranscriptFound, TranscriptsDisabled, VideoUnavailable) as e:
+        raise NoTranscriptError(f"Error retrieving transcript with youtube_transcript_api: {str(e)}")
     except Exception as e:
         raise Exception(f"Error retrieving transcript with youtube_transcript_api: {str(e)}")
 
-def parse_vtt_content(vtt_content: str) -> List[Dict[str, Any]]:
+def get_transcript_with_youtube_api(video_id: str) -> List[Dict[str, Any]]:
     """
-    Parse VTT format subtitle content
+    Get YouTube video transcript using youtube_transcript_api
     
     Args:
-        vtt_content: VTT format subtitle content
+        video_id: YouTube video ID
         
     Returns:
-        List of dictionaries with text, start and duration
-    """
-    entries = []
-    
-    # Remove VTT header
-    lines = vtt_content.strip().split('\n')
-    if lines and lines[0].startswith('WEBVTT'):
-        lines = lines[1:]
-    
-    # Process entries
-    i = 0
-    while i < len(lines):
-        # Skip empty lines
-        if not lines[i].strip():
-            i += 1
-            continue
-            
-        # Look for timestamp line
-        if '-->' in lines[i]:
-            # Parse time stamps
-            time_parts = lines[i].split('-->')
-            if len(time_parts) == 2:
-                start_str = time_parts[0].strip()
-                end_str = time_parts[1].strip().split(' ')[0]  # Remove styling
-                
-                # Convert to seconds
-                try:
-                    start = convert_timestamp_to_seconds(start_str)
-                    end = convert_timestamp_to_seconds(end_str)
-                    duration = end - start
-                    
-                    # Get text (may span multiple lines)
-                    text_lines = []
-                    i += 1
-                    while i < len(lines) and lines[i].strip() and '-->' not in lines[i]:
-                        text_lines.append(lines[i].strip())
-                        i += 1
-                    
-                    text = '\n'.join(text_lines)
-                    
-                    # Add entry
-                    entries.append({
-                        'text': text,
-                        'start': start,
-                        'duration': duration
-                    })
-                    continue
-                except Exception as e:
-                    print(f"Error parsing timestamp: {e}")
+        List of dictionaries containing text, start time and duration
         
-        i += 1
-    
-    return entries
+    Raises:
+        Exception: If transcript retrieval fails
+    """
+    transcript, _ = fetch_transcript_with_youtube_api(video_id)
+    return transcript
 
-def convert_timestamp_to_seconds(timestamp: str) -> float:
+def parse_vtt_content(vtt_content: str) -> List[Dict[str, Any]]:
     """
-    Convert timestamp string to seconds
+    Parse VTT format subtitle content
     
     Args:
-        timestamp: String in format HH:MM:SS.mmm or MM:SS.mmm
+        vtt_content: VTT format subtitle content
         
     Returns:
-        Seconds as float
+        List of dictionaries with text, start and duration
     """
-    parts = timestamp.replace(',', '.').split(':')
-    
-    if len(parts) == 3:  # HH:MM:SS.mmm
-        hours = int(parts[0])
-        minutes = int(parts[1])
-        seconds = float(parts[2])
-        return hours * 3600 + minutes * 60 + seconds
-    elif len(parts) == 2:  # MM:SS.mmm
-        minutes = int(parts[0])
-        seconds = float(parts[1])
-        return minutes * 60 + seconds
-    else:
-        raise ValueError(f"Invalid timestamp format: {timestamp}")
+    return list(iter_vtt_segments(vtt_content.splitlines()))
 
-def get_transcript_with_ytdlp(video_id: str, max_entries: int = 500, max_chars: int = 50000) -> List[Dict[str, Any]]:
+def fetch_transcript_with_ytdlp(video_id: str, abort: Optional[threading.Event] = None) -> Tuple[List[Dict[str, Any]], str]:
     """
-    Get YouTube video transcript using yt-dlp
+    Fetch the full YouTube video transcript using yt-dlp
+    
+    The subtitles are downloaded to a directory of this call's own, so
+    concurrent fetches of the same video never see each other's files.
     
     Args:
         video_id: YouTube video ID
-        max_entries: Maximum number of entries, will sample if exceeded
-        max_chars: Maximum character count, will trim if exceeded
+        abort: Set once the result is no longer needed (e.g. another provider
+            won the hedge); the run stops at yt-dlp's next log message or progress update
         
     Returns:
-        List of dictionaries containing text, start time and duration
+        (entries, language code) tuple; entries contain text, start time and duration
         
     Raises:
         Exception: If transcript retrieval fails
     """
-    import contextlib
     import glob
     url = f"https://www.youtube.com/watch?v={video_id}"
+    output_dir = None
     try:
-        clean_cache_dir()
         ensure_cache_dir()
+        output_dir = tempfile.mkdtemp(prefix=f"ytdlp-{video_id}-")
+        logger = QuietLogger(abort)
         
         # Prepare yt-dlp options to download subtitles
         ydl_opts = {
@@ -355,7 +246,10 @@ def get_transcript_with_ytdlp(video_id: str, max_entries: int = 500, max_chars:
             'writeautomaticsub': True,
             'skip_download': True,  # Skip video download, only get subtitles
             'quiet': True,
-            'outtmpl': os.path.join(CACHE_DIR, '%(id)s.%(ext)s'),
+            'no_warnings': True,
+            'logger': logger,
+            'progress_hooks': [lambda status: logger.check_abort()],
+            'outtmpl': os.path.join(output_dir, '%(id)s.%(ext)s'),
             'subtitleslangs': ['en'],  # Prefer English subtitles
             'subtitlesformat': 'vtt',  # Prefer VTT format
             # 添加更真实的浏览器标识和反检测措施
@@ -388,7 +282,7 @@ def get_transcript_with_ytdlp(video_id: str, max_entries: int = 500, max_chars:
         }
         
         # Check for cookies.txt in cache dir
-        cookies_path = os.path.join(CACHE_DIR, 'cookies.txt')
+        cookies_path = os.path.join(CACHE_DIR, COOKIES_FILENAME)
         if os.path.exists(cookies_path):
             # 检查cookies文件的大小和修改时间
             file_size = os.path.getsize(cookies_path)
@@ -427,14 +321,16 @@ def get_transcript_with_ytdlp(video_id: str, max_entries: int = 500, max_chars:
         # Download subtitles using yt-dlp (single attempt)
         print(f"[INFO] Downloading subtitles for video {video_id}")
         
-        with open(os.devnull, 'w') as devnull, contextlib.redirect_stderr(devnull):
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                ydl.download([url])
+        # Silence yt-dlp through its logger option instead of redirecting the
+        # process-wide stderr, which is not safe when called from worker threads
+        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            ydl.download([url])
         
         # Look for downloaded VTT files
-        vtt_files = glob.glob(os.path.join(CACHE_DIR, f"{video_id}*.vtt"))
+        vtt_files = glob.glob(os.path.join(output_dir, f"{video_id}*.vtt"))
         if not vtt_files:
-            raise Exception("No VTT subtitle files were downloaded")
+            # The download itself succeeded, so the video has no subtitles in our languages
+            raise NoTranscriptError("No VTT subtitle files were downloaded")
         
         # Use the first VTT file found (prefer manual subtitles over auto-generated)
         vtt_file = vtt_files[0]
@@ -445,108 +341,245 @@ def get_transcript_with_ytdlp(video_id: str, max_entries: int = 500, max_chars:
         
         print(f"Found subtitles with yt-dlp: {os.path.basename(vtt_file)}")
         
-        # Read and parse the VTT file
-        with open(vtt_file, 'r', encoding='utf-8') as f:
-            subtitle_content = f.read()
-        
-        if not subtitle_content.strip():
-            raise Exception("Downloaded VTT file is empty")
-        
-        transcript = parse_vtt_content(subtitle_content)
-        
-        if len(transcript) > max_entries:
-            step = max(1, len(transcript) // max_entries)
-            sampled_transcript = [transcript[0]]
-            for i in range(step, len(transcript) - 1, step):
-                sampled_transcript.append(transcript[i])
-            if transcript[-1] != sampled_transcript[-1]:
-                sampled_transcript.append(transcript[-1])
-            transcript = sampled_transcript
-        
-        transcript_text_length = sum(len(entry.get('text', '')) for entry in transcript)
-        if transcript_text_length > max_chars:
-            char_ratio = max_chars / transcript_text_length
-            for i in range(len(transcript)):
-                text = transcript[i].get('text', '')
-                max_entry_chars = int(len(text) * char_ratio)
-                if len(text) > max_entry_chars:
-                    transcript[i]['text'] = text[:max_entry_chars] + "..."
+        # Parse the VTT file incrementally (tags stripped, rolling duplicates collapsed)
+        transcript = parse_vtt_file(vtt_file)
         
-        return transcript
+        if not transcript:
+            raise NoTranscriptError("Downloaded VTT file is empty")
+        
+        # File names look like <video_id>.<lang>.vtt
+        language = os.path.basename(vtt_file)[len(video_id):].strip('.').split('.')[0] or 'en'
+        
+        return transcript, language
+    except NoTranscriptError as e:
+        raise NoTranscriptError(f"Error retrieving transcript with yt-dlp: {str(e)}")
     except Exception as e:
         raise Exception(f"Error retrieving transcript with yt-dlp: {str(e)}")
+    finally:
+        # The parsed result goes to the transcript store, so the VTT files are not needed anymore
+        if output_dir is not None:
+            shutil.rmtree(output_dir, ignore_errors=True)
+
+def get_transcript_with_ytdlp(video_id: str) -> List[Dict[str, Any]]:
+    """
+    Get YouTube video transcript using yt-dlp
+    
+    Args:
+        video_id: YouTube video ID
+        
+    Returns:
+        List of dictionaries containing text, start time and duration
+        
+    Raises:
+        Exception: If transcript retrieval fails
+    """
+    transcript, _ = fetch_transcript_with_ytdlp(video_id)
+    return transcript
 
 # Define global methods list for transcript retrieval
-# Prioritize youtube_transcript_api first, then yt-dlp
+# Prioritize youtube_transcript_api first, then yt-dlp. This is only the
+# default order: provider_health reorders it by observed success rate and
+# latency and skips providers whose circuit breaker is open.
+# Each method takes the video ID and an abort event (set when its result is no
+# longer needed) and returns the full transcript and its track language.
 methods = [
-    ("youtube_transcript_api", get_transcript_with_youtube_api),
-    ("yt-dlp", get_transcript_with_ytdlp)
+    ("youtube_transcript_api", fetch_transcript_with_youtube_api),
+    ("yt-dlp", fetch_transcript_with_ytdlp)
 ]
 
-def get_transcript(video_id: str, max_entries: int = 500, max_chars: int = 50000) -> List[Dict[str, Any]]:
+# Hedged fetching: when the running provider has not answered within this
+# many seconds, the next provider is started in parallel and the first
+# success wins (0 disables hedging: strictly one provider after another)
+TRANSCRIPT_HEDGE_SECONDS = float(os.getenv("TRANSCRIPT_HEDGE_SECONDS", "4"))
+TRANSCRIPT_FETCH_WORKERS = int(os.getenv("TRANSCRIPT_FETCH_WORKERS", "16"))
+
+# Providers run on their own pool: get_transcript itself is already running
+# on the shared blocking pool, and nesting work there could starve it
+transcript_executor = ThreadPoolExecutor(
+    max_workers=TRANSCRIPT_FETCH_WORKERS,
+    thread_name_prefix="transcript-fetch",
+)
+
+def record_provider_timing(name: str, outcome: str, elapsed: float):
+    """
+    Record how long one provider attempt took in provider_health (exposed by /api/metrics)
+    
+    Args:
+        name: Provider name
+        outcome: "success", "no_transcript" (the provider answered that the video
+            has none), "failure" or "cancelled" (lost the hedge)
+        elapsed: Seconds since the provider was started
+    """
+    provider_health.record(name, outcome, elapsed)
+
+def fetch_transcript_hedged(video_id: str) -> Tuple[Transcript, str, str]:
+    """
+    Fetch a transcript from the providers in `methods`, hedging slow ones
+    
+    Providers are started in the order provider_health ranks them. A provider that fails hands over to the
+    next one immediately; one that is still running after
+    TRANSCRIPT_HEDGE_SECONDS gets the next provider started alongside it.
+    The first success wins and the providers still running are cancelled:
+    queued ones never start, and running ones are told to stop through the
+    abort event every provider receives, so they give their pool worker back.
+    
+    Args:
+        video_id: YouTube video ID
+        
+    Returns:
+        Tuple of (transcript, track language, provider name)
+        
+    Raises:
+        NoTranscriptError: If every provider answered that the video has no transcript
+        Exception: If all transcript retrieval methods fail
+    """
+    queue = provider_health.order(methods)
+    running = {}
+    errors = []
+    # Only trust "no transcript" if no provider failed for another reason (blocked, timed out, ...)
+    all_missing = True
+    abort = threading.Event()
+    
+    def start_next():
+        name, method = queue.pop(0)
+        print(f"[INFO] Trying to get transcript using {name}...")
+        running[transcript_executor.submit(method, video_id, abort)] = (name, time.time())
+    
+    start_next()
+    try:
+        while running:
+            hedge = queue and TRANSCRIPT_HEDGE_SECONDS > 0
+            done, _ = wait(running, timeout=TRANSCRIPT_HEDGE_SECONDS if hedge else None,
+                           return_when=FIRST_COMPLETED)
+            if not done:
+                print(f"[INFO] No transcript after {TRANSCRIPT_HEDGE_SECONDS:.1f}s, hedging with {queue[0][0]}")
+                start_next()
+                continue
+            
+            for future in done:
+                name, started = running.pop(future)
+                elapsed = time.time() - started
+                try:
+                    entries, track_language = future.result()
+                except Exception as e:
+                    error_message = str(e)
+                    print(f"[ERROR] Failed with {name} after {elapsed:.2f} seconds: {error_message}")
+                    missing = isinstance(e, NoTranscriptError)
+                    all_missing = all_missing and missing
+                    record_provider_timing(name, "no_transcript" if missing else "failure", elapsed)
+                    errors.append(f"{name}: {error_message}")
+                    continue
+                transcript = Transcript.from_entries(entries)
+                print(f"[SUCCESS] Retrieved transcript using {name} in {elapsed:.2f} seconds. Segments: {len(transcript)}")
+                record_provider_timing(name, "success", elapsed)
+                return transcript, track_language, name
+            
+            # Everything running failed: fall back to the next provider right away
+            if not running and queue:
+                start_next()
+    finally:
+        # Cancel the losers of the hedge
+        abort.set()
+        for future, (name, started) in running.items():
+            future.cancel()
+            record_provider_timing(name, "cancelled", time.time() - started)
+        for name, _ in queue:
+            provider_health.release(name)
+    
+    print(f"[FAILURE] All transcript retrieval methods failed. Details: {'; '.join(errors)}")
+    if all_missing:
+        raise NoTranscriptError(f"No transcript available: {'; '.join(errors)}")
+    raise Exception(f"All transcript retrieval methods failed: {'; '.join(errors)}")
+
+def load_stored_transcript(video_id: str, language: Optional[str] = None) -> Optional[Transcript]:
+    """Return the stored full transcript, or None on a miss or store error."""
+    try:
+        # Imported lazily so the fetch helpers keep working without a configured database
+        from utils.transcript_store import load_transcript
+        stored = load_transcript(video_id, language)
+    except Exception as e:
+        print(f"[WARN] Transcript store lookup failed for {video_id}: {e}")
+        return None
+    if stored is None:
+        return None
+    transcript, track_language, source = stored
+    print(f"[CACHE] Loaded transcript for {video_id} ({track_language}, via {source}) from store. Segments: {len(transcript)}")
+    return transcript
+
+def get_transcript(video_id: str, language: Optional[str] = None, refresh: bool = False) -> Transcript:
     """
     Get YouTube video transcript with intelligent fallback
-    Tries youtube_transcript_api first, then falls back to yt-dlp if needed
+    Fails fast for videos recently found to have no transcript, checks the
+    persistent transcript store next, then fetches it from
+    youtube_transcript_api and yt-dlp, starting yt-dlp in parallel when the
+    first provider is slow (see fetch_transcript_hedged).
     Logs detailed error and performance info.
     
     Args:
         video_id: YouTube video ID
-        max_entries: Maximum number of entries
-        max_chars: Maximum character count
+        language: Track language to look up in the store (None for any)
+        refresh: Skip the store lookup and the no-transcript cache and fetch from YouTube again
         
     Returns:
-        List of dictionaries containing text, start and duration
+        Full Transcript (compact columnar form; long transcripts are
+        budgeted by the summarizer, not cut down here)
         
     Raises:
+        NoTranscriptError: If the video has no transcript (possibly remembered from an earlier request)
         Exception: If all transcript retrieval methods fail
     """
-    errors = []
+    if not refresh:
+        reason = no_transcript_cache.get(video_id)
+        if reason is not None:
+            print(f"[CACHE] {video_id} is known to have no transcript")
+            raise NoTranscriptError(reason)
+    
+    transcript = None if refresh else load_stored_transcript(video_id, language)
+    if transcript:
+        return transcript
+    
+    try:
+        transcript, track_language, name = fetch_transcript_hedged(video_id)
+        if not transcript:
+            raise NoTranscriptError(f"{name} returned an empty transcript")
+    except NoTranscriptError as e:
+        no_transcript_cache.set(video_id, str(e))
+        raise
     
-    for i, (name, method) in enumerate(methods):
+    # Store the full transcript so repeat requests skip YouTube entirely
+    if transcript:
         try:
-            print(f"[INFO] Trying to get transcript using {name}...")
-            start_time = time.time()
-            transcript = method(video_id, max_entries, max_chars)
-            elapsed_time = time.time() - start_time
-            print(f"[SUCCESS] Retrieved transcript using {name} in {elapsed_time:.2f} seconds. Segments: {len(transcript)}")
-            return transcript
+            from utils.transcript_store import save_transcript
+            save_transcript(video_id, track_language, name, transcript)
         except Exception as e:
-            error_message = str(e)
-            print(f"[ERROR] Failed with {name}: {error_message}")
-            errors.append(f"{name}: {error_message}")
+            print(f"[WARN] Failed to store transcript for {video_id}: {e}")
     
-    # If we get here, all methods failed
-    print(f"[FAILURE] All transcript retrieval methods failed. Details: {'; '.join(errors)}")
-    raise Exception(f"All transcript retrieval methods failed: {'; '.join(errors)}")
+    return transcript
 
-def create_enhanced_text(transcript: List[Dict[str, Any]]) -> str:
+def create_enhanced_text(transcript: Union[Transcript, List[Dict[str, Any]]], end_marker: bool = True) -> str:
     """
     Create enhanced text with timestamp markers from transcript
     
     Args:
-        transcript: List of transcript entries
+        transcript: Transcript (or list of transcript entries)
+        end_marker: Append the "End of video." marker (False for partial transcripts)
         
     Returns:
         Enhanced text string with timestamp markers
     """
-    enhanced_text = ""
+    if not isinstance(transcript, Transcript):
+        transcript = Transcript.from_entries(transcript)
     
     # Convert each transcript entry to format with timestamp markers
-    for entry in transcript:
+    parts = []
+    for i in range(len(transcript)):
         # Format time as MM:SS
-        minutes = int(entry['start'] // 60)
-        seconds = int(entry['start'] % 60)
-        time_marker = f"[{minutes}:{seconds:02d}] "
-        
-        # Add text with timestamp marker
-        enhanced_text += time_marker + entry.get('text', '') + " "
+        start = transcript.start(i)
+        parts.append(f"[{int(start // 60)}:{int(start % 60):02d}] {transcript.text(i)} ")
     
     # Add video end timestamp
-    if transcript and len(transcript) > 0:
-        last_entry = transcript[-1]
-        video_duration = last_entry['start'] + last_entry['duration']
-        minutes = int(video_duration // 60)
-        seconds = int(video_duration % 60)
-        enhanced_text += f"[{minutes}:{seconds:02d}] End of video."
+    if end_marker and transcript:
+        video_duration = transcript.end_time
+        parts.append(f"[{int(video_duration // 60)}:{int(video_duration % 60):02d}] End of video.")
     
-    return enhanced_text 
\ No newline at end of file
+    return "".join(parts)
\ No newline at end of file